@@ -0,0 +1,119 @@
+import numpy as np
+
+
+class AllPairsShortestPaths:
+    """
+    全源最短路矩阵（适用于几百到上千个节点的小地图）
+    - dist[i][j]: 节点 i 到 j 的最短距离，不可达为 inf
+    - next_hop[i][j]: 从 i 前往 j 的下一跳节点，不可达为 -1
+    查询时沿 next_hop 走一遍即可得到路径，复杂度 O(路径长度)
+    节点均用 0..n-1 的下标表示
+    """
+
+    def __init__(self, dist, next_hop):
+        self.dist = dist
+        self.next_hop = next_hop
+
+    @property
+    def node_count(self):
+        return self.dist.shape[0]
+
+    @classmethod
+    def build(cls, node_count, edges):
+        """
+        使用 NumPy 向量化的 Floyd-Warshall 算法构建矩阵
+        参数:
+            node_count: 节点数
+            edges: 无向边 [(u, v, weight, mode)]
+        返回:
+            AllPairsShortestPaths 实例
+        """
+        n = node_count
+        dist = np.full((n, n), np.inf, dtype=np.float64)
+        next_hop = np.full((n, n), -1, dtype=np.int32)
+        for u, v, weight, _ in edges:
+            if u != v and weight < dist[u, v]:
+                dist[u, v] = dist[v, u] = weight
+                next_hop[u, v] = v
+                next_hop[v, u] = u
+        diagonal = np.arange(n)
+        dist[diagonal, diagonal] = 0.0
+        next_hop[diagonal, diagonal] = diagonal
+
+        for k in range(n):
+            # 经过 k 中转的距离：dist[i][k] + dist[k][j]
+            via = dist[:, k:k + 1] + dist[k:k + 1, :]
+            improved = via < dist
+            if not improved.any():
+                continue
+            dist[improved] = via[improved]
+            # i -> j 的下一跳变为 i -> k 的下一跳
+            next_hop[improved] = np.broadcast_to(next_hop[:, k:k + 1], (n, n))[improved]
+        return cls(dist, next_hop)
+
+    def updated(self, node_count, edges):
+        """
+        返回在末尾追加节点与无向边后的新矩阵（原矩阵不变，正在使用它的查询不受影响）
+        新节点与其他节点互不可达，之后每条新边 (u, v, w) 做一次 O(n²) 松弛:
+            dist'[i][j] = min(dist[i][j], dist[i][u] + w + dist[v][j], dist[i][v] + w + dist[u][j])
+        边权非负时新的最短路至多经过新边一次，因此逐条松弛得到的是精确结果
+        参数:
+            node_count: 新的节点数（不小于原节点数）
+            edges: 新增的无向边 [(u, v, weight, mode)]
+        """
+        n, old = node_count, self.node_count
+        dist = np.full((n, n), np.inf, dtype=np.float64)
+        next_hop = np.full((n, n), -1, dtype=np.int32)
+        dist[:old, :old] = self.dist
+        next_hop[:old, :old] = self.next_hop
+        diagonal = np.arange(old, n)
+        dist[diagonal, diagonal] = 0.0
+        next_hop[diagonal, diagonal] = diagonal
+
+        for u, v, weight, _ in edges:
+            if u == v:
+                continue
+            # 经过新边的两个方向：i -> u -> v -> j 与 i -> v -> u -> j
+            forward = dist[:, u:u + 1] + weight + dist[v:v + 1, :]
+            backward = dist[:, v:v + 1] + weight + dist[u:u + 1, :]
+            use_backward = backward < forward
+            via = np.where(use_backward, backward, forward)
+            improved = via < dist
+            if not improved.any():
+                continue
+            # i -> j 的下一跳变为 i 前往新边起点的下一跳（i 就是起点时为新边的另一端）
+            hop_u, hop_v = next_hop[:, u].copy(), next_hop[:, v].copy()
+            hop_u[u], hop_v[v] = v, u
+            hop = np.where(use_backward, hop_v[:, None], hop_u[:, None])
+            dist[improved] = via[improved]
+            next_hop[improved] = hop[improved]
+        return AllPairsShortestPaths(dist, next_hop)
+
+    def distance(self, start, end):
+        return float(self.dist[start, end])
+
+    def path(self, start, end):
+        """
+        返回从 start 到 end 的节点下标列表，不可达时返回空列表
+        """
+        if self.next_hop[start, end] < 0:
+            return []
+        path = [start]
+        node = start
+        while node != end:
+            node = int(self.next_hop[node, end])
+            path.append(node)
+        return path
+
+    def save(self, prefix):
+        """保存为 {prefix}_dist.npy 与 {prefix}_next.npy"""
+        np.save(f"{prefix}_dist.npy", self.dist)
+        np.save(f"{prefix}_next.npy", self.next_hop)
+
+    @classmethod
+    def load(cls, prefix):
+        """读取 save 保存的矩阵，文件不存在时返回 None"""
+        try:
+            return cls(np.load(f"{prefix}_dist.npy"), np.load(f"{prefix}_next.npy"))
+        except (OSError, ValueError):
+            return None
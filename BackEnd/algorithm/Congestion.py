@@ -0,0 +1,142 @@
+import time
+import numpy as np
+
+# 一天的秒数
+DAY_SECONDS = 24 * 3600
+
+
+class CongestionStore:
+    """
+    分时拥挤度存储
+    - factors[e][s]: 第 e 条边在第 s 个时间片的拥挤度，取值 (0, 1]，1 表示畅通
+      实际速度 = 畅通速度 * 拥挤度，因此耗时不会低于畅通耗时（ALT 下界仍然有效）
+    - 时间片按本地时间从 0 点开始划分，一天共 slots 个
+    - 数组为 (边数, 时间片数) 的 float32，可整体保存为 .npy
+    边均用 RoadGraph 中的下标（edges 列表中的位置）表示
+    """
+
+    def __init__(self, factors):
+        factors = np.asarray(factors, dtype=np.float32)
+        if factors.ndim != 2 or factors.shape[1] == 0 or DAY_SECONDS % factors.shape[1]:
+            raise ValueError("拥挤度数组形状应为 (边数, 时间片数)，且时间片数能整除一天的秒数")
+        self.factors = factors
+        self.slot_seconds = DAY_SECONDS // factors.shape[1]
+        # 每次批量更新后加一，用于区分缓存
+        self.revision = 0
+
+    @property
+    def slots(self):
+        return self.factors.shape[1]
+
+    @property
+    def edge_count(self):
+        return self.factors.shape[0]
+
+    # ------------------------------------------------------------------ 生成与持久化
+
+    @classmethod
+    def simulate(cls, edge_count, slot_seconds=900, seed=0):
+        """
+        本地模拟器：早高峰、午间、晚高峰三个拥挤时段，每条边对高峰的敏感程度不同，
+        再叠加少量随机扰动，拥挤度范围 0.8~1.0
+        """
+        slots = DAY_SECONDS // slot_seconds
+        hours = (np.arange(slots) + 0.5) * slot_seconds / 3600
+        peak = np.zeros(slots)
+        for center, width, depth in ((8.0, 1.0, 1.0), (12.0, 0.75, 0.8), (17.5, 1.0, 0.9)):
+            peak = np.maximum(peak, depth * np.exp(-((hours - center) / width) ** 2))
+        rng = np.random.default_rng(seed)
+        sensitivity = rng.uniform(0.3, 1.0, (edge_count, 1))
+        noise = rng.uniform(0.0, 0.05, (edge_count, slots))
+        return cls(np.clip(1.0 - 0.15 * sensitivity * peak[None, :] - noise, 0.8, 1.0))
+
+    def save(self, path):
+        np.save(path, self.factors)
+
+    @classmethod
+    def load(cls, path):
+        """读取 save 保存的数组，文件不存在或格式不对时返回 None"""
+        try:
+            return cls(np.load(path))
+        except (OSError, ValueError):
+            return None
+
+    def resize(self, edge_count):
+        """
+        路网新增边后扩展数组，新边取现有各边在每个时间片的平均拥挤度
+        （替换为新数组，正在使用旧数组的查询不受影响）
+        """
+        extra = edge_count - self.edge_count
+        if extra <= 0:
+            return
+        if self.edge_count:
+            profile = self.factors.mean(axis=0, keepdims=True)
+        else:
+            profile = np.ones((1, self.slots), dtype=np.float32)
+        self.factors = np.vstack([self.factors, np.repeat(profile, extra, axis=0)])
+        self.revision += 1
+
+    # ------------------------------------------------------------------ 查询与更新
+
+    def slot_of(self, timestamp=None):
+        """返回时间戳（默认当前时间）所在的时间片编号"""
+        return int(self.seconds_of_day(timestamp) // self.slot_seconds) % self.slots
+
+    @staticmethod
+    def seconds_of_day(timestamp=None):
+        """时间戳对应的本地时间距当天 0 点的秒数"""
+        if timestamp is None:
+            timestamp = time.time()
+        local = time.localtime(timestamp)
+        return local.tm_hour * 3600 + local.tm_min * 60 + local.tm_sec + timestamp % 1
+
+    def factors_at(self, slot):
+        """某个时间片所有边的拥挤度"""
+        return self.factors[:, slot % self.slots]
+
+    def update(self, edges, values, slots=None):
+        """
+        批量更新拥挤度，无需重建路网
+        参数:
+            edges: 边下标数组
+            values: 对应的拥挤度，取值 (0, 1]
+            slots: 对应的时间片数组，为 None 时更新整天
+        """
+        edges = np.asarray(edges, dtype=np.int64)
+        values = np.asarray(values, dtype=np.float32)
+        if edges.shape != values.shape:
+            raise ValueError("edges 与 values 长度不一致")
+        if ((values <= 0) | (values > 1)).any():
+            raise ValueError("拥挤度取值范围为 (0, 1]")
+        if ((edges < 0) | (edges >= self.edge_count)).any():
+            raise ValueError("边不存在")
+        if slots is None:
+            self.factors[edges] = values[:, None]
+        else:
+            slots = np.asarray(slots, dtype=np.int64)
+            if slots.shape != edges.shape or ((slots < 0) | (slots >= self.slots)).any():
+                raise ValueError("时间片不存在")
+            self.factors[edges, slots] = values
+        self.revision += 1
+
+    def arrival(self, edge, free_time, t):
+        """
+        FIFO 时变行驶时间：从时刻 t 出发通过畅通耗时为 free_time 的边，返回到达时刻
+        每个时间片内按该时间片的速度行驶，跨时间片时换用下一时间片的速度，
+        因此更早出发不会更晚到达
+        参数:
+            edge: 边下标
+            free_time: 畅通耗时（秒）
+            t: 出发时刻，距出发当天 0 点的秒数（可以超过一天）
+        """
+        row = self.factors[edge]
+        remaining = free_time
+        while True:
+            slot = int(t // self.slot_seconds)
+            factor = float(row[slot % self.slots])
+            slot_end = (slot + 1) * self.slot_seconds
+            reach = (slot_end - t) * factor
+            if reach >= remaining:
+                return t + remaining / factor
+            remaining -= reach
+            t = slot_end
@@ -0,0 +1,255 @@
+import heapq
+
+INF = float('inf')
+
+
+class ContractionHierarchy:
+    """
+    无向图上的收缩层次（Contraction Hierarchies）
+    - 预处理：按优先级（边差 + 已收缩邻居数）依次收缩节点，必要时添加捷径边
+    - 查询：在只向高层级节点延伸的“上行图”中做双向 Dijkstra，再把捷径展开为原始路径
+    节点均用 0..n-1 的下标表示
+    """
+
+    def __init__(self, node_count):
+        self.node_count = node_count
+        # rank[v]: 节点 v 被收缩的次序，越大层级越高
+        self.rank = [0] * node_count
+        # 上行图 up[u] = [(v, weight)]，满足 rank[v] > rank[u]
+        self.up = [[] for _ in range(node_count)]
+        # 捷径 (min(u,w), max(u,w)) -> 中间节点
+        self.middle = {}
+        # 原始边 (min(u,v), max(u,v)) -> 交通方式
+        self.labels = {}
+        # 预处理产生的捷径 [(u, w, weight, middle)]
+        self.shortcuts = []
+
+    # ------------------------------------------------------------------ 预处理
+
+    @classmethod
+    def build(cls, node_count, edges, witness_limit=64):
+        """
+        离线预处理
+        参数:
+            node_count: 节点数
+            edges: 无向边 [(u, v, weight, mode)]
+            witness_limit: 见证搜索最多确定的节点数，越小预处理越快但捷径越多
+        返回:
+            ContractionHierarchy 实例
+        """
+        ch = cls(node_count)
+        adj = ch._base_adjacency(edges)
+
+        contracted = [False] * node_count
+        contracted_neighbors = [0] * node_count
+
+        def simulate(v):
+            """返回收缩 v 所需添加的捷径列表"""
+            neighbors = [(u, w) for u, w in adj[v].items() if not contracted[u]]
+            shortcuts = []
+            for i, (u, w_uv) in enumerate(neighbors):
+                if i == len(neighbors) - 1:
+                    break
+                max_cost = max(w_uv + w_vx for x, w_vx in neighbors[i + 1:])
+                witness = ch._witness_search(adj, contracted, u, v, max_cost, witness_limit)
+                for x, w_vx in neighbors[i + 1:]:
+                    cost = w_uv + w_vx
+                    if witness.get(x, INF) > cost:
+                        shortcuts.append((u, x, cost))
+            return shortcuts, len(neighbors)
+
+        def priority(v):
+            shortcuts, degree = simulate(v)
+            return len(shortcuts) - degree + contracted_neighbors[v]
+
+        heap = [(priority(v), v) for v in range(node_count)]
+        heapq.heapify(heap)
+        order = 0
+        while heap:
+            _, v = heapq.heappop(heap)
+            if contracted[v]:
+                continue
+            # 惰性更新：重新计算优先级，若不再最小则放回堆中
+            current = priority(v)
+            if heap and current > heap[0][0]:
+                heapq.heappush(heap, (current, v))
+                continue
+
+            shortcuts, _ = simulate(v)
+            for u, x, cost in shortcuts:
+                if cost < adj[u].get(x, INF):
+                    adj[u][x] = cost
+                    adj[x][u] = cost
+                    ch.middle[(min(u, x), max(u, x))] = v
+                    ch.shortcuts.append((u, x, cost, v))
+            contracted[v] = True
+            ch.rank[v] = order
+            order += 1
+            for u in adj[v]:
+                if not contracted[u]:
+                    contracted_neighbors[u] += 1
+
+        ch._build_upward(adj)
+        return ch
+
+    def _base_adjacency(self, edges):
+        """由原始边构造 {u: {v: weight}}，平行边只保留最短的一条"""
+        adj = [dict() for _ in range(self.node_count)]
+        for u, v, weight, mode in edges:
+            if u == v:
+                continue
+            if weight < adj[u].get(v, INF):
+                adj[u][v] = weight
+                adj[v][u] = weight
+                self.labels[(min(u, v), max(u, v))] = mode
+        return adj
+
+    @staticmethod
+    def _witness_search(adj, contracted, source, excluded, max_cost, limit):
+        """在未收缩子图中从 source 出发（不经过 excluded）的受限 Dijkstra"""
+        dist = {source: 0.0}
+        pq = [(0.0, source)]
+        settled = 0
+        while pq and settled < limit:
+            cost, node = heapq.heappop(pq)
+            if cost > dist[node]:
+                continue
+            if cost > max_cost:
+                break
+            settled += 1
+            for neighbor, weight in adj[node].items():
+                if neighbor == excluded or contracted[neighbor]:
+                    continue
+                new_cost = cost + weight
+                if new_cost < dist.get(neighbor, INF):
+                    dist[neighbor] = new_cost
+                    heapq.heappush(pq, (new_cost, neighbor))
+        return dist
+
+    def _build_upward(self, adj):
+        self.up = [[] for _ in range(self.node_count)]
+        for u in range(self.node_count):
+            for v, weight in adj[u].items():
+                if self.rank[v] > self.rank[u]:
+                    self.up[u].append((v, weight))
+
+    # ------------------------------------------------------------------ 查询
+
+    def query(self, start, end, stats=None):
+        """
+        双向上行 Dijkstra 查询
+        参数:
+            start: 起点下标
+            end: 终点下标
+            stats: 可选字典，写入 settled（确定的节点数）
+        返回:
+            path: 节点下标列表（已展开捷径）
+            total_cost: 路径总权重
+            modes: 每段原始边的交通方式
+        """
+        if start == end:
+            return [start], 0.0, []
+
+        dist = ({start: 0.0}, {end: 0.0})
+        parent = ({start: None}, {end: None})
+        heaps = ([(0.0, start)], [(0.0, end)])
+        best = INF
+        settled = 0
+
+        while heaps[0] or heaps[1]:
+            for side in (0, 1):
+                heap = heaps[side]
+                if not heap:
+                    continue
+                cost, node = heapq.heappop(heap)
+                if cost > dist[side][node]:
+                    continue
+                if cost >= best:
+                    # 该方向不可能再得到更短的路径
+                    heap.clear()
+                    continue
+                settled += 1
+                other = dist[1 - side].get(node)
+                if other is not None and cost + other < best:
+                    best = cost + other
+                for neighbor, weight in self.up[node]:
+                    new_cost = cost + weight
+                    if new_cost < dist[side].get(neighbor, INF):
+                        dist[side][neighbor] = new_cost
+                        parent[side][neighbor] = node
+                        heapq.heappush(heap, (new_cost, neighbor))
+
+        if stats is not None:
+            stats['settled'] = settled
+
+        meet, best = None, INF
+        forward, backward = dist
+        for node, cost in forward.items():
+            other = backward.get(node)
+            if other is not None and cost + other < best:
+                meet, best = node, cost + other
+        if meet is None:
+            return [], INF, []
+
+        # 上行路径：start -> meet -> end
+        upward = []
+        node = meet
+        while node is not None:
+            upward.append(node)
+            node = parent[0][node]
+        upward.reverse()
+        node = parent[1][meet]
+        while node is not None:
+            upward.append(node)
+            node = parent[1][node]
+
+        path = [upward[0]]
+        for i in range(len(upward) - 1):
+            path.extend(self._unpack(upward[i], upward[i + 1])[1:])
+        modes = [self.labels.get((min(u, v), max(u, v))) for u, v in zip(path, path[1:])]
+        return path, best, modes
+
+    def _unpack(self, u, v):
+        """将 u-v（可能是捷径）展开为原始节点序列"""
+        stack = [(u, v)]
+        path = [u]
+        while stack:
+            a, b = stack.pop()
+            mid = self.middle.get((min(a, b), max(a, b)))
+            if mid is None:
+                path.append(b)
+            else:
+                # 先处理 a-mid，再处理 mid-b
+                stack.append((mid, b))
+                stack.append((a, mid))
+        return path
+
+    # ------------------------------------------------------------------ 持久化
+
+    def to_dict(self):
+        """导出可 JSON 序列化的预处理结果（不包含原始边）"""
+        return {
+            "node_count": self.node_count,
+            "rank": self.rank,
+            "shortcuts": [list(item) for item in self.shortcuts],
+        }
+
+    @classmethod
+    def from_dict(cls, data, edges):
+        """
+        由 to_dict 的结果和原始边恢复
+        参数:
+            data: to_dict 导出的字典
+            edges: 预处理时使用的原始边 [(u, v, weight, mode)]
+        """
+        ch = cls(data["node_count"])
+        ch.rank = list(data["rank"])
+        adj = ch._base_adjacency(edges)
+        for u, x, cost, mid in data["shortcuts"]:
+            if cost < adj[u].get(x, INF):
+                adj[u][x] = cost
+                adj[x][u] = cost
+                ch.middle[(min(u, x), max(u, x))] = mid
+            ch.shortcuts.append((u, x, cost, mid))
+        ch._build_upward(adj)
+        return ch
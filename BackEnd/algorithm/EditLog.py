@@ -0,0 +1,127 @@
+import json
+import os
+
+
+class EditLog:
+    """
+    只追加的地图编辑日志（JSON Lines，每行一条记录）
+    - 每次修改只在文件末尾追加一行，不再整体重写 map.json
+    - 记录格式: {"version": 修改后的路网版本, "op": "add_node" | "add_edge" | "import", ...}
+      add_node/add_edge 带 "node"/"edge"（新增的实体），import 带 "nodes"/"edges"（整批导入的实体）
+    - 启动时先读快照（map.json），再按顺序重放版本号大于快照版本的记录
+    - 压缩（compaction）时由调用方重写快照后调用 truncate 清空日志
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.count = len(self.read())
+
+    def __len__(self):
+        return self.count
+
+    def append(self, record):
+        """追加一条记录并刷到磁盘"""
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        self.count += 1
+
+    def read(self):
+        """
+        读取全部记录
+        写入中途崩溃可能留下不完整的最后一行，该行及之后的内容被忽略
+        """
+        if not os.path.exists(self.path):
+            return []
+        records = []
+        with open(self.path, "r", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    records.append(json.loads(line))
+                except json.JSONDecodeError:
+                    break
+        return records
+
+    def truncate(self):
+        """清空日志（快照已包含全部修改后调用）"""
+        with open(self.path, "w", encoding="utf-8"):
+            pass
+        self.count = 0
+
+
+class EditIndex:
+    """
+    编辑校验用的常驻索引，新增节点/边时的查重与应用均为 O(1)
+    - node_position: 节点ID -> 在节点列表中的位置（节点只追加，位置不变）
+    - edge_ids / edge_pairs: 已有的边ID、无向端点对
+    - next_node_id / next_edge_id: 未指定ID时分配的下一个编号
+    """
+
+    def __init__(self, nodes, edges):
+        self.node_position = {node["id"]: i for i, node in enumerate(nodes)}
+        self.edge_ids = set()
+        self.edge_pairs = set()
+        for edge in edges:
+            self.edge_ids.add(edge["id"])
+            self.edge_pairs.add(self.pair(edge["start_node"], edge["end_node"]))
+        self.next_node_id = max(self.node_position, default=-1) + 1
+        self.next_edge_id = max(self.edge_ids, default=-1) + 1
+
+    @staticmethod
+    def pair(u, v):
+        return (u, v) if u <= v else (v, u)
+
+    def has_node(self, node_id):
+        return node_id in self.node_position
+
+    def has_edge(self, edge_id, start_node, end_node):
+        """边ID重复或两端点之间已有边"""
+        return edge_id in self.edge_ids or self.pair(start_node, end_node) in self.edge_pairs
+
+    def apply(self, nodes, edges, record):
+        """
+        把一条编辑记录应用到节点/边列表上（原地追加）
+        新增边时端点节点替换为修改后的副本，原字典保持不变，
+        因此传入复制后的列表即可不影响旧快照
+        """
+        op = record["op"]
+        if op == "add_node":
+            self._add_node(nodes, record["node"])
+        elif op == "add_edge":
+            self._add_edge(nodes, edges, record["edge"], None)
+        elif op == "import":
+            for node in record["nodes"]:
+                self._add_node(nodes, node)
+            # 每个已有节点只复制一次，之后在副本上继续追加
+            copied = {node["id"] for node in record["nodes"]}
+            for edge in record["edges"]:
+                self._add_edge(nodes, edges, edge, copied)
+        else:
+            raise ValueError(f"未知的编辑操作: {op}")
+
+    def _add_node(self, nodes, node):
+        self.node_position[node["id"]] = len(nodes)
+        nodes.append(node)
+        self.next_node_id = max(self.next_node_id, node["id"] + 1)
+
+    def _add_edge(self, nodes, edges, edge, copied):
+        edges.append(edge)
+        self.edge_ids.add(edge["id"])
+        self.edge_pairs.add(self.pair(edge["start_node"], edge["end_node"]))
+        self.next_edge_id = max(self.next_edge_id, edge["id"] + 1)
+        for endpoint in (edge["start_node"], edge["end_node"]):
+            position = self.node_position.get(endpoint)
+            if position is None:
+                continue
+            if copied is None or endpoint not in copied:
+                updated = dict(nodes[position])
+                updated["connected_edges"] = list(updated.get("connected_edges", []))
+                nodes[position] = updated
+                if copied is not None:
+                    copied.add(endpoint)
+            nodes[position]["connected_edges"].append(edge["id"])
@@ -0,0 +1,120 @@
+import math
+import numpy as np
+
+# 地球半径（米）
+EARTH_RADIUS = 6371000
+# 每纬度对应的米数
+METERS_PER_DEGREE = EARTH_RADIUS * math.pi / 180
+
+# 等距矩形近似的适用范围：两点距离不超过 10km 且纬度绝对值不超过 70°
+FAST_PATH_MAX_DISTANCE = 10000.0
+FAST_PATH_MAX_LATITUDE = 70.0
+
+
+def haversine(lat1, lon1, lat2, lon2):
+    """
+    计算两点间的地球表面距离（米），使用 Haversine 公式
+    """
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    dphi = math.radians(lat2 - lat1)
+    dlambda = math.radians(lon2 - lon1)
+    a = math.sin(dphi/2)**2 + math.cos(phi1) * math.cos(phi2) * math.sin(dlambda/2)**2
+    return 2 * EARTH_RADIUS * math.atan2(math.sqrt(a), math.sqrt(1 - a))
+
+
+def haversine_array(lat1, lon1, lat2, lon2):
+    """
+    向量化 Haversine（米），参数按 NumPy 规则广播：
+        - 标量 vs 数组：一对多
+        - 等长数组：逐对计算（如路径上相邻节点）
+        - lat1[:, None] vs lat2[None, :]：多对多
+    """
+    phi1 = np.radians(lat1)
+    phi2 = np.radians(lat2)
+    dphi = phi2 - phi1
+    dlambda = np.radians(np.subtract(lon2, lon1))
+    a = np.sin(dphi / 2) ** 2 + np.cos(phi1) * np.cos(phi2) * np.sin(dlambda / 2) ** 2
+    return 2 * EARTH_RADIUS * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+
+def haversine_matrix(lats1, lons1, lats2, lons2):
+    """多对多距离矩阵，形状 (len(lats1), len(lats2))"""
+    lats1, lons1 = np.asarray(lats1, dtype=np.float64), np.asarray(lons1, dtype=np.float64)
+    lats2, lons2 = np.asarray(lats2, dtype=np.float64), np.asarray(lons2, dtype=np.float64)
+    return haversine_array(lats1[:, None], lons1[:, None], lats2[None, :], lons2[None, :])
+
+
+def equirectangular_array(lat1, lon1, lat2, lon2):
+    """
+    等距矩形近似（米），以两点平均纬度换算经度，广播规则同 haversine_array
+    在 FAST_PATH 范围内相对误差不超过 equirectangular_error_bound 给出的上界
+    """
+    mean_phi = np.radians((np.add(lat1, lat2)) / 2)
+    x = np.radians(np.subtract(lon2, lon1)) * np.cos(mean_phi)
+    y = np.radians(np.subtract(lat2, lat1))
+    return EARTH_RADIUS * np.hypot(x, y)
+
+
+def equirectangular_error_bound(distance, max_latitude):
+    """
+    等距矩形近似相对 Haversine 的误差上界（米）：
+        |误差| <= d * (d / R)^2 / (8 * cos^2(φ))，φ 为两点纬度绝对值的最大值
+    例如 10km、纬度 70° 时不超过约 2.6cm
+    """
+    cos_phi = math.cos(math.radians(min(abs(max_latitude), 89.9)))
+    return distance * (distance / EARTH_RADIUS) ** 2 / (8 * cos_phi ** 2)
+
+
+class GeoPoints:
+    """
+    一个数据集（路网节点、美食等）的坐标数组，提供一对多 / 多对多距离计算
+    """
+
+    def __init__(self, latitudes, longitudes):
+        self.latitudes = np.asarray(latitudes, dtype=np.float64)
+        self.longitudes = np.asarray(longitudes, dtype=np.float64)
+        if len(self.latitudes):
+            self.bounds = (float(self.latitudes.min()), float(self.longitudes.min()),
+                           float(self.latitudes.max()), float(self.longitudes.max()))
+        else:
+            self.bounds = None
+
+    @classmethod
+    def from_records(cls, records, lat_key="latitude", lon_key="longitude"):
+        return cls([record.get(lat_key, 0.0) for record in records],
+                   [record.get(lon_key, 0.0) for record in records])
+
+    def __len__(self):
+        return len(self.latitudes)
+
+    def _fast_path_ok(self, latitude, longitude):
+        """查询点与数据集的外包矩形对角线不超过 FAST_PATH_MAX_DISTANCE，且纬度在适用范围内"""
+        if self.bounds is None:
+            return False
+        min_lat, min_lon, max_lat, max_lon = self.bounds
+        min_lat, max_lat = min(min_lat, latitude), max(max_lat, latitude)
+        min_lon, max_lon = min(min_lon, longitude), max(max_lon, longitude)
+        if max(abs(min_lat), abs(max_lat)) > FAST_PATH_MAX_LATITUDE:
+            return False
+        return haversine(min_lat, min_lon, max_lat, max_lon) <= FAST_PATH_MAX_DISTANCE
+
+    def distances_from(self, latitude, longitude, fast=False, index=None):
+        """
+        查询点到数据集中各点的距离（米）
+        参数:
+            fast: 为 True 且在适用范围内时使用等距矩形近似，否则使用 Haversine
+            index: 可选下标数组，只计算这些点
+        """
+        lats, lons = self.latitudes, self.longitudes
+        if index is not None:
+            lats, lons = lats[index], lons[index]
+        if fast and self._fast_path_ok(latitude, longitude):
+            return equirectangular_array(latitude, longitude, lats, lons)
+        return haversine_array(latitude, longitude, lats, lons)
+
+    def path_length(self, index):
+        """按下标顺序经过各点的总距离（米）"""
+        if len(index) < 2:
+            return 0.0
+        lats, lons = self.latitudes[index], self.longitudes[index]
+        return float(haversine_array(lats[:-1], lons[:-1], lats[1:], lons[1:]).sum())
@@ -0,0 +1,377 @@
+from collections.abc import Mapping
+import numpy as np
+from algorithm.Geo import GeoPoints
+from algorithm.LRUCache import LRUCache
+
+# 基础交通方式
+TRAFFIC_MODES = ("walk", "bike", "ebike")
+# 仅按距离计算时使用的模式名
+DISTANCE_MODE = "distance"
+# 出行方式 -> 可组合使用的基础交通方式
+MODE_COMBINATIONS = {
+    "walk": ("walk",),
+    "bike": ("bike",),
+    "ebike": ("ebike",),
+    "walk_bike": ("walk", "bike"),
+    "walk_ebike": ("walk", "ebike"),
+}
+# 按拥挤度生成的邻接表等结构在快照内最多缓存的份数（出行方式 x 时间片 x 拥挤度版本）
+CROWD_CACHE_SIZE = 16
+
+
+class CSR:
+    """
+    压缩稀疏行（CSR）格式的邻接结构，无向边按两条有向弧存储
+    属性:
+        offsets: 长度为 n+1 的数组，第 i 个节点的出弧位于 [offsets[i], offsets[i+1])
+        targets: 弧的终点（节点下标）
+        weights: 弧的权重（距离模式为米，交通方式为畅通时的秒数）
+        edge_index: 弧对应的边下标（即 edge_u/edge_v 等边数组中的位置），用于叠加拥挤度
+    """
+    __slots__ = ("offsets", "targets", "weights", "edge_index")
+
+    def __init__(self, offsets, targets, weights, edge_index):
+        self.offsets = offsets
+        self.targets = targets
+        self.weights = weights
+        self.edge_index = edge_index
+
+    def neighbors(self, index):
+        """返回节点下标 index 的 (邻居下标数组, 权重数组)"""
+        lo, hi = self.offsets[index], self.offsets[index + 1]
+        return self.targets[lo:hi], self.weights[lo:hi]
+
+
+class OverlayAdjacency(dict):
+    """
+    在只读邻接表（如 RoadGraph.adjacency 的缓存结果）上叠加临时节点与临时弧
+    - 只有新增了弧的节点在本字典中保存复制后的弧列表，其余节点直接读取原邻接表
+    - 原邻接表不会被修改，可在单次查询内使用后直接丢弃
+    """
+
+    def __init__(self, base):
+        super().__init__()
+        self.base = base
+
+    def __missing__(self, node):
+        return self.base[node]
+
+    def __contains__(self, node):
+        return dict.__contains__(self, node) or node in self.base
+
+    def add_arc(self, node, arc):
+        """为 node 追加一条出弧，arc 的格式与原邻接表一致"""
+        if not dict.__contains__(self, node):
+            self[node] = list(self.base.get(node, ()))
+        self[node].append(arc)
+
+
+class _NodesById(Mapping):
+    """节点ID -> 节点字典 的只读视图（节点按下标从 nodes 序列中取出）"""
+
+    def __init__(self, nodes, index_of):
+        self.nodes = nodes
+        self.index_of = index_of
+
+    def __getitem__(self, node_id):
+        return self.nodes[self.index_of[node_id]]
+
+    def __contains__(self, node_id):
+        return node_id in self.index_of
+
+    def __iter__(self):
+        return iter(self.index_of)
+
+    def __len__(self):
+        return len(self.index_of)
+
+
+class RoadGraph:
+    """
+    常驻内存的只读路网快照
+    - 节点与边保留 map.json 中的原始字典，用于接口返回（从二进制路网文件加载时为按需生成字典的只读视图）
+    - 按模式（distance/walk/bike/ebike）维护 CSR 数组
+    - 维护 名称->ID、ID->节点、ID->下标 索引
+    - version 随 add_node/add_edge 递增，修改时构造新快照整体替换，读者不会看到中间状态
+    """
+
+    def __init__(self, nodes, edges, version=0):
+        self.version = version
+        self.nodes = nodes
+        self.edges = edges
+
+        # 节点索引
+        self.node_ids = np.array([node['id'] for node in nodes], dtype=np.int64)
+        self.index_of = {node['id']: i for i, node in enumerate(nodes)}
+        self.nodes_by_id = {node['id']: node for node in nodes}
+        self.name_to_id = {}
+        for node in nodes:
+            # 与原先 next(...) 的线性查找保持一致：同名时取第一个
+            self.name_to_id.setdefault(node.get('name', ''), node['id'])
+        self.latitudes = np.array([node.get('latitude', 0.0) for node in nodes], dtype=np.float64)
+        self.longitudes = np.array([node.get('longitude', 0.0) for node in nodes], dtype=np.float64)
+        self.geo = GeoPoints(self.latitudes, self.longitudes)
+
+        # 边数组（忽略端点不存在的边）
+        valid = [i for i, edge in enumerate(edges)
+                 if edge['start_node'] in self.index_of and edge['end_node'] in self.index_of]
+        self.edge_positions = np.array(valid, dtype=np.int64)
+        # 边ID -> 边下标
+        self.edge_index_of = {edges[i]['id']: k for k, i in enumerate(valid)}
+        self.edge_u = np.array([self.index_of[edges[i]['start_node']] for i in valid], dtype=np.int64)
+        self.edge_v = np.array([self.index_of[edges[i]['end_node']] for i in valid], dtype=np.int64)
+        self.edge_distance = np.array([edges[i]['distance'] for i in valid], dtype=np.float64)
+        self.edge_speed = {
+            mode: np.array([edges[i].get(f'{mode}_speed', 0.0) or 0.0 for i in valid], dtype=np.float64)
+            for mode in TRAFFIC_MODES
+        }
+
+        self.csr = {DISTANCE_MODE: self._build_csr(np.ones(len(valid), dtype=bool), self.edge_distance)}
+        for mode in TRAFFIC_MODES:
+            speed = self.edge_speed[mode]
+            mask = speed > 0
+            free_time = np.zeros(len(valid), dtype=np.float64)
+            free_time[mask] = self.edge_distance[mask] / speed[mask]
+            self.csr[mode] = self._build_csr(mask, free_time)
+
+        self._adjacency_cache = {}
+        self._crowd_cache = LRUCache(CROWD_CACHE_SIZE)
+        self._pair_index = None
+
+    @classmethod
+    def from_arrays(cls, nodes, edges, names, node_ids, latitudes, longitudes, edge_ids, edge_u, edge_v,
+                    edge_distance, edge_speed, csr, version=0):
+        """
+        由现成的数组构造快照，不逐个解析节点/边字典（用于内存映射的二进制路网文件，见 GraphFile）
+        参数:
+            nodes / edges: 按下标取节点、边字典的序列（可为按需生成字典的只读视图），edges 中只含有效边
+            names: 节点名称序列
+            node_ids / latitudes / longitudes: 节点数组
+            edge_ids / edge_u / edge_v / edge_distance: 边数组，端点为节点下标
+            edge_speed: {基础交通方式: 速度数组}
+            csr: {模式: CSR}，包含 distance 与各基础交通方式
+        """
+        graph = cls.__new__(cls)
+        graph.version = version
+        graph.nodes = nodes
+        graph.edges = edges
+        graph.node_ids = node_ids
+        ids = node_ids.tolist()
+        graph.index_of = dict(zip(ids, range(len(ids))))
+        graph.nodes_by_id = _NodesById(nodes, graph.index_of)
+        graph.name_to_id = {}
+        for name, node_id in zip(names, ids):
+            graph.name_to_id.setdefault(name, node_id)
+        graph.latitudes = latitudes
+        graph.longitudes = longitudes
+        graph.geo = GeoPoints(latitudes, longitudes)
+        graph.edge_positions = np.arange(len(edge_ids), dtype=np.int64)
+        graph.edge_index_of = dict(zip(edge_ids.tolist(), range(len(edge_ids))))
+        graph.edge_u = edge_u
+        graph.edge_v = edge_v
+        graph.edge_distance = edge_distance
+        graph.edge_speed = dict(edge_speed)
+        graph.csr = dict(csr)
+        graph._adjacency_cache = {}
+        graph._crowd_cache = LRUCache(CROWD_CACHE_SIZE)
+        graph._pair_index = None
+        return graph
+
+    @property
+    def node_count(self):
+        return len(self.nodes)
+
+    @property
+    def edge_count(self):
+        return len(self.edge_positions)
+
+    def _build_csr(self, mask, weights):
+        """由边掩码和边权构造双向 CSR"""
+        n = len(self.nodes)
+        edge_index = np.nonzero(mask)[0]
+        src = np.concatenate((self.edge_u[edge_index], self.edge_v[edge_index]))
+        dst = np.concatenate((self.edge_v[edge_index], self.edge_u[edge_index]))
+        arc_edge = np.concatenate((edge_index, edge_index))
+        order = np.argsort(src, kind='stable')
+        offsets = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(np.bincount(src, minlength=n), out=offsets[1:])
+        return CSR(offsets, dst[order], weights[arc_edge[order]], arc_edge[order])
+
+    def mode_csr(self, traffic_mode):
+        """
+        获取出行方式对应的 CSR，组合方式合并各基础交通方式的弧（平行弧均保留）
+        参数:
+            traffic_mode: 出行方式，不在 MODE_COMBINATIONS 中时按距离计算
+        """
+        if traffic_mode not in MODE_COMBINATIONS:
+            return self.csr[DISTANCE_MODE]
+        modes = MODE_COMBINATIONS[traffic_mode]
+        if len(modes) == 1:
+            return self.csr[modes[0]]
+        cached = self._adjacency_cache.get(('csr', traffic_mode))
+        if cached is not None:
+            return cached
+        n = len(self.nodes)
+        parts = [self.csr[mode] for mode in modes]
+        src = np.concatenate([np.repeat(np.arange(n), np.diff(csr.offsets)) for csr in parts])
+        order = np.argsort(src, kind='stable')
+        offsets = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(np.bincount(src, minlength=n), out=offsets[1:])
+        merged = CSR(offsets,
+                     np.concatenate([csr.targets for csr in parts])[order],
+                     np.concatenate([csr.weights for csr in parts])[order],
+                     np.concatenate([csr.edge_index for csr in parts])[order])
+        self._adjacency_cache[('csr', traffic_mode)] = merged
+        return merged
+
+    def resolve(self, name):
+        """根据节点名称查找ID，不存在时返回 -1"""
+        return self.name_to_id.get(name, -1)
+
+    def node(self, node_id):
+        """根据ID查找节点信息"""
+        return self.nodes_by_id[node_id]
+
+    def adjacency(self, traffic_mode, crowd=None, crowd_key=None):
+        """
+        生成搜索算法使用的邻接表
+        参数:
+            traffic_mode: 出行方式，不在 MODE_COMBINATIONS 中时按距离建图（结果在快照内缓存，调用方不得修改）
+            crowd: 每条边的拥挤度数组，按交通方式建图时必须给出
+            crowd_key: crowd 的标识（如 (时间片, 拥挤度版本)），给出时结果按 (出行方式, crowd_key) 在快照内缓存
+        返回:
+            邻接表 {node_id: [(neighbor_id, weight, mode)]}
+        """
+        if traffic_mode not in MODE_COMBINATIONS:
+            # 距离邻接表与拥挤度无关，在快照内缓存
+            cached = self._adjacency_cache.get(DISTANCE_MODE)
+            if cached is None:
+                cached = self._csr_to_adjacency([(DISTANCE_MODE, DISTANCE_MODE, None)])
+                self._adjacency_cache[DISTANCE_MODE] = cached
+            return cached
+
+        if crowd is None:
+            raise ValueError("按交通方式建图需要给出各边的拥挤度")
+        build = lambda: self._csr_to_adjacency([(mode, mode, crowd) for mode in MODE_COMBINATIONS[traffic_mode]])
+        if crowd_key is None:
+            return build()
+        return self.crowd_cached(("adjacency", traffic_mode, crowd_key), build)
+
+    def crowd_cached(self, key, build):
+        """
+        按拥挤度生成的结构（邻接表等）的快照内缓存，最多保留 CROWD_CACHE_SIZE 份，调用方不得修改结果
+        参数:
+            key: 缓存键，需包含拥挤度的标识
+            build: 未命中时调用的无参函数
+        """
+        cached = self._crowd_cache.get(key)
+        if cached is None:
+            cached = build()
+            self._crowd_cache.put(key, cached)
+        return cached
+
+    def time_dependent_adjacency(self, traffic_mode):
+        """
+        生成时变搜索使用的邻接表（结果在快照内缓存，调用方不得修改）
+        返回:
+            邻接表 {node_id: [(neighbor_id, 畅通耗时, mode, 边下标)]}
+        """
+        key = ('td', traffic_mode)
+        cached = self._adjacency_cache.get(key)
+        if cached is not None:
+            return cached
+        ids = self.node_ids.tolist()
+        graph = {node_id: [] for node_id in ids}
+        for mode in MODE_COMBINATIONS[traffic_mode]:
+            csr = self.csr[mode]
+            offsets = csr.offsets.tolist()
+            targets = csr.targets.tolist()
+            weights = csr.weights.tolist()
+            edge_index = csr.edge_index.tolist()
+            for i, node_id in enumerate(ids):
+                arcs = graph[node_id]
+                for k in range(offsets[i], offsets[i + 1]):
+                    arcs.append((ids[targets[k]], weights[k], mode, edge_index[k]))
+        self._adjacency_cache[key] = graph
+        return graph
+
+    def _csr_to_adjacency(self, layers):
+        ids = self.node_ids.tolist()
+        graph = {node_id: [] for node_id in ids}
+        for csr_mode, label, crowd in layers:
+            csr = self.csr[csr_mode]
+            weights = csr.weights if crowd is None else csr.weights / crowd[csr.edge_index]
+            offsets = csr.offsets.tolist()
+            targets = csr.targets.tolist()
+            weights = weights.tolist()
+            for i, node_id in enumerate(ids):
+                arcs = graph[node_id]
+                for k in range(offsets[i], offsets[i + 1]):
+                    arcs.append((ids[targets[k]], weights[k], label))
+        return graph
+
+    def find_edge(self, u, v, mode=DISTANCE_MODE):
+        """
+        查找节点下标 u、v 之间在 mode 下权重最小的边
+        返回:
+            边下标，不存在时返回 -1
+        """
+        if self._pair_index is None:
+            pair_index = {}
+            for i, (a, b) in enumerate(zip(self.edge_u.tolist(), self.edge_v.tolist())):
+                pair_index.setdefault((min(a, b), max(a, b)), []).append(i)
+            self._pair_index = pair_index
+        best, best_weight = -1, float('inf')
+        for i in self._pair_index.get((min(u, v), max(u, v)), []):
+            if mode == DISTANCE_MODE:
+                weight = self.edge_distance[i]
+            elif self.edge_speed[mode][i] > 0:
+                weight = self.edge_distance[i] / self.edge_speed[mode][i]
+            else:
+                continue
+            if weight < best_weight:
+                best, best_weight = i, weight
+        return best
+
+    def best_mode(self, u, v, traffic_mode):
+        """
+        查找节点下标 u、v 之间在该出行方式下畅通耗时最短的边
+        返回:
+            (边下标, 交通方式)，不存在时返回 (-1, None)
+        """
+        best, best_mode, best_time = -1, None, float('inf')
+        for mode in MODE_COMBINATIONS.get(traffic_mode, ()):
+            edge = self.find_edge(u, v, mode)
+            if edge >= 0:
+                time = self.edge_distance[edge] / self.edge_speed[mode][edge]
+                if time < best_time:
+                    best, best_mode, best_time = edge, mode, time
+        return best, best_mode
+
+    def edge_list(self, traffic_mode):
+        """
+        按出行方式返回无向边列表，组合方式下每条边取畅通时耗时最短的交通方式
+        参数:
+            traffic_mode: 出行方式，不在 MODE_COMBINATIONS 中时按距离计算
+        返回:
+            [(u下标, v下标, 权重, 交通方式)]
+        """
+        if traffic_mode not in MODE_COMBINATIONS:
+            return list(zip(self.edge_u.tolist(), self.edge_v.tolist(),
+                            self.edge_distance.tolist(), [DISTANCE_MODE] * self.edge_count))
+        best = [None] * self.edge_count
+        for mode in MODE_COMBINATIONS[traffic_mode]:
+            speed = self.edge_speed[mode].tolist()
+            for i, distance in enumerate(self.edge_distance.tolist()):
+                if speed[i] > 0:
+                    time = distance / speed[i]
+                    if best[i] is None or time < best[i][0]:
+                        best[i] = (time, mode)
+        u, v = self.edge_u.tolist(), self.edge_v.tolist()
+        return [(u[i], v[i], item[0], item[1]) for i, item in enumerate(best) if item is not None]
+
+    def to_dict(self):
+        """导出为 map.json 格式"""
+        nodes = self.nodes if isinstance(self.nodes, list) else list(self.nodes)
+        edges = self.edges if isinstance(self.edges, list) else list(self.edges)
+        return {"nodes": nodes, "edges": edges, "version": self.version}
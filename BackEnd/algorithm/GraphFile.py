@@ -0,0 +1,209 @@
+import json
+import os
+from collections.abc import Sequence
+import numpy as np
+from algorithm.Graph import RoadGraph, CSR, DISTANCE_MODE, TRAFFIC_MODES
+
+# 文件头标识（8 字节）与格式版本
+MAGIC = b"RGRAPH\x00\x01"
+FORMAT_VERSION = 1
+# 每个数组的起始位置按该字节数对齐
+ALIGNMENT = 64
+
+# 以数组形式保存的节点/边字段，其余字段按 JSON 存入附加字段字符串表
+NODE_FIELDS = ("id", "name", "type", "longitude", "latitude", "connected_edges")
+EDGE_FIELDS = ("id", "start_node", "end_node", "distance") + tuple(f"{mode}_speed" for mode in TRAFFIC_MODES)
+# 保存 CSR 的模式（组合出行方式由 RoadGraph.mode_csr 按需合并）
+CSR_MODES = (DISTANCE_MODE,) + TRAFFIC_MODES
+
+
+class StringTable(Sequence):
+    """
+    字符串表：UTF-8 字节串首尾相接存放，第 i 个字符串位于 data[offsets[i]:offsets[i+1]]
+    """
+
+    def __init__(self, offsets, data):
+        self.offsets = offsets
+        self.data = data
+
+    @staticmethod
+    def encode(strings):
+        """字符串列表 -> (offsets, data) 两个数组"""
+        encoded = [s.encode("utf-8") for s in strings]
+        offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        np.cumsum([len(b) for b in encoded], out=offsets[1:])
+        return offsets, np.frombuffer(b"".join(encoded), dtype=np.uint8)
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError(index)
+        return self.data[self.offsets[index]:self.offsets[index + 1]].tobytes().decode("utf-8")
+
+    def tolist(self):
+        """一次性解码全部字符串"""
+        blob = self.data.tobytes()
+        offsets = self.offsets.tolist()
+        return [blob[offsets[i]:offsets[i + 1]].decode("utf-8") for i in range(len(self))]
+
+
+class _RecordTable(Sequence):
+    """按下标从数组中即时生成节点/边字典的只读序列（每次访问返回新字典，修改不影响快照）"""
+
+    def __init__(self, count, build):
+        self.count = count
+        self.build = build
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self.build(i) for i in range(*index.indices(self.count))]
+        if index < 0:
+            index += self.count
+        if not 0 <= index < self.count:
+            raise IndexError(index)
+        return self.build(index)
+
+
+def _extras(record, fields):
+    """字典中不以数组保存的字段，序列化为 JSON（没有时为空串）"""
+    extra = {key: value for key, value in record.items() if key not in fields}
+    return json.dumps(extra, ensure_ascii=False, separators=(",", ":")) if extra else ""
+
+
+def write_graph_file(path, road):
+    """
+    把路网快照写为二进制文件（先写临时文件再原子替换，已映射旧文件的进程不受影响）
+    布局: MAGIC | 头部长度（uint64）| 头部 JSON | 数据区（各数组均按 ALIGNMENT 对齐）
+    - 节点: node_ids / latitudes / longitudes，名称、类型与附加字段为字符串表
+    - 边: edge_ids / edge_u / edge_v（节点下标）/ edge_distance / 各交通方式速度，附加字段为字符串表；
+      端点不存在的边不写入
+    - CSR: distance 与各基础交通方式的 offsets / targets / weights / edge_index
+    - connected_edges 不保存，加载后由 distance 模式的 CSR 还原
+    """
+    nodes = road.nodes
+    arrays = {
+        "node_ids": road.node_ids,
+        "latitudes": road.latitudes,
+        "longitudes": road.longitudes,
+        "edge_ids": np.array([road.edges[p]["id"] for p in road.edge_positions.tolist()], dtype=np.int64),
+        "edge_u": road.edge_u,
+        "edge_v": road.edge_v,
+        "edge_distance": road.edge_distance,
+    }
+    for mode in TRAFFIC_MODES:
+        arrays[f"edge_speed_{mode}"] = road.edge_speed[mode]
+    for mode in CSR_MODES:
+        csr = road.csr[mode]
+        for field in CSR.__slots__:
+            arrays[f"csr_{mode}_{field}"] = getattr(csr, field)
+    node_records = [nodes[i] for i in range(len(nodes))]
+    edge_records = [road.edges[p] for p in road.edge_positions.tolist()]
+    tables = {
+        "names": [node.get("name", "") for node in node_records],
+        "types": [node.get("type", "") for node in node_records],
+        "node_extras": [_extras(node, NODE_FIELDS) for node in node_records],
+        "edge_extras": [_extras(edge, EDGE_FIELDS) for edge in edge_records],
+    }
+    for name, strings in tables.items():
+        arrays[f"{name}_offsets"], arrays[f"{name}_data"] = StringTable.encode(strings)
+
+    # 数组位置相对于数据区起点，数据区紧跟在头部之后并按 ALIGNMENT 对齐
+    layout, position = {}, 0
+    for name, array in arrays.items():
+        array = np.ascontiguousarray(array)
+        arrays[name] = array
+        layout[name] = [array.dtype.str, len(array), position]
+        position += _aligned(array.nbytes)
+    header = {"format": FORMAT_VERSION, "version": road.version, "arrays": layout}
+    header_bytes = json.dumps(header, separators=(",", ":")).encode("utf-8")
+    base = _aligned(len(MAGIC) + 8 + len(header_bytes))
+
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    temp_path = f"{path}.tmp"
+    with open(temp_path, "wb") as f:
+        f.write(MAGIC)
+        f.write(len(header_bytes).to_bytes(8, "little"))
+        f.write(header_bytes)
+        for name, array in arrays.items():
+            f.seek(base + layout[name][2])
+            f.write(array.tobytes())
+        f.truncate(base + position)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temp_path, path)
+
+
+def _aligned(size):
+    return -(-size // ALIGNMENT) * ALIGNMENT
+
+
+def read_graph_header(path):
+    """读取文件头，返回 (头部字典, 数据区起始位置)"""
+    with open(path, "rb") as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"不是二进制路网文件: {path}")
+        length = int.from_bytes(f.read(8), "little")
+        header = json.loads(f.read(length).decode("utf-8"))
+    if header.get("format") != FORMAT_VERSION:
+        raise ValueError(f"不支持的路网文件格式版本: {header.get('format')}")
+    return header, _aligned(len(MAGIC) + 8 + length)
+
+
+def load_graph_file(path):
+    """
+    以只读内存映射方式加载二进制路网文件，返回 RoadGraph
+    - 各数组直接映射文件内容，多个进程（如多个 uvicorn worker）共享同一份页缓存
+    - 节点/边字典在访问时才由数组生成；每个进程只额外构建 ID/名称 -> 下标 的字典
+    """
+    header, base = read_graph_header(path)
+    buffer = np.memmap(path, dtype=np.uint8, mode="r")
+    arrays = {}
+    for name, (dtype, length, offset) in header["arrays"].items():
+        dtype = np.dtype(dtype)
+        start = base + offset
+        arrays[name] = buffer[start:start + length * dtype.itemsize].view(dtype)
+
+    csr = {mode: CSR(*(arrays[f"csr_{mode}_{field}"] for field in CSR.__slots__)) for mode in CSR_MODES}
+    names, types, node_extras, edge_extras = (
+        StringTable(arrays[f"{name}_offsets"], arrays[f"{name}_data"])
+        for name in ("names", "types", "node_extras", "edge_extras"))
+    node_ids, edge_ids = arrays["node_ids"], arrays["edge_ids"]
+    latitudes, longitudes = arrays["latitudes"], arrays["longitudes"]
+    edge_u, edge_v, edge_distance = arrays["edge_u"], arrays["edge_v"], arrays["edge_distance"]
+    edge_speed = {mode: arrays[f"edge_speed_{mode}"] for mode in TRAFFIC_MODES}
+    arc_offsets, arc_edges = csr[DISTANCE_MODE].offsets, csr[DISTANCE_MODE].edge_index
+
+    def build_node(i):
+        node = {"id": int(node_ids[i]), "name": names[i], "type": types[i]}
+        extra = node_extras[i]
+        if extra:
+            node.update(json.loads(extra))
+        node["longitude"] = float(longitudes[i])
+        node["latitude"] = float(latitudes[i])
+        incident = sorted(set(arc_edges[arc_offsets[i]:arc_offsets[i + 1]].tolist()))
+        node["connected_edges"] = edge_ids[incident].tolist()
+        return node
+
+    def build_edge(k):
+        edge = {"id": int(edge_ids[k]), "start_node": int(node_ids[edge_u[k]]), "end_node": int(node_ids[edge_v[k]]),
+                "distance": float(edge_distance[k])}
+        for mode in TRAFFIC_MODES:
+            edge[f"{mode}_speed"] = float(edge_speed[mode][k])
+        extra = edge_extras[k]
+        if extra:
+            edge.update(json.loads(extra))
+        return edge
+
+    nodes = _RecordTable(len(node_ids), build_node)
+    edges = _RecordTable(len(edge_ids), build_edge)
+    return RoadGraph.from_arrays(nodes, edges, names.tolist(), node_ids, latitudes, longitudes, edge_ids,
+                                 edge_u, edge_v, edge_distance, edge_speed, csr, version=header["version"])
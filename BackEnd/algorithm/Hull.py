@@ -0,0 +1,111 @@
+import math
+
+
+def _cross(o, a, b):
+    return (a[0] - o[0]) * (b[1] - o[1]) - (a[1] - o[1]) * (b[0] - o[0])
+
+
+def convex_hull(points):
+    """
+    Andrew 单调链算法求凸包
+    参数:
+        points: [(x, y)]
+    返回:
+        逆时针顺序的凸包顶点（首尾不重复）
+    """
+    points = sorted(set(points))
+    if len(points) < 3:
+        return points
+    lower, upper = [], []
+    for p in points:
+        while len(lower) >= 2 and _cross(lower[-2], lower[-1], p) <= 0:
+            lower.pop()
+        lower.append(p)
+    for p in reversed(points):
+        while len(upper) >= 2 and _cross(upper[-2], upper[-1], p) <= 0:
+            upper.pop()
+        upper.append(p)
+    return lower[:-1] + upper[:-1]
+
+
+def _segment_distance(p, a, b):
+    """点 p 到线段 ab 的距离"""
+    dx, dy = b[0] - a[0], b[1] - a[1]
+    length2 = dx * dx + dy * dy
+    if length2 == 0:
+        return math.dist(p, a)
+    t = max(0.0, min(1.0, ((p[0] - a[0]) * dx + (p[1] - a[1]) * dy) / length2))
+    return math.dist(p, (a[0] + t * dx, a[1] + t * dy))
+
+
+def _segments_cross(p1, p2, q1, q2):
+    """线段 p1p2 与 q1q2 是否严格相交（共享端点不算）"""
+    d1, d2 = _cross(q1, q2, p1), _cross(q1, q2, p2)
+    d3, d4 = _cross(p1, p2, q1), _cross(p1, p2, q2)
+    return d1 * d2 < 0 and d3 * d4 < 0
+
+
+def _in_triangle(p, a, b, c):
+    """点 p 是否在三角形 abc 内（含边界）"""
+    d1, d2, d3 = _cross(a, b, p), _cross(b, c, p), _cross(c, a, p)
+    has_negative = d1 < 0 or d2 < 0 or d3 < 0
+    has_positive = d1 > 0 or d2 > 0 or d3 > 0
+    return not (has_negative and has_positive)
+
+
+def concave_hull(points, concavity=2.0, length_threshold=0.0):
+    """
+    由凸包出发逐条“挖开”过长的边得到凹包（gift opening）：
+    对每条边 ab 找离它最近、且离相邻边更远的内部点 p，
+    若 |ab| / min(|pa|, |pb|) > concavity、新边不与其他边相交且不会把其他点挖到多边形外，则用 a-p-b 替换 ab
+    参数:
+        points: [(x, y)]（应使用平面坐标，如米）
+        concavity: 越小越凹，建议 1~3
+        length_threshold: 短于该长度的边不再挖开
+    返回:
+        逆时针顺序的多边形顶点（首尾不重复）
+    """
+    hull = convex_hull(points)
+    if len(hull) < 3:
+        return hull
+    inside = set(points) - set(hull)
+    changed = True
+    while changed and inside:
+        changed = False
+        i = 0
+        while i < len(hull):
+            n = len(hull)
+            a, b = hull[i], hull[(i + 1) % n]
+            length = math.dist(a, b)
+            if length <= length_threshold:
+                i += 1
+                continue
+            prev_edge = (hull[i - 1], a)
+            next_edge = (b, hull[(i + 2) % n])
+            best, best_distance = None, float('inf')
+            for p in inside:
+                distance = _segment_distance(p, a, b)
+                if distance >= best_distance:
+                    continue
+                if distance >= _segment_distance(p, *prev_edge) or distance >= _segment_distance(p, *next_edge):
+                    continue
+                best, best_distance = p, distance
+            if best is not None and length / max(min(math.dist(best, a), math.dist(best, b)), 1e-12) > concavity:
+                crossed = False
+                for j in range(n):
+                    c, d = hull[j], hull[(j + 1) % n]
+                    if j == i:
+                        continue
+                    if _segments_cross(a, best, c, d) or _segments_cross(best, b, c, d):
+                        crossed = True
+                        break
+                if not crossed:
+                    crossed = any(_in_triangle(p, a, best, b) for p in inside if p != best)
+                if not crossed:
+                    hull.insert(i + 1, best)
+                    inside.discard(best)
+                    changed = True
+                    # 继续检查新产生的 a-best 边
+                    continue
+            i += 1
+    return hull
@@ -0,0 +1,210 @@
+import heapq
+from itertools import count
+
+
+def _arc_weight(graph, u, v, mode):
+    """邻接表中 u -> v（指定交通方式）的最小边权"""
+    return min(weight for neighbor, weight, arc_mode in graph[u] if neighbor == v and arc_mode == mode)
+
+
+class _ReverseTree:
+    """
+    以终点为根的反向最短路树，所有偏离搜索共享
+    - 只搜索到 (1 + slack) * 起点到终点距离 的半径为止，大路网上不必确定全部节点
+    - bound(v): v 到终点距离的下界：树内为精确距离，树外为半径（未确定的节点距离不小于半径），
+      删边、禁点只会让距离变大，因此可作为偏离搜索的启发式
+    - 沿树到终点的路径不经过禁用节点时，该路径就是从 v 出发的最优后缀，搜索可以直接结束
+    """
+
+    def __init__(self, end, start, reverse_graph, slack):
+        # 反向图上 next[v] = (w, mode) 表示原图中的边 v -> w
+        self.dist, self.next = {}, {}
+        self.radius = float('inf')
+        tentative = {end: 0.0}
+        step = {end: None}
+        limit = float('inf')
+        pq = [(0.0, end)]
+        while pq:
+            cost, node = heapq.heappop(pq)
+            if node in self.dist:
+                continue
+            if cost > limit:
+                self.radius = cost
+                break
+            self.dist[node] = cost
+            self.next[node] = step[node]
+            if node == start:
+                limit = cost * (1.0 + slack)
+            for neighbor, weight, mode in reverse_graph[node]:
+                new_cost = cost + weight
+                if new_cost < tentative.get(neighbor, float('inf')):
+                    tentative[neighbor] = new_cost
+                    step[neighbor] = (node, mode)
+                    heapq.heappush(pq, (new_cost, neighbor))
+
+    def bound(self, node):
+        return self.dist.get(node, self.radius)
+
+    def clear(self, node, blocked, memo):
+        """
+        node 之后沿树到终点是否不经过禁用节点（node 本身不在禁用集合中）
+        memo 在同一次偏离搜索内共享，树上每个节点只检查一次
+        """
+        if node not in self.next:
+            return False
+        trail = [node]
+        result = True
+        step = self.next[node]
+        while step is not None:
+            node = step[0]
+            if node in blocked:
+                result = False
+                break
+            known = memo.get(node)
+            if known is not None:
+                result = known
+                break
+            trail.append(node)
+            step = self.next[node]
+        for node in trail:
+            memo[node] = result
+        return result
+
+    def suffix(self, node):
+        """node 沿树到终点的路径（节点列表、交通方式列表）"""
+        path, path_mode = [node], []
+        step = self.next[node]
+        while step is not None:
+            node, mode = step
+            path.append(node)
+            path_mode.append(mode)
+            step = self.next[node]
+        return path, path_mode
+
+
+def _spur_search(spur, graph, tree, blocked, removed, stats):
+    """
+    从偏离点出发、避开禁用节点与被删除的出边的 A*（启发式为反向树给出的下界）
+    弹出的节点沿树到终点的路径可行时，f 值即为最优代价，拼接后直接返回
+    返回:
+        (代价, 节点列表, 交通方式列表)，不可达时为 None
+    """
+    bound = tree.bound
+    inf = float('inf')
+    g = {spur: 0.0}
+    prev = {spur: None}
+    done = set()
+    # 沿树回到偏离点的后缀会形成环
+    memo = {spur: False}
+    pq = [(bound(spur), spur)]
+    while pq:
+        f, node = heapq.heappop(pq)
+        if node in done or f == inf:
+            continue
+        done.add(node)
+        stats['settled'] += 1
+        if node != spur and tree.clear(node, blocked, memo):
+            path, path_mode = [node], []
+            while prev[path[-1]] is not None:
+                parent, mode = prev[path[-1]]
+                path.append(parent)
+                path_mode.append(mode)
+            suffix, suffix_mode = tree.suffix(node)
+            # 后缀也不能回到本次搜索已走过的节点（否则出现环）
+            if not set(path).intersection(suffix[1:]):
+                path.reverse()
+                path_mode.reverse()
+                return f, path + suffix[1:], path_mode + suffix_mode
+        for neighbor, weight, mode in graph[node]:
+            if neighbor in blocked or neighbor in done or (node == spur and neighbor in removed):
+                continue
+            new_cost = g[node] + weight
+            if new_cost < g.get(neighbor, inf):
+                g[neighbor] = new_cost
+                prev[neighbor] = (node, mode)
+                heapq.heappush(pq, (new_cost + bound(neighbor), neighbor))
+    return None
+
+
+def _overlap(a, b):
+    """a 与 b 共享的（无向）边在 a 中所占的代价比例"""
+    shared = b["pairs"]
+    total = sum(a["weights"])
+    if total <= 0:
+        return 1.0
+    common = sum(w for pair, w in zip(a["pair_list"], a["weights"]) if pair in shared)
+    return common / total
+
+
+def k_shortest_paths(start, end, graph, k, max_overlap=1.0, max_candidates=None, reverse_graph=None, tree_slack=0.1,
+                     stats=None):
+    """
+    Yen 算法求 k 条无环的备选路径，并按重叠度过滤
+    - 所有偏离搜索共享一棵以终点为根的反向最短路树：偏离点沿树到终点的路径可行时直接取用，
+      否则做以树距离为启发式的 A*，一旦弹出的节点沿树可达终点即停止
+    - 路径按节点序列区分（同一对节点间不同交通方式的平行边视为同一条边）
+    - 候选路径按代价从小到大依次出现，与已接受的某条路径的重叠度超过 max_overlap 时不返回，
+      但仍参与后续的偏离生成
+    参数:
+        start / end: 起点、终点ID
+        graph: 邻接表 {node: [(neighbor, weight, mode)]}
+        k: 返回路径数上限
+        max_overlap: 重叠度上限（共享边代价 / 候选路径代价），1 表示不过滤
+        max_candidates: 最多检查的候选路径数，默认 10 * k
+        reverse_graph: 反向邻接表，无向图可省略
+        tree_slack: 反向树的搜索半径为 (1 + tree_slack) * 最短路径代价
+        stats: 可选字典，写入 tree（反向树确定的节点数）、settled（偏离搜索确定的节点数）、
+               spurs（偏离搜索次数）、candidates（检查的路径数）
+    返回:
+        [(节点ID列表, 代价, 每段交通方式)]，按代价升序
+    """
+    stats = {} if stats is None else stats
+    stats.update(tree=0, settled=0, spurs=0, candidates=0)
+    if k <= 0:
+        return []
+    max_candidates = 10 * k if max_candidates is None else max_candidates
+    tree = _ReverseTree(end, start, graph if reverse_graph is None else reverse_graph, tree_slack)
+    stats['tree'] = len(tree.dist)
+    if start not in tree.next:
+        return []
+    first = tree.suffix(start)
+
+    def make(path, cost, path_mode):
+        weights = [_arc_weight(graph, u, v, mode) for u, v, mode in zip(path, path[1:], path_mode)]
+        pair_list = [(u, v) if u <= v else (v, u) for u, v in zip(path, path[1:])]
+        return {"path": path, "cost": cost, "path_mode": path_mode, "weights": weights,
+                "pair_list": pair_list, "pairs": set(pair_list)}
+
+    examined, accepted = [], []
+    seen = {tuple(first[0])}
+    tie = count()
+    candidates = [(tree.dist[start], next(tie), first[0], first[1])]
+    while candidates and len(accepted) < k and stats['candidates'] < max_candidates:
+        cost, _, path, path_mode = heapq.heappop(candidates)
+        stats['candidates'] += 1
+        route = make(path, cost, path_mode)
+        if all(_overlap(route, other) <= max_overlap for other in accepted):
+            accepted.append(route)
+        examined.append(route)
+
+        # 以当前路径的每个节点为偏离点生成新候选
+        root_cost = 0.0
+        for i in range(len(path) - 1):
+            spur = path[i]
+            root = path[:i + 1]
+            removed = {other["path"][i + 1] for other in examined
+                       if len(other["path"]) > i + 1 and other["path"][:i + 1] == root}
+            blocked = set(root[:-1])
+            stats['spurs'] += 1
+            found = _spur_search(spur, graph, tree, blocked, removed, stats)
+            if found is not None:
+                spur_cost, spur_path, spur_mode = found
+                total_path = root[:-1] + spur_path
+                key = tuple(total_path)
+                if key not in seen:
+                    seen.add(key)
+                    heapq.heappush(candidates, (root_cost + spur_cost, next(tie), total_path,
+                                                path_mode[:i] + spur_mode))
+            root_cost += route["weights"][i]
+
+    return [(route["path"], route["cost"], route["path_mode"]) for route in accepted]
@@ -0,0 +1,102 @@
+import threading
+
+
+class _Entry:
+    __slots__ = ("key", "value", "prev", "next")
+
+    def __init__(self, key=None, value=None):
+        self.key = key
+        self.value = value
+        self.prev = None
+        self.next = None
+
+
+class LRUCache:
+    """
+    定长 LRU（最近最少使用）缓存：哈希表 + 双向链表
+    - get / put 均为 O(1)
+    - 容量满时淘汰最久未访问的条目
+    - 记录命中、未命中与淘汰次数
+    内部加锁，可在多个请求线程间共享
+    """
+
+    def __init__(self, capacity=1024):
+        if capacity <= 0:
+            raise ValueError("capacity 必须为正整数")
+        self.capacity = capacity
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._map = {}
+        # 哨兵节点：head.next 为最近使用，tail.prev 为最久未使用
+        self._head = _Entry()
+        self._tail = _Entry()
+        self._head.next = self._tail
+        self._tail.prev = self._head
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._map)
+
+    def __contains__(self, key):
+        return key in self._map
+
+    def _unlink(self, entry):
+        entry.prev.next = entry.next
+        entry.next.prev = entry.prev
+
+    def _push_front(self, entry):
+        entry.prev = self._head
+        entry.next = self._head.next
+        self._head.next.prev = entry
+        self._head.next = entry
+
+    def get(self, key, default=None):
+        """查找缓存，命中时将条目移到链表头部"""
+        with self._lock:
+            entry = self._map.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+            self.hits += 1
+            self._unlink(entry)
+            self._push_front(entry)
+            return entry.value
+
+    def put(self, key, value):
+        """写入缓存，超出容量时淘汰链表尾部的条目"""
+        with self._lock:
+            entry = self._map.get(key)
+            if entry is not None:
+                entry.value = value
+                self._unlink(entry)
+                self._push_front(entry)
+                return
+            entry = _Entry(key, value)
+            self._map[key] = entry
+            self._push_front(entry)
+            if len(self._map) > self.capacity:
+                oldest = self._tail.prev
+                self._unlink(oldest)
+                del self._map[oldest.key]
+                self.evictions += 1
+
+    def clear(self):
+        """清空缓存（保留统计计数）"""
+        with self._lock:
+            self._map.clear()
+            self._head.next = self._tail
+            self._tail.prev = self._head
+
+    def stats(self):
+        """返回缓存统计信息"""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "capacity": self.capacity,
+                "size": len(self._map),
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": round(self.hits / total, 4) if total else 0.0,
+            }
@@ -0,0 +1,94 @@
+import numpy as np
+from algorithm.ShortestPath import dijkstra_csr
+
+
+class Landmarks:
+    """
+    ALT（A*, Landmarks, Triangle inequality）启发式
+    预先计算每个地标到所有节点（from）以及所有节点到地标（to）的最短距离，
+    由三角不等式得到任意节点到终点的下界：
+        d(v, t) >= d(L, t) - d(L, v)
+        d(v, t) >= d(v, L) - d(t, L)
+    节点均用 0..n-1 的下标表示
+    """
+
+    def __init__(self, node_count, landmarks, dist_from, dist_to):
+        self.node_count = node_count
+        # 地标节点下标
+        self.landmarks = landmarks
+        # dist_from[i][v] = d(landmarks[i], v)，形状 (k, n)
+        self.dist_from = dist_from
+        # dist_to[i][v] = d(v, landmarks[i])，形状 (k, n)
+        self.dist_to = dist_to
+
+    @classmethod
+    def build(cls, csr, k=8, reverse_csr=None, start=0):
+        """
+        使用最远点策略选取 k 个地标并预计算距离数组
+        参数:
+            csr: 正向 CSR（需要 offsets、targets、weights 属性）
+            k: 地标数量
+            reverse_csr: 反向 CSR，无向图可省略（与正向相同）
+            start: 选取第一个地标前的出发节点
+        返回:
+            Landmarks 实例
+        """
+        reverse_csr = reverse_csr or csr
+        n = len(csr.offsets) - 1
+        if n == 0 or k <= 0:
+            empty = np.zeros((0, n), dtype=np.float64)
+            return cls(n, [], empty, empty)
+
+        def sssp(graph, source):
+            return np.array(dijkstra_csr(graph.offsets, graph.targets, graph.weights, source), dtype=np.float64)
+
+        landmarks, dist_from, dist_to = [], [], []
+        # 到已选地标的最小距离；不可达节点视为无穷远，会被优先选中以覆盖其他连通分量
+        nearest = sssp(csr, start)
+        nearest[start] = 0.0
+        for _ in range(min(k, n)):
+            if landmarks:
+                candidate = int(np.argmax(nearest))
+            else:
+                # 第一个地标取离出发节点最远的可达节点
+                reachable = np.where(np.isfinite(nearest), nearest, -1.0)
+                candidate = int(np.argmax(reachable))
+            if landmarks and nearest[candidate] <= 0:
+                break
+            landmarks.append(candidate)
+            forward = sssp(csr, candidate)
+            dist_from.append(forward)
+            dist_to.append(forward if reverse_csr is csr else sssp(reverse_csr, candidate))
+            nearest = forward if len(landmarks) == 1 else np.minimum(nearest, forward)
+
+        return cls(n, landmarks, np.vstack(dist_from), np.vstack(dist_to))
+
+    def lower_bound(self, target):
+        """
+        向量化计算所有节点到 target 的 ALT 下界
+        参数:
+            target: 终点下标
+        返回:
+            长度为 n 的 numpy 数组
+        """
+        if not self.landmarks:
+            return np.zeros(self.node_count, dtype=np.float64)
+        with np.errstate(invalid='ignore'):
+            bound_from = self.dist_from[:, target:target + 1] - self.dist_from
+            bound_to = self.dist_to - self.dist_to[:, target:target + 1]
+        bounds = np.fmax(bound_from, bound_to)
+        # inf - inf 产生的 nan 说明该地标无法提供信息
+        bounds[np.isnan(bounds)] = 0.0
+        return np.maximum(bounds.max(axis=0), 0.0)
+
+    def heuristic(self, target, index_of=None):
+        """
+        生成 astar 使用的启发式函数
+        参数:
+            target: 终点下标
+            index_of: 节点ID -> 下标 的字典，为 None 时启发式函数直接接收下标
+        """
+        bound = self.lower_bound(target).tolist()
+        if index_of is None:
+            return bound.__getitem__
+        return lambda node_id: bound[index_of[node_id]]
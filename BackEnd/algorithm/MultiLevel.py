@@ -0,0 +1,141 @@
+from algorithm.Graph import RoadGraph
+from algorithm.ShortestPath import shortest_path_tree, tree_path
+
+# 室外层的层名
+OUTDOOR = "outdoor"
+# 跨楼层换乘代价（等效步行米数）：(固定代价, 每层代价)，固定代价用于体现候梯时间
+TRANSFER_COSTS = {
+    "电梯": (30.0, 5.0),
+    "楼梯": (0.0, 20.0),
+}
+# 其他类型节点之间的跨楼层边按楼梯计算
+DEFAULT_TRANSFER_COST = TRANSFER_COSTS["楼梯"]
+
+
+class IndoorBuilding:
+    """
+    单栋建筑的室内路网
+    - 楼层按在数据中首次出现的顺序排列，跨楼层边的代价 = 边长 + 固定代价 + 每层代价 * 跨越层数
+    - 邻接表格式与 RoadGraph.adjacency 相同，mode 为 "indoor" 或换乘方式（电梯/楼梯）
+    """
+
+    def __init__(self, building_id, nodes, edges, transfer_costs=None):
+        self.building_id = building_id
+        self.graph = RoadGraph(nodes, edges)
+        self.floors = list(dict.fromkeys(node.get("floor", "") for node in nodes))
+        rank = {floor: i for i, floor in enumerate(self.floors)}
+        transfer_costs = TRANSFER_COSTS if transfer_costs is None else transfer_costs
+
+        self.adjacency = {node["id"]: [] for node in nodes}
+        for edge in edges:
+            u, v = edge["start_node"], edge["end_node"]
+            if u not in self.adjacency or v not in self.adjacency:
+                continue
+            cost, mode = edge["distance"], "indoor"
+            floor_u, floor_v = self.graph.node(u).get("floor", ""), self.graph.node(v).get("floor", "")
+            if floor_u != floor_v:
+                mode = self.graph.node(u).get("type", "")
+                base, per_floor = transfer_costs.get(mode, DEFAULT_TRANSFER_COST)
+                cost += base + per_floor * abs(rank[floor_u] - rank[floor_v])
+            self.adjacency[u].append((v, cost, mode))
+            self.adjacency[v].append((u, cost, mode))
+
+    def tree(self, source, targets):
+        """从 source 出发的最短路树（确定全部 targets 后结束）"""
+        return shortest_path_tree(source, self.adjacency, targets)
+
+    def path_distance(self, path):
+        """路径的实际长度（不含换乘代价）"""
+        road = self.graph
+        total = 0.0
+        for a, b in zip(path, path[1:]):
+            edge = road.find_edge(road.index_of[a], road.index_of[b])
+            total += float(road.edge_distance[edge])
+        return total
+
+
+class MultiLevelRouter:
+    """
+    室外 + 室内两层路网的分层搜索
+    - 入口 entrances: [(建筑ID, 室内入口节点ID, 室外节点ID, 连接距离)]
+    - 起点/终点在室内时，只在其所在建筑内做一次单源搜索得到到各入口的代价；
+      室外段只在起终点两侧入口对应的室外节点之间计算，可直接使用室外路网的预处理结果
+    - 起终点在同一建筑时，同时比较纯室内路径与出楼后再进楼的路径
+    节点用 (层, 节点ID) 表示，层为 OUTDOOR 或建筑ID
+    """
+
+    def __init__(self, buildings, entrances):
+        self.buildings = buildings
+        # 建筑ID -> [(室内节点, 室外节点, 连接距离)]
+        self.entrances = {}
+        for building_id, indoor_id, outdoor_id, distance in entrances:
+            if building_id in buildings and indoor_id in buildings[building_id].adjacency:
+                self.entrances.setdefault(building_id, []).append((indoor_id, outdoor_id, distance))
+
+    def _access(self, point, extra_targets=()):
+        """
+        从室内点出发到所在建筑各入口的代价
+        返回:
+            ({室外节点: (代价, 室内入口节点, 连接距离)}, 最短路树)
+        """
+        level, node_id = point
+        building = self.buildings[level]
+        entrances = self.entrances.get(level, [])
+        dist, prev = building.tree(node_id, {indoor for indoor, _, _ in entrances} | set(extra_targets))
+        options = {}
+        for indoor, outdoor, distance in entrances:
+            if indoor in dist:
+                cost = dist[indoor] + distance
+                if cost < options.get(outdoor, (float('inf'),))[0]:
+                    options[outdoor] = (cost, indoor, distance)
+        return options, (dist, prev)
+
+    def route(self, start, end, outdoor_costs, outdoor_path):
+        """
+        参数:
+            start / end: (层, 节点ID)
+            outdoor_costs: 函数 (室外起点集合, 室外终点集合) -> {(起点, 终点): 代价}，不可达的组合可省略
+            outdoor_path: 函数 (室外起点, 室外终点) -> (室外节点ID列表, 代价)
+        返回:
+            (总代价, 分段列表 [{"level", "path": [节点ID], "cost": 该段代价, "link": 进入该段前经过的连接距离}])，
+            不可达时为 (inf, [])
+        """
+        if start[0] == OUTDOOR:
+            start_options, start_tree = {start[1]: (0.0, None, 0.0)}, None
+        else:
+            extra = [end[1]] if end[0] == start[0] else []
+            start_options, start_tree = self._access(start, extra)
+        if end[0] == OUTDOOR:
+            end_options, end_tree = {end[1]: (0.0, None, 0.0)}, None
+        else:
+            end_options, end_tree = self._access(end)
+
+        best, best_pair = float('inf'), None
+        if start[0] != OUTDOOR and start[0] == end[0] and end[1] in start_tree[0]:
+            best = start_tree[0][end[1]]
+        costs = outdoor_costs(set(start_options), set(end_options)) if start_options and end_options else {}
+        for (a, b), cost in costs.items():
+            total = start_options[a][0] + cost + end_options[b][0]
+            if total < best:
+                best, best_pair = total, (a, b)
+        if best == float('inf'):
+            return best, []
+
+        if best_pair is None:
+            # 同一建筑内的纯室内路径
+            path, _ = tree_path(start_tree[1], end[1])
+            return best, [{"level": start[0], "path": path, "cost": best, "link": 0.0}]
+
+        a, b = best_pair
+        legs = []
+        if start_tree is not None:
+            cost, entrance, link = start_options[a]
+            path, _ = tree_path(start_tree[1], entrance)
+            legs.append({"level": start[0], "path": path, "cost": cost - link, "link": 0.0})
+        outdoor, cost = outdoor_path(a, b)
+        legs.append({"level": OUTDOOR, "path": outdoor, "cost": cost, "link": start_options[a][2]})
+        if end_tree is not None:
+            cost, entrance, link = end_options[b]
+            path, _ = tree_path(end_tree[1], entrance)
+            legs.append({"level": end[0], "path": path[::-1], "cost": cost - link, "link": link})
+        return best, legs
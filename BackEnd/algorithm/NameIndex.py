@@ -0,0 +1,91 @@
+class _TrieNode:
+    __slots__ = ("children", "top")
+
+    def __init__(self):
+        self.children = {}
+        # 以该前缀开头的名称中热度最高的若干个（名称编号，按热度降序）
+        self.top = []
+
+
+class NameIndex:
+    """
+    地点名称索引（用于输入联想）
+    - 前缀树：每个前缀节点预存热度前 limit 的名称，前缀查询只需走 len(前缀) 步
+    - 字符 n-gram 倒排表（单字与二元组）：子串查询时取最短的倒排表按热度顺序校验
+    名称按热度降序编号，倒排表中的编号天然有序，找到 limit 个即可停止
+    """
+
+    def __init__(self, nodes, limit=10):
+        self.limit = limit
+        best = {}
+        for order, node in enumerate(nodes):
+            name = node.get("name", "")
+            if not name:
+                continue
+            popularity = node.get("popularity", 0) or 0
+            # 同名节点只保留一个，取最高热度
+            if name not in best:
+                best[name] = (popularity, order)
+            elif popularity > best[name][0]:
+                best[name] = (popularity, best[name][1])
+        # 热度降序，热度相同时保持节点原有顺序
+        self.names = sorted(best, key=lambda name: (-best[name][0], best[name][1]))
+
+        self.root = _TrieNode()
+        self.postings = {}
+        for rank, name in enumerate(self.names):
+            self._insert(rank, name)
+            for gram in self._grams(name):
+                posting = self.postings.setdefault(gram, [])
+                if not posting or posting[-1] != rank:
+                    posting.append(rank)
+
+    @staticmethod
+    def _grams(text):
+        """单字与相邻二元组"""
+        grams = set(text)
+        grams.update(text[i:i + 2] for i in range(len(text) - 1))
+        return grams
+
+    def _insert(self, rank, name):
+        node = self.root
+        if len(node.top) < self.limit:
+            node.top.append(rank)
+        for ch in name:
+            node = node.children.setdefault(ch, _TrieNode())
+            # 按热度顺序插入，前 limit 个即为该前缀的热度前 limit
+            if len(node.top) < self.limit:
+                node.top.append(rank)
+
+    def prefix(self, text):
+        """以 text 开头的名称（热度降序，最多 limit 个）"""
+        node = self.root
+        for ch in text:
+            node = node.children.get(ch)
+            if node is None:
+                return []
+        return [self.names[rank] for rank in node.top]
+
+    def search(self, text, limit=None):
+        """
+        包含 text 的名称，前缀匹配的排在前面，其余按热度降序补足
+        参数:
+            text: 查询串，为空时返回热度最高的名称
+            limit: 返回数量上限，默认为构建时的 limit
+        """
+        limit = self.limit if limit is None else limit
+        results = self.prefix(text)[:limit]
+        if len(results) >= limit or not text:
+            return results
+        grams = [text] if len(text) == 1 else [text[i:i + 2] for i in range(len(text) - 1)]
+        postings = [self.postings.get(gram) for gram in grams]
+        if not all(postings):
+            return results
+        seen = set(results)
+        for rank in min(postings, key=len):
+            name = self.names[rank]
+            if name not in seen and text in name:
+                results.append(name)
+                if len(results) >= limit:
+                    break
+        return results
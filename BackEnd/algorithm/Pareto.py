@@ -0,0 +1,110 @@
+import heapq
+import math
+from operator import le
+
+
+def _dominates(a, b, scale=1.0):
+    """a 是否 ε-支配 b：每个分量都有 a_i <= scale * b_i，scale = 1 + ε"""
+    if scale != 1.0:
+        b = [y * scale for y in b]
+    return all(map(le, a, b))
+
+
+def pareto_paths(start, end, graph, epsilon=0.0, max_labels=8, lower_bound=None, stats=None):
+    """
+    多目标标号设定算法（Martins / NAMOA*），求起点到终点的 Pareto 最优路径集合
+    - 标号按 代价向量 + 剩余代价下界 的字典序出队；下界满足一致性时，出队的标号不会再被支配
+    - 每个节点只保留互不 ε-支配的标号，且最多 max_labels 个（超出时丢弃新标号）
+    - 若 标号代价 + 剩余代价下界 已被终点的某个标号 ε-支配，或下界为无穷（到不了终点），则剪枝
+    参数:
+        start / end: 起点、终点ID
+        graph: 邻接表 {node: [(neighbor, 代价向量 tuple, mode)]}，各分量非负
+        epsilon: ε-支配的松弛系数，0 时为严格的 Pareto 支配
+        max_labels: 每个节点的标号数上限
+        lower_bound: 可选函数 {node: 到终点的剩余代价下界向量}，各分量需满足一致性（如直线距离、ALT 下界）
+        stats: 可选字典，写入 settled（出队的标号数）与 labels（生成的标号数）
+    返回:
+        [(代价向量, 节点ID列表, 每段交通方式)]，按代价向量字典序排列
+    """
+    # 标号: (代价向量, 节点, 父标号下标, 到达该节点使用的交通方式)
+    labels = []
+    alive = []
+    # 节点 -> 该节点上未被支配的标号下标
+    bags = {}
+    results = []
+
+    scale = 1.0 + epsilon
+    target_bag = bags.setdefault(end, [])
+
+    def add(costs, node, parent, mode):
+        bag = bags.setdefault(node, [])
+        for index in bag:
+            if _dominates(labels[index][0], costs, scale):
+                return
+        if lower_bound is not None and node != end:
+            estimate = [c + b for c, b in zip(costs, lower_bound(node))]
+            if math.inf in estimate:
+                return
+            for index in target_bag:
+                if _dominates(labels[index][0], estimate, scale):
+                    return
+            estimate = tuple(estimate)
+        else:
+            estimate = costs
+        # 新标号支配的旧标号作废（已出队的标号字典序更小，不会被支配）
+        kept = []
+        for index in bag:
+            if _dominates(costs, labels[index][0]):
+                alive[index] = False
+            else:
+                kept.append(index)
+        if len(kept) >= max_labels:
+            bag[:] = kept
+            return
+        kept.append(len(labels))
+        bag[:] = kept
+        labels.append((costs, node, parent, mode))
+        alive.append(True)
+        heapq.heappush(pq, (estimate, len(labels) - 1))
+
+    pq = []
+    add(tuple(0.0 for _ in range(_dimension(graph))), start, None, None)
+    settled = 0
+    while pq:
+        _, index = heapq.heappop(pq)
+        if not alive[index]:
+            continue
+        settled += 1
+        costs, node = labels[index][0], labels[index][1]
+        if node == end:
+            results.append(index)
+            continue
+        for neighbor, arc, mode in graph[node]:
+            add(tuple(c + a for c, a in zip(costs, arc)), neighbor, index, mode)
+
+    if stats is not None:
+        stats['settled'] = settled
+        stats['labels'] = len(labels)
+
+    routes = []
+    for index in results:
+        if not alive[index]:
+            continue
+        costs = labels[index][0]
+        path, path_mode = [], []
+        while index is not None:
+            _, node, parent, mode = labels[index]
+            path.append(node)
+            if mode is not None:
+                path_mode.append(mode)
+            index = parent
+        routes.append((costs, path[::-1], path_mode[::-1]))
+    return routes
+
+
+def _dimension(graph):
+    """代价向量的维数（取第一条弧），空图时按 1 维处理"""
+    for arcs in graph.values():
+        for _, arc, _ in arcs:
+            return len(arc)
+    return 1
@@ -2,18 +2,21 @@ import heapq
 import math
 from collections import defaultdict
 
-def dijkstra(start, targets, graph):
+def dijkstra(start, targets, graph, stats=None):
     """
     使用Dijkstra算法计算从起点到目标集合中任意一点的最短路径
     参数:
         start: 起点节点ID
         targets: 目标节点ID集合
         graph: 邻接表 {node: [(neighbor, weight, mode)]}
+        stats: 可选字典，写入 settled（确定的节点数）
     返回:
         path: 节点ID列表 (从起点到终点)
         total_cost: 路径总长度
     """
     if start in targets:
+        if stats is not None:
+            stats['settled'] = 0
         return [start], 0.0
 
     # 初始化数据结构
@@ -21,9 +24,13 @@ def dijkstra(start, targets, graph):
     dist[start] = 0.0
     prev = {}
     pq = [(0.0, start)]
+    settled = 0
     
     while pq:
         cost, node = heapq.heappop(pq)
+        if cost > dist[node]:
+            continue
+        settled += 1
         if node in targets:
             # 构建路径
             path = []
@@ -31,10 +38,9 @@ def dijkstra(start, targets, graph):
                 path.append(node)
                 node = prev[node]
             path.append(start)
+            if stats is not None:
+                stats['settled'] = settled
             return path[::-1], cost
-        
-        if cost > dist[node]:
-            continue
             
         for neighbor, weight, __  in graph[node]:
             new_cost = cost + weight
@@ -43,9 +49,11 @@ def dijkstra(start, targets, graph):
                 prev[neighbor] = node
                 heapq.heappush(pq, (new_cost, neighbor))
     
+    if stats is not None:
+        stats['settled'] = settled
     return [], float('inf')
 
-def astar(start, end, graph, heuristic):
+def astar(start, end, graph, heuristic, stats=None):
     """
     使用A*算法计算从起点到终点的最短路径
     参数:
@@ -53,11 +61,14 @@ def astar(start, end, graph, heuristic):
         end: 终点节点ID
         graph: 邻接表 {node: [(neighbor, weight, mode)]}
         heuristic: 启发式函数 {node: 到终点的估计距离}
+        stats: 可选字典，写入 settled（确定的节点数）
     返回:
         path: 节点ID列表 (从起点到终点)
         total_cost: 路径总长度
     """
     if start == end:
+        if stats is not None:
+            stats['settled'] = 0
         return [start], 0.0
 
     # 初始化数据结构
@@ -67,9 +78,13 @@ def astar(start, end, graph, heuristic):
     f_score[start] = heuristic(start)
     prev = {}
     pq = [(f_score[start], start)]
+    settled = 0
     
     while pq:
-        _, node = heapq.heappop(pq)
+        f, node = heapq.heappop(pq)
+        if f > f_score[node]:
+            continue
+        settled += 1
         if node == end:
             # 构建路径
             path = []
@@ -77,6 +92,8 @@ def astar(start, end, graph, heuristic):
                 path.append(node)
                 node = prev[node]
             path.append(start)
+            if stats is not None:
+                stats['settled'] = settled
             return path[::-1], g_score[end]
         
         for neighbor, weight, __ in graph[node]:
@@ -87,4 +104,287 @@ def astar(start, end, graph, heuristic):
                 f_score[neighbor] = tentative_g + heuristic(neighbor)
                 heapq.heappush(pq, (f_score[neighbor], neighbor))
     
-    return [], float('inf')
\ No newline at end of file
+    if stats is not None:
+        stats['settled'] = settled
+    return [], float('inf')
+
+def shortest_path_tree(start, graph, targets=None, max_cost=float('inf')):
+    """
+    单源最短路树：一次搜索得到从起点到所有（或指定）节点的最短距离与前驱
+    参数:
+        start: 起点节点ID
+        graph: 邻接表 {node: [(neighbor, weight, mode)]}
+        targets: 可选目标集合，全部确定后提前结束
+        max_cost: 可选距离上限，只确定距离不超过该值的节点
+    返回:
+        dist: {node: 最短距离}
+        prev: {node: (前驱节点, 交通方式)}，起点为 None
+    """
+    dist = {start: 0.0}
+    prev = {start: None}
+    done = set()
+    remaining = set(targets) if targets is not None else None
+    pq = [(0.0, start)]
+    while pq:
+        cost, node = heapq.heappop(pq)
+        if node in done:
+            continue
+        if cost > max_cost:
+            break
+        done.add(node)
+        if remaining is not None:
+            remaining.discard(node)
+            if not remaining:
+                break
+        for neighbor, weight, mode in graph[node]:
+            new_cost = cost + weight
+            if new_cost < dist.get(neighbor, float('inf')):
+                dist[neighbor] = new_cost
+                prev[neighbor] = (node, mode)
+                heapq.heappush(pq, (new_cost, neighbor))
+    # 只保留已确定的节点，未确定节点的距离只是上界
+    dist = {node: dist[node] for node in done}
+    prev = {node: prev[node] for node in done}
+    return dist, prev
+
+def nearest_targets(start, graph, targets, k, max_cost=float('inf'), stats=None):
+    """
+    从起点出发按网络距离查找最近的 k 个目标（单次 Dijkstra）
+    确定 k 个目标或当前距离超过 max_cost 时停止
+    参数:
+        start: 起点节点ID
+        graph: 邻接表 {node: [(neighbor, weight, mode)]}
+        targets: 目标节点集合（支持 in 判断）
+        k: 目标数量上限
+        max_cost: 最大距离
+        stats: 可选字典，写入 settled（确定的节点数）
+    返回:
+        [(目标节点, 距离)]，按距离升序
+    """
+    found = []
+    dist = {start: 0.0}
+    done = set()
+    pq = [(0.0, start)]
+    while pq and len(found) < k:
+        cost, node = heapq.heappop(pq)
+        if node in done:
+            continue
+        if cost > max_cost:
+            break
+        done.add(node)
+        if node in targets:
+            found.append((node, cost))
+        for neighbor, weight, _ in graph[node]:
+            new_cost = cost + weight
+            if new_cost < dist.get(neighbor, float('inf')):
+                dist[neighbor] = new_cost
+                heapq.heappush(pq, (new_cost, neighbor))
+    if stats is not None:
+        stats['settled'] = len(done)
+    return found
+
+def tree_path(prev, end):
+    """
+    从 shortest_path_tree 的前驱表中还原到 end 的路径
+    返回:
+        path: 节点ID列表，end 不在树中时为空列表
+        path_mode: 每段边使用的交通方式
+    """
+    if end not in prev:
+        return [], []
+    path, path_mode = [end], []
+    while prev[path[-1]] is not None:
+        node, mode = prev[path[-1]]
+        path.append(node)
+        path_mode.append(mode)
+    path.reverse()
+    path_mode.reverse()
+    return path, path_mode
+
+def time_dependent_dijkstra(start, end, graph, departure, arrival, heuristic=None, stats=None):
+    """
+    时变最短时间路径（要求边的通行时间满足 FIFO：更早出发不会更晚到达）
+    标号为到达各节点的时刻，松弛时按到达时刻计算下一条边的通行时间
+    参数:
+        start: 起点节点ID
+        end: 终点节点ID
+        graph: 邻接表 {node: [(neighbor, 畅通耗时, mode, edge)]}
+        departure: 出发时刻
+        arrival: 函数 arrival(edge, 畅通耗时, t)，返回在 t 时刻进入该边后的到达时刻
+        heuristic: 可选的剩余耗时下界函数 {node: 下界}，提供时即为时变A*
+        stats: 可选字典，写入 settled（确定的节点数）
+    返回:
+        path: 节点ID列表，不可达时为空列表
+        total_time: 总耗时（到达时刻 - 出发时刻）
+        path_mode: 每段边使用的交通方式
+    """
+    heuristic = heuristic or (lambda node: 0.0)
+    arrive = {start: departure}
+    prev = {start: None}
+    done = set()
+    pq = [(departure + heuristic(start), start)]
+    settled = 0
+    while pq:
+        _, node = heapq.heappop(pq)
+        if node in done:
+            continue
+        done.add(node)
+        settled += 1
+        if node == end:
+            break
+        t = arrive[node]
+        for neighbor, free_time, mode, edge in graph[node]:
+            if neighbor in done:
+                continue
+            new_time = arrival(edge, free_time, t)
+            if new_time < arrive.get(neighbor, float('inf')):
+                arrive[neighbor] = new_time
+                prev[neighbor] = (node, mode)
+                heapq.heappush(pq, (new_time + heuristic(neighbor), neighbor))
+
+    if stats is not None:
+        stats['settled'] = settled
+    if end not in done:
+        return [], float('inf'), []
+    path, path_mode = tree_path(prev, end)
+    return path, arrive[end] - departure, path_mode
+
+def bidirectional_astar(start, end, graph, heuristic=None, reverse_heuristic=None, reverse_graph=None, stats=None):
+    """
+    双向A*（平均势函数），heuristic 均为 None 时退化为双向Dijkstra
+    正向势 p(v) = (heuristic(v) - reverse_heuristic(v)) / 2，反向势为 -p(v)，
+    两个方向的约化边权一致，当两侧堆顶键值之和不小于当前最优值 mu 时即可停止。
+    参数:
+        start: 起点节点ID
+        end: 终点节点ID
+        graph: 邻接表 {node: [(neighbor, weight, mode)]}
+        heuristic: 节点到终点距离的下界函数
+        reverse_heuristic: 起点到节点距离的下界函数
+        reverse_graph: 反向邻接表，无向图可省略
+        stats: 可选字典，写入 settled（确定的节点数）
+    返回:
+        path: 节点ID列表 (从起点到终点)
+        total_cost: 路径总长度
+        path_mode: 每段边使用的交通方式
+    """
+    if start == end:
+        if stats is not None:
+            stats['settled'] = 0
+        return [start], 0.0, []
+
+    inf = float('inf')
+    reverse_graph = graph if reverse_graph is None else reverse_graph
+    if heuristic is None or reverse_heuristic is None:
+        potential = lambda node: 0.0
+    elif heuristic(start) == inf:
+        # 下界为无穷说明终点不可达
+        if stats is not None:
+            stats['settled'] = 0
+        return [], inf, []
+    else:
+        potential = lambda node: (heuristic(node) - reverse_heuristic(node)) / 2
+
+    # 0: 正向（从起点出发），1: 反向（从终点出发）
+    dist = ({start: 0.0}, {end: 0.0})
+    # prev[0][v] = (u, mode) 表示边 u->v；prev[1][v] = (w, mode) 表示边 v->w
+    prev = ({start: None}, {end: None})
+    pot = ({}, {})
+
+    def key_potential(side, node):
+        cache = pot[side]
+        if node not in cache:
+            cache[node] = potential(node) if side == 0 else -potential(node)
+        return cache[node]
+
+    heaps = ([(key_potential(0, start), start)], [(key_potential(1, end), end)])
+    adjacency = (graph, reverse_graph)
+    settled = [set(), set()]
+    best = inf
+    meeting = None
+
+    def clean(side):
+        heap = heaps[side]
+        while heap:
+            key, node = heap[0]
+            if node in settled[side] or key > dist[side][node] + key_potential(side, node):
+                heapq.heappop(heap)
+            else:
+                break
+        return heap[0][0] if heap else inf
+
+    while True:
+        top_forward, top_backward = clean(0), clean(1)
+        if top_forward + top_backward >= best or (top_forward == inf and top_backward == inf):
+            break
+        side = 0 if top_forward <= top_backward else 1
+        _, node = heapq.heappop(heaps[side])
+        settled[side].add(node)
+        other = 1 - side
+        cost = dist[side][node]
+        for neighbor, weight, mode in adjacency[side][node]:
+            new_cost = cost + weight
+            if new_cost < dist[side].get(neighbor, inf):
+                dist[side][neighbor] = new_cost
+                prev[side][neighbor] = (node, mode)
+                heapq.heappush(heaps[side], (new_cost + key_potential(side, neighbor), neighbor))
+            # 两个方向的搜索在边 node-neighbor 上相遇
+            if neighbor in dist[other]:
+                total = new_cost + dist[other][neighbor]
+                if total < best:
+                    best = total
+                    meeting = (node, neighbor, mode) if side == 0 else (neighbor, node, mode)
+
+    if stats is not None:
+        stats['settled'] = len(settled[0]) + len(settled[1])
+    if meeting is None:
+        return [], inf, []
+
+    # 拼接路径：start -> u，边 u->v，v -> end
+    u, v, mode = meeting
+    path, path_mode = [u], []
+    while prev[0][path[-1]] is not None:
+        node, edge_mode = prev[0][path[-1]]
+        path.append(node)
+        path_mode.append(edge_mode)
+    path.reverse()
+    path_mode.reverse()
+    path.append(v)
+    path_mode.append(mode)
+    while prev[1][path[-1]] is not None:
+        node, edge_mode = prev[1][path[-1]]
+        path.append(node)
+        path_mode.append(edge_mode)
+    return path, best, path_mode
+
+def bidirectional_dijkstra(start, end, graph, reverse_graph=None, stats=None):
+    """
+    双向Dijkstra，参数与返回值同 bidirectional_astar
+    """
+    return bidirectional_astar(start, end, graph, reverse_graph=reverse_graph, stats=stats)
+
+def dijkstra_csr(offsets, targets, weights, start):
+    """
+    在 CSR 数组上计算单源最短路（用于预处理）
+    参数:
+        offsets, targets, weights: CSR 邻接数组，节点用下标表示
+        start: 起点下标
+    返回:
+        dist: 到每个节点的最短距离列表，不可达为 inf
+    """
+    offsets = offsets.tolist() if hasattr(offsets, 'tolist') else offsets
+    targets = targets.tolist() if hasattr(targets, 'tolist') else targets
+    weights = weights.tolist() if hasattr(weights, 'tolist') else weights
+    dist = [float('inf')] * (len(offsets) - 1)
+    dist[start] = 0.0
+    pq = [(0.0, start)]
+    while pq:
+        cost, node = heapq.heappop(pq)
+        if cost > dist[node]:
+            continue
+        for k in range(offsets[node], offsets[node + 1]):
+            neighbor = targets[k]
+            new_cost = cost + weights[k]
+            if new_cost < dist[neighbor]:
+                dist[neighbor] = new_cost
+                heapq.heappush(pq, (new_cost, neighbor))
+    return dist
@@ -0,0 +1,232 @@
+import heapq
+import math
+import numpy as np
+from algorithm.Geo import METERS_PER_DEGREE, haversine_array
+
+
+class SpatialGrid:
+    """
+    均匀网格空间索引
+    - 按经纬度把点分到边长约 cell_size 米的网格中（经度方向按参考纬度换算）
+    - 半径查询只检查覆盖圆的网格，对候选点计算精确的球面距离
+    - 最近邻查询逐步扩大半径，直到找到 k 个点或覆盖全部点
+    支持增量插入
+    """
+
+    def __init__(self, cell_size=100.0, ref_latitude=0.0):
+        self.cell_size = cell_size
+        self.cell_lat = cell_size / METERS_PER_DEGREE
+        self.cell_lon = cell_size / (METERS_PER_DEGREE * max(math.cos(math.radians(ref_latitude)), 1e-6))
+        # (行, 列) -> [(纬度, 经度, 数据)]
+        self.cells = {}
+        self.size = 0
+
+    def __len__(self):
+        return self.size
+
+    def _cell(self, latitude, longitude):
+        return math.floor(latitude / self.cell_lat), math.floor(longitude / self.cell_lon)
+
+    def insert(self, item, latitude, longitude):
+        self.cells.setdefault(self._cell(latitude, longitude), []).append((latitude, longitude, item))
+        self.size += 1
+
+    def within(self, latitude, longitude, radius):
+        """
+        半径查询
+        返回:
+            [(距离, 数据)]，未排序
+        """
+        if self.size == 0 or radius < 0:
+            return []
+        dlat = radius / METERS_PER_DEGREE
+        # 圆内纬度绝对值最大处经度跨度最大
+        far_lat = min(max(abs(latitude - dlat), abs(latitude + dlat)), 89.9)
+        dlon = radius / (METERS_PER_DEGREE * math.cos(math.radians(far_lat)))
+        row_min, col_min = self._cell(latitude - dlat, longitude - dlon)
+        row_max, col_max = self._cell(latitude + dlat, longitude + dlon)
+
+        if (row_max - row_min + 1) * (col_max - col_min + 1) > len(self.cells):
+            # 覆盖范围内的网格比非空网格还多时，直接遍历非空网格
+            keys = [key for key in self.cells
+                    if row_min <= key[0] <= row_max and col_min <= key[1] <= col_max]
+        else:
+            keys = [(row, col) for row in range(row_min, row_max + 1) for col in range(col_min, col_max + 1)]
+
+        candidates = [point for key in keys for point in self.cells.get(key, ())]
+        if not candidates:
+            return []
+        lats = np.fromiter((point[0] for point in candidates), dtype=np.float64, count=len(candidates))
+        lons = np.fromiter((point[1] for point in candidates), dtype=np.float64, count=len(candidates))
+        distances = haversine_array(latitude, longitude, lats, lons).tolist()
+        return [(distance, point[2]) for distance, point in zip(distances, candidates) if distance <= radius]
+
+    def nearest(self, latitude, longitude, k, max_distance=float('inf')):
+        """
+        k 近邻查询
+        返回:
+            [(距离, 数据)]，按距离升序，最多 k 个且距离不超过 max_distance
+        """
+        if k <= 0 or self.size == 0:
+            return []
+        radius = min(self.cell_size, max_distance)
+        while True:
+            found = self.within(latitude, longitude, radius)
+            # 半径内已有 k 个点时，半径外的点不可能更近
+            if len(found) >= k or len(found) == self.size or radius >= max_distance:
+                return heapq.nsmallest(k, found, key=lambda pair: pair[0])
+            radius = min(radius * 2, max_distance)
+
+
+class TypedSpatialIndex:
+    """按场所类型划分的网格索引，每种类型一张 SpatialGrid"""
+
+    def __init__(self, cell_size=100.0, ref_latitude=0.0):
+        self.cell_size = cell_size
+        self.ref_latitude = ref_latitude
+        self.grids = {}
+        # 类型 -> 数据集合
+        self.items = {}
+
+    def insert(self, place_type, item, latitude, longitude):
+        grid = self.grids.get(place_type)
+        if grid is None:
+            grid = SpatialGrid(self.cell_size, self.ref_latitude)
+            self.grids[place_type] = grid
+            self.items[place_type] = set()
+        grid.insert(item, latitude, longitude)
+        self.items[place_type].add(item)
+
+    def members(self, place_type):
+        """某类型的全部数据（调用方不得修改）"""
+        return self.items.get(place_type, frozenset())
+
+    def within(self, place_type, latitude, longitude, radius):
+        grid = self.grids.get(place_type)
+        return grid.within(latitude, longitude, radius) if grid is not None else []
+
+    def nearest(self, place_type, latitude, longitude, k, max_distance=float('inf')):
+        grid = self.grids.get(place_type)
+        return grid.nearest(latitude, longitude, k, max_distance) if grid is not None else []
+
+
+class EdgeGrid:
+    """
+    线段（路网边）的均匀网格索引，用于把任意坐标吸附到最近的边
+    - 在以参考点为原点的局部平面（米）上计算，经度方向按参考纬度换算，适用于城市/校园范围
+    - 每条边登记到其外包矩形覆盖的全部网格
+    - 最近边查询从查询点所在网格向外逐圈扩展：第 r 圈之外的边离查询点至少 r * cell_size，
+      已找到的最近距离不超过该值时即可停止
+    - 查询点到全部线段外包矩形的距离超过 max_distance 时直接返回，不逐圈扫描空网格
+    """
+
+    def __init__(self, lat1, lon1, lat2, lon2, cell_size=50.0, ref_latitude=None, ref_longitude=None):
+        """
+        参数:
+            lat1, lon1, lat2, lon2: 各线段两端的纬度、经度数组
+        """
+        lat1, lon1 = np.asarray(lat1, dtype=np.float64), np.asarray(lon1, dtype=np.float64)
+        lat2, lon2 = np.asarray(lat2, dtype=np.float64), np.asarray(lon2, dtype=np.float64)
+        if ref_latitude is None:
+            ref_latitude = float(lat1.mean()) if len(lat1) else 0.0
+        if ref_longitude is None:
+            ref_longitude = float(lon1.mean()) if len(lon1) else 0.0
+        self.cell_size = cell_size
+        self.ref_latitude = ref_latitude
+        self.ref_longitude = ref_longitude
+        self.scale_x = METERS_PER_DEGREE * max(math.cos(math.radians(ref_latitude)), 1e-6)
+        ax, ay = self._project(lat1, lon1)
+        bx, by = self._project(lat2, lon2)
+        self.segments = list(zip(ax.tolist(), ay.tolist(), bx.tolist(), by.tolist()))
+        # (行, 列) -> [线段下标]
+        self.cells = {}
+        rows_min = np.floor(np.minimum(ay, by) / cell_size).astype(np.int64).tolist()
+        rows_max = np.floor(np.maximum(ay, by) / cell_size).astype(np.int64).tolist()
+        cols_min = np.floor(np.minimum(ax, bx) / cell_size).astype(np.int64).tolist()
+        cols_max = np.floor(np.maximum(ax, bx) / cell_size).astype(np.int64).tolist()
+        for i in range(len(self.segments)):
+            for row in range(rows_min[i], rows_max[i] + 1):
+                for col in range(cols_min[i], cols_max[i] + 1):
+                    self.cells.setdefault((row, col), []).append(i)
+        if self.cells:
+            rows = [key[0] for key in self.cells]
+            cols = [key[1] for key in self.cells]
+            self.extent = (min(rows), min(cols), max(rows), max(cols))
+            # 全部线段的外包矩形 (x_min, y_min, x_max, y_max)，单位米
+            self.bounds = (float(min(ax.min(), bx.min())), float(min(ay.min(), by.min())),
+                           float(max(ax.max(), bx.max())), float(max(ay.max(), by.max())))
+        else:
+            self.extent = None
+            self.bounds = None
+
+    def __len__(self):
+        return len(self.segments)
+
+    def _project(self, latitude, longitude):
+        return (longitude - self.ref_longitude) * self.scale_x, (latitude - self.ref_latitude) * METERS_PER_DEGREE
+
+    def nearest(self, latitude, longitude, max_distance=float('inf')):
+        """
+        最近线段查询
+        返回:
+            (距离, 线段下标, 投影点在线段上的比例 t, 投影点纬度, 投影点经度)，t = 0 为线段起点；
+            max_distance 内没有线段时返回 None
+        """
+        if self.extent is None:
+            return None
+        x, y = self._project(latitude, longitude)
+        x_min, y_min, x_max, y_max = self.bounds
+        outside_x = max(x_min - x, 0.0, x - x_max)
+        outside_y = max(y_min - y, 0.0, y - y_max)
+        if math.hypot(outside_x, outside_y) > max_distance:
+            return None
+        size = self.cell_size
+        row, col = math.floor(y / size), math.floor(x / size)
+        row_min, col_min, row_max, col_max = self.extent
+        # 覆盖全部非空网格所需的圈数；查询点在网格范围外时，到达范围之前的圈都是空的
+        last = max(row - row_min, row_max - row, col - col_min, col_max - col, 0)
+        first = max(row_min - row, row - row_max, col_min - col, col - col_max, 0)
+        best, best_d2 = None, float('inf')
+        seen = set()
+        segments, cells = self.segments, self.cells
+        ring = first
+        while ring <= last:
+            if ring == 0:
+                keys = [(row, col)]
+            else:
+                # 只取第 ring 圈落在网格范围内的部分，查询点离路网很远时每圈的网格数不随圈数增长
+                c_lo, c_hi = max(col - ring, col_min), min(col + ring, col_max)
+                r_lo, r_hi = max(row - ring + 1, row_min), min(row + ring - 1, row_max)
+                keys = []
+                for r in (row - ring, row + ring):
+                    if row_min <= r <= row_max:
+                        keys += [(r, c) for c in range(c_lo, c_hi + 1)]
+                for c in (col - ring, col + ring):
+                    if col_min <= c <= col_max:
+                        keys += [(r, c) for r in range(r_lo, r_hi + 1)]
+            for key in keys:
+                for i in cells.get(key, ()):
+                    if i in seen:
+                        continue
+                    seen.add(i)
+                    ax, ay, bx, by = segments[i]
+                    dx, dy = bx - ax, by - ay
+                    length2 = dx * dx + dy * dy
+                    t = 0.0 if length2 == 0 else max(0.0, min(1.0, ((x - ax) * dx + (y - ay) * dy) / length2))
+                    px, py = ax + t * dx - x, ay + t * dy - y
+                    d2 = px * px + py * py
+                    if d2 < best_d2:
+                        best, best_d2 = (i, t), d2
+            # 未检查的线段都在第 ring 圈之外，离查询点至少 ring * size
+            if best is not None and math.sqrt(best_d2) <= ring * size:
+                break
+            if ring * size > max_distance:
+                break
+            ring += 1
+        if best is None or math.sqrt(best_d2) > max_distance:
+            return None
+        i, t = best
+        ax, ay, bx, by = segments[i]
+        px, py = ax + t * (bx - ax), ay + t * (by - ay)
+        return (math.sqrt(best_d2), i, t,
+                py / METERS_PER_DEGREE + self.ref_latitude, px / self.scale_x + self.ref_longitude)
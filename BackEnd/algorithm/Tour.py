@@ -0,0 +1,168 @@
+import time
+import numpy as np
+
+INF = float('inf')
+
+
+def tour_cost(dist, tour):
+    """
+    计算闭合回路的总长度
+    参数:
+        dist: (k+1)x(k+1) 距离矩阵，下标 0 为起点
+        tour: 以 0 开头的访问顺序（不含返回起点）
+    """
+    total = 0.0
+    for a, b in zip(tour, tour[1:] + tour[:1]):
+        total += dist[a][b]
+    return total
+
+
+def held_karp(dist):
+    """
+    Held-Karp 动态规划求解从 0 出发、访问所有点后回到 0 的最短回路
+    按子集大小逐层向量化计算，复杂度 O(2^k * k^2)
+    参数:
+        dist: (k+1)x(k+1) 距离矩阵，下标 0 为起点
+    返回:
+        tour: 以 0 开头的访问顺序
+        cost: 回路总长度
+    """
+    dist = np.asarray(dist, dtype=np.float64)
+    k = dist.shape[0] - 1
+    if k <= 0:
+        return [0], 0.0
+    targets = dist[1:, 1:]
+    full = (1 << k) - 1
+    # dp[mask][j]: 从起点出发、恰好访问 mask 中的点且停在 j 的最短距离
+    dp = np.full((1 << k, k), np.inf)
+    parent = np.full((1 << k, k), -1, dtype=np.int64)
+    for j in range(k):
+        dp[1 << j, j] = dist[0, j + 1]
+
+    masks = np.arange(1 << k)
+    popcount = np.zeros(1 << k, dtype=np.int64)
+    for j in range(k):
+        popcount += (masks >> j) & 1
+    bits = 1 << np.arange(k)
+
+    for size in range(1, k):
+        layer = masks[popcount == size]
+        # cand[m, i, j] = dp[mask_m, i] + d(i, j)
+        cand = dp[layer][:, :, None] + targets[None, :, :]
+        best_prev = cand.argmin(axis=1)
+        best_cost = np.take_along_axis(cand, best_prev[:, None, :], axis=1)[:, 0, :]
+        for j in range(k):
+            free = (layer & bits[j]) == 0
+            if not free.any():
+                continue
+            new_masks = layer[free] | bits[j]
+            # 同一层中不同 mask 加入 j 后得到的新 mask 互不相同，可以直接赋值
+            dp[new_masks, j] = best_cost[free, j]
+            parent[new_masks, j] = best_prev[free, j]
+
+    closing = dp[full] + dist[1:, 0]
+    last = int(closing.argmin())
+    cost = float(closing[last])
+    if cost == INF:
+        return [], INF
+
+    order = []
+    mask = full
+    while last != -1:
+        order.append(last + 1)
+        previous = int(parent[mask, last])
+        mask ^= 1 << last
+        last = previous
+    order.reverse()
+    return [0] + order, cost
+
+
+def nearest_neighbor_tour(dist):
+    """最近邻构造初始回路"""
+    n = len(dist)
+    tour = [0]
+    remaining = set(range(1, n))
+    while remaining:
+        current = tour[-1]
+        nearest = min(remaining, key=lambda node: dist[current][node])
+        tour.append(nearest)
+        remaining.discard(nearest)
+    return tour
+
+
+def improve_tour(dist, tour, time_budget=1.0):
+    """
+    在时间预算内用 2-opt 与 Or-opt 局部搜索改进回路（距离矩阵需对称）
+    参数:
+        dist: 距离矩阵
+        tour: 以 0 开头的初始回路，起点位置保持不变
+        time_budget: 最长运行时间（秒）
+    返回:
+        改进后的回路
+    """
+    deadline = time.perf_counter() + time_budget
+    tour = list(tour)
+    n = len(tour)
+    if n < 4:
+        return tour
+    improved = True
+    while improved and time.perf_counter() < deadline:
+        improved = False
+        # 2-opt：反转 tour[i..j]
+        for i in range(1, n - 1):
+            a, b = tour[i - 1], tour[i]
+            for j in range(i + 1, n):
+                c, d = tour[j], tour[(j + 1) % n]
+                delta = dist[a][c] + dist[b][d] - dist[a][b] - dist[c][d]
+                if delta < -1e-9:
+                    tour[i:j + 1] = reversed(tour[i:j + 1])
+                    a, b = tour[i - 1], tour[i]
+                    improved = True
+            if time.perf_counter() >= deadline:
+                return tour
+        # Or-opt：把长度 1~3 的连续片段移动到其他位置
+        for length in (1, 2, 3):
+            i = 1
+            while i + length <= n:
+                segment = tour[i:i + length]
+                prev_node, next_node = tour[i - 1], tour[(i + length) % n]
+                removed_gain = (dist[prev_node][segment[0]] + dist[segment[-1]][next_node]
+                                - dist[prev_node][next_node])
+                rest = tour[:i] + tour[i + length:]
+                best_delta, best_pos, best_segment = -1e-9, None, None
+                for p in range(len(rest)):
+                    x, y = rest[p], rest[(p + 1) % len(rest)]
+                    for candidate in (segment, segment[::-1]):
+                        delta = (dist[x][candidate[0]] + dist[candidate[-1]][y] - dist[x][y]) - removed_gain
+                        if delta < best_delta:
+                            best_delta, best_pos, best_segment = delta, p, candidate
+                if best_pos is not None:
+                    tour = rest[:best_pos + 1] + list(best_segment) + rest[best_pos + 1:]
+                    improved = True
+                i += 1
+            if time.perf_counter() >= deadline:
+                return tour
+    return tour
+
+
+def solve_tour(dist, time_budget=1.0, exact_limit=15):
+    """
+    求解从起点出发访问所有目标点并返回起点的回路
+    目标点不超过 exact_limit 个时用 Held-Karp 精确求解，否则用最近邻 + 局部搜索
+    参数:
+        dist: (k+1)x(k+1) 距离矩阵，下标 0 为起点，不可达为 inf
+        time_budget: 局部搜索的时间预算（秒）
+        exact_limit: 精确求解的目标点数上限
+    返回:
+        tour: 以 0 开头的访问顺序，存在不可达目标时为空列表
+        cost: 回路总长度
+    """
+    dist = np.asarray(dist, dtype=np.float64)
+    if not np.isfinite(dist).all():
+        return [], INF
+    k = dist.shape[0] - 1
+    if k <= exact_limit:
+        return held_karp(dist)
+    matrix = dist.tolist()
+    tour = improve_tour(matrix, nearest_neighbor_tour(matrix), time_budget)
+    return tour, tour_cost(matrix, tour)
@@ -22,6 +22,17 @@ AI_VIDEO_TASK = os.path.join(DATA_DIR, "ai_video_task.json")
 DIARIES_FILE = os.path.join(DATA_DIR, "diaries.json")
 # 地图数据文件路径（存储图结构数据，格式示例：{"A": {"B": 1, "C": 4}, "B": {"A": 1, "C": 2, "D": 5}, ...}）
 MAP_FILE = os.path.join(DATA_DIR, "map.json")
+# 二进制路网文件（内存映射加载，多进程共享页缓存），存在时代替 map.json 作为路网快照，
+# 由 python -m app.services.map_service build_binary 生成
+MAP_BINARY_FILE = os.path.join(DATA_DIR, "map.bin")
+# 地图编辑日志（JSON Lines，只追加），启动时在 map.json 快照上重放，定期压缩回 map.json
+MAP_LOG_FILE = os.path.join(DATA_DIR, "map_edits.jsonl")
+# 收缩层次预处理结果（捷径与节点层级），由 map_service 离线生成
+CH_FILE = os.path.join(DATA_DIR, "map_ch.json")
+# 全源最短路矩阵的元数据，矩阵本身保存为同目录下的 map_apsp_<出行方式>_dist.npy / _next.npy
+APSP_FILE = os.path.join(DATA_DIR, "map_apsp.json")
+# 分时拥挤度数组（边数 x 时间片数），不存在时由本地模拟器生成
+CONGESTION_FILE = os.path.join(DATA_DIR, "map_congestion.npy")
 # 室内导航数据文件路径
 INDOOR_FILE = os.path.join(DATA_DIR, "indoor.json")
 # 室内导航缓存数据文件路径
@@ -5,6 +5,7 @@ from fastapi.staticfiles import StaticFiles
 # 导入路由模块
 from app.routers import upload, users, diaries, spots, map, foods, AIGen, recommend
 from app.config import *
+from app.services.route_executor import route_executor
 
 # --------------------------- 初始化 FastAPI 应用 ---------------------------
 app = FastAPI(
@@ -98,6 +99,15 @@ app.include_router(
     tags=["地图查询"]
 )
 
+# 服务启动时创建路径规划工作进程并加载路网，关闭时结束
+@app.on_event("startup")
+def start_route_executor():
+    route_executor.start()
+
+@app.on_event("shutdown")
+def shutdown_route_executor():
+    route_executor.shutdown()
+
 # 美食搜索路由（前缀 /foods，标签"美食搜索"）
 app.include_router(
     foods.router,
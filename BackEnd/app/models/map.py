@@ -1,14 +1,25 @@
 from pydantic import BaseModel, Field
 from typing import Optional, List, Dict,Any
 
+# 出发时间（Unix 时间戳，秒）的上限：公元 9999 年末，更大的值换算本地时间时会溢出
+MAX_DEPARTURE_TIME = 253402300799.0
+
+class Location(BaseModel):
+    """任意坐标（如手机定位），路径规划时吸附到最近的道路上"""
+    longitude: float
+    latitude: float
+
 class OneToOnePathRequest(BaseModel):
     """
     路径规划请求模型：
       - start: 起点名称
       - end: 终点名称
+      - start_location / end_location: 可选的起终点坐标，给出时忽略对应的名称
     """
-    start: str
-    end: str
+    start: str = ""
+    end: str = ""
+    start_location: Optional[Location] = None
+    end_location: Optional[Location] = None
 
 class OneToOnePathResponse(BaseModel):
     path: list
@@ -20,10 +31,16 @@ class OneToOneTimeRequest(BaseModel):
         - start: 起点名称
         - end: 终点名称
         - mode: 交通方式
+        - departure_time: 可选出发时间
+        - start_location / end_location: 可选的起终点坐标，给出时忽略对应的名称
     """
-    start: str
-    end: str
+    start: str = ""
+    end: str = ""
+    start_location: Optional[Location] = None
+    end_location: Optional[Location] = None
     mode: str = "bike"
+    # 出发时间（Unix 时间戳，秒），提供时按分时拥挤度做时变搜索
+    departure_time: Optional[float] = Field(default=None, ge=0, le=MAX_DEPARTURE_TIME)
 
 class OneToOneTimeResponse(BaseModel):
     path: list
@@ -31,6 +48,22 @@ class OneToOneTimeResponse(BaseModel):
     time: float
     distance: float
 
+class SnapResponse(BaseModel):
+    """
+    坐标吸附结果：
+        - edge_id / start_node / end_node: 最近的边及其端点
+        - fraction: 投影点到 start_node 的长度占边长的比例
+        - distance: 坐标到投影点的距离（米）
+        - longitude / latitude: 投影点坐标
+    """
+    edge_id: int
+    start_node: int
+    end_node: int
+    fraction: float
+    distance: float
+    longitude: float
+    latitude: float
+
 class OneToManyPathRequest(BaseModel):
     """
     路径规划请求模型：
@@ -41,8 +74,154 @@ class OneToManyPathRequest(BaseModel):
     end: List[str]
 
 class OneToManyPathResponse(BaseModel):
+    """
+    多点路径响应模型：
+        - path: 拼接后的完整路径（从起点出发并回到起点）
+        - distance: 回路总距离
+        - order: 目的地的访问顺序
+    """
+    path: list
+    distance: float
+    order: List[str] = []
+
+class BatchRouteItem(BaseModel):
+    """
+    批量路径规划中的单条请求：
+        - start: 起点名称
+        - end: 终点名称
+        - mode: distance 表示最短路径，其余为交通方式（walk/bike/ebike/walk_bike/walk_ebike，最短时间）
+    """
+    start: str
+    end: str
+    mode: str = "distance"
+
+class BatchRouteRequest(BaseModel):
+    routes: List[BatchRouteItem]
+
+class BatchRouteResult(BaseModel):
+    """单条路径结果，found 为 False 时 detail 说明原因"""
+    start: str
+    end: str
+    mode: str
+    found: bool
+    path: list = []
+    path_mode: List[str] = []
+    distance: Optional[float] = None
+    time: Optional[float] = None
+    detail: str = ""
+
+class BatchRouteResponse(BaseModel):
+    """批量路径规划响应，结果顺序与请求一致"""
+    results: List[BatchRouteResult] = []
+
+class CongestionUpdate(BaseModel):
+    """
+    单条拥挤度更新：
+        - edge_id: 边ID
+        - factor: 拥挤度，取值 (0, 1]，1 表示畅通
+        - slot: 时间片编号，为空时更新整天
+    """
+    edge_id: int
+    factor: float
+    slot: Optional[int] = None
+
+class CongestionUpdateRequest(BaseModel):
+    updates: List[CongestionUpdate]
+
+class CongestionUpdateResponse(BaseModel):
+    updated: int
+    revision: int
+
+class ParetoRouteRequest(BaseModel):
+    """多目标路径请求"""
+    start: str
+    end: str
+    mode: str = "walk"
+    # ε-支配的松弛系数，越大返回的方案越少
+    epsilon: float = Field(default=0.0, ge=0)
+    # 每个节点保留的标号数上限
+    max_labels: int = Field(default=8, ge=1, le=64)
+    departure_time: Optional[float] = Field(default=None, ge=0, le=MAX_DEPARTURE_TIME)
+
+class ParetoRoute(BaseModel):
+    """一条 Pareto 最优路径"""
     path: list
+    path_mode: List[str] = []
+    time: float         # 耗时（秒）
+    distance: float     # 距离（米）
+    crowd: float        # 拥挤暴露：距离 * (1 - 拥挤度) 的累加（米）
+
+class ParetoRouteResponse(BaseModel):
+    routes: List[ParetoRoute] = []
+
+class AlternativeRouteRequest(BaseModel):
+    """备选路径请求，mode 为 distance 时按距离，否则按通行时间"""
+    start: str
+    end: str
+    mode: str = "distance"
+    k: int = Field(default=3, ge=1, le=10)
+    # 与已选路径的重叠度上限（共享路段代价 / 路径代价），1 表示不过滤
+    max_overlap: float = Field(default=0.8, ge=0, le=1)
+
+class AlternativeRoute(BaseModel):
+    path: list
+    path_mode: List[str] = []
     distance: float
+    time: Optional[float] = None
+
+class AlternativeRouteResponse(BaseModel):
+    routes: List[AlternativeRoute] = []
+
+class RouteCacheStatsResponse(BaseModel):
+    """路径结果缓存统计"""
+    capacity: int
+    size: int
+    hits: int
+    misses: int
+    evictions: int
+    hit_rate: float
+
+class IsochroneRequest(BaseModel):
+    """
+    等时圈请求模型：
+        - start: 起点名称
+        - mode: 交通方式（walk/bike/ebike/walk_bike/walk_ebike），distance 表示按路网距离
+        - budget: 时间预算（秒），mode 为 distance 时为距离预算（米）
+        - hull: 外轮廓类型，none / convex（凸包）/ concave（凹包）
+    """
+    start: str
+    mode: str = "walk"
+    budget: float = Field(default=600.0, ge=0)
+    hull: str = "convex"
+
+class IsochroneNode(BaseModel):
+    """可到达的节点及到达所需的时间（或距离）"""
+    id: int
+    name: str
+    type: str
+    longitude: float
+    latitude: float
+    cost: float
+
+class IsochroneBoundaryEdge(BaseModel):
+    """
+    只能走到一部分的边界边：
+        - fraction: 从 start_node 出发能走过的比例
+        - longitude / latitude: 预算耗尽时所在的位置
+    """
+    start_node: int
+    end_node: int
+    mode: str
+    fraction: float
+    longitude: float
+    latitude: float
+
+class IsochroneResponse(BaseModel):
+    """等时圈响应：可到达节点（按耗时升序）、边界边、外轮廓（[经度, 纬度] 列表）与按类型分组的地点"""
+    reachable: List[IsochroneNode] = []
+    boundary: List[IsochroneBoundaryEdge] = []
+    hull: List[List[float]] = []
+    pois: Dict[str, List[IsochroneNode]] = {}
 
 class IndoorRequest(BaseModel):
     start: str
@@ -52,6 +231,40 @@ class IndoorResponse(BaseModel):
     path: list
     distance: float
 
+class UnifiedRouteRequest(BaseModel):
+    """室内外联合路径请求"""
+    start: str
+    end: str
+    # 地点所在的层：outdoor 或建筑ID，为空时先找室外再找室内
+    start_building: Optional[str] = None
+    end_building: Optional[str] = None
+
+class UnifiedSegment(BaseModel):
+    """联合路径中同一层、同一楼层的连续路段"""
+    level: str                  # outdoor 或建筑ID
+    floor: Optional[str] = None # 室外路段为空
+    path: list
+
+class UnifiedRouteResponse(BaseModel):
+    """室内外联合路径结果"""
+    cost: float                 # 含电梯/楼梯换乘代价的总代价（等效米）
+    distance: float             # 实际距离（米）
+    path: list
+    segments: List[UnifiedSegment] = []
+
+class IndoorSegment(BaseModel):
+    """室内路径在某一楼层上的连续路段"""
+    floor: str
+    path: list
+
+class IndoorRouteResponse(BaseModel):
+    """室内导航结果"""
+    success: bool = True
+    id: str                 # 结果ID，可用于按楼层获取路径
+    distance: float
+    path: list              # 完整路径
+    segments: List[IndoorSegment] = []
+
 class NodeRequestRaw(BaseModel):
     nodeData: Dict[str, Any]
 
@@ -85,6 +298,10 @@ class PlaceQueryRequest(BaseModel):
     query_type: str     # 要查询的场所类型（如："超市", "卫生间" 等）
     max_results: int = 100  # 最多返回结果数量，默认为100
     max_distance: float = 1000.0  # 最大范围，默认为1000m
+    # 距离计算方式：straight 为直线距离；network 为沿路网的步行距离
+    mode: str = "straight"
+    # network 模式的起点名称，为空时使用离用户坐标最近的路网节点
+    start: Optional[str] = None
 
 class PlaceDetail(BaseModel):
     """场所详情响应模型"""
@@ -94,8 +311,22 @@ class PlaceDetail(BaseModel):
     popularity: int         # 场所人气值
     longitude: float        # 场所经度
     latitude: float         # 场所纬度
-    distance: float         # 距离用户的直线距离（单位：米）
+    distance: float         # 距离用户的直线距离或路网距离（单位：米）
 
 class PlaceResponse(BaseModel):
     """场所查询响应模型"""
-    places: List[PlaceDetail] = []
\ No newline at end of file
+    places: List[PlaceDetail] = []
+
+class MapImportError(BaseModel):
+    """批量导入中不合法的行"""
+    source: str     # nodes / edges
+    line: int       # CSV 行号或 GeoJSON 要素序号（从 1 开始）
+    reason: str
+
+class MapImportResponse(BaseModel):
+    """批量导入结果"""
+    nodes: int      # 导入的节点数
+    edges: int      # 导入的边数
+    version: int    # 导入后的路网版本
+    error_count: int = 0
+    errors: List[MapImportError] = []
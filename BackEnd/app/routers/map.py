@@ -1,46 +1,202 @@
-from fastapi import APIRouter, HTTPException, Query
+import io
+import csv
+import json
+from typing import Optional
+from fastapi import APIRouter, HTTPException, Query, UploadFile, File, Form, Request, Response
 from app.models.map import *
 from app.services import map_service
+from app.services.route_executor import route_executor, RouteQueueFull, RouteTimeout
+from utils.map_import import iter_csv, iter_geojson, NODE_COLUMNS, EDGE_COLUMNS
 
 router = APIRouter(tags=["地图查询"])
 
+async def _route(name, *args, **kwargs):
+    """在路径规划进程池中执行查询：地点不存在等错误返回 404，排队已满返回 503，超时返回 504"""
+    try:
+        return await route_executor.run(name, *args, **kwargs)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except RouteQueueFull as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except RouteTimeout as e:
+        raise HTTPException(status_code=504, detail=str(e))
+
+def _location(location):
+    """请求中的坐标转为 (经度, 纬度)"""
+    return None if location is None else (location.longitude, location.latitude)
+
+@router.get("/snap", response_model=SnapResponse, summary="坐标吸附到最近的道路")
+def snap_point(longitude: float = Query(..., description="经度"),
+               latitude: float = Query(..., description="纬度"),
+               max_distance: float = Query(default=map_service.SNAP_MAX_DISTANCE, gt=0,
+                                           le=map_service.SNAP_DISTANCE_LIMIT, description="最大吸附距离（米）")):
+    """把任意坐标投影到最近的路网边上，返回所在的边与投影点"""
+    try:
+        return SnapResponse(**map_service.snap_point(longitude, latitude, max_distance))
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
 @router.post("/path_plan/one_to_one_shortest_path", response_model=OneToOnePathResponse, summary="一到一最短路")
-def one_to_one_shortest_path(map_req: OneToOnePathRequest):
+async def one_to_one_shortest_path(map_req: OneToOnePathRequest):
     print(map_req)
-    path, distance = map_service.one_to_one_shortest_path(map_req.start, map_req.end)
+    path, distance = await _route("one_to_one_shortest_path", map_req.start, map_req.end,
+                                  start_location=_location(map_req.start_location),
+                                  end_location=_location(map_req.end_location))
     if distance == float('inf'):
         raise HTTPException(status_code=404, detail="未能找到合适的路径")
     return OneToOnePathResponse(path=path, distance=distance)
 
 @router.post("/path_plan/one_to_one_shortest_time", response_model=OneToOneTimeResponse, summary="一到一最短时间")
-def one_to_one_shortest_time(map_req: OneToOneTimeRequest):
-    path, mode, time, distance = map_service.one_to_one_shortest_time(map_req.start, map_req.end, map_req.mode)
+async def one_to_one_shortest_time(map_req: OneToOneTimeRequest):
+    path, mode, time, distance = await _route(
+        "one_to_one_shortest_time", map_req.start, map_req.end, map_req.mode, departure_time=map_req.departure_time,
+        start_location=_location(map_req.start_location), end_location=_location(map_req.end_location))
     if distance == float('inf'):
         raise HTTPException(status_code=404, detail="未能找到合适的路径")
     return OneToOneTimeResponse(path=path,mode=mode,time=time,distance=distance)
 
 @router.post("/path_plan/one_to_many_shortest_path", response_model=OneToManyPathResponse, summary="一到多最短路")
-def one_to_many_shortest_path(map_req: OneToManyPathRequest):
-    path, distance = map_service.one_to_many_shortest_path(map_req.start, map_req.end)
+async def one_to_many_shortest_path(map_req: OneToManyPathRequest):
+    path, distance, order = await _route("one_to_many_shortest_path", map_req.start, map_req.end)
     if distance == float('inf'):
         raise HTTPException(status_code=404, detail="未能找到合适的路径")
-    return OneToOnePathResponse(path=path, distance=distance)
+    return OneToManyPathResponse(path=path, distance=distance, order=order)
+
+@router.post("/path_plan/batch", response_model=BatchRouteResponse, summary="批量路径规划")
+def batch_shortest_paths(map_req: BatchRouteRequest):
+    """
+    批量路径规划：
+      - 接收 (起点, 终点, 出行方式) 列表
+      - 相同起点与出行方式的请求共享一棵单源最短路树
+      - 单条请求失败不影响其他结果，found 为 False 时 detail 说明原因
+    """
+    results = map_service.batch_shortest_paths([(item.start, item.end, item.mode) for item in map_req.routes])
+    return BatchRouteResponse(results=results)
 
-@router.post("/path_plan/indoor_shortest_path", response_model=dict, summary="室内导航")
+@router.post("/congestion/update", response_model=CongestionUpdateResponse, summary="批量更新拥挤度")
+def update_congestion(map_req: CongestionUpdateRequest):
+    """批量更新各边（整天或指定时间片）的拥挤度，无需重建路网"""
+    try:
+        info = map_service.update_congestion([(item.edge_id, item.factor, item.slot) for item in map_req.updates])
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return CongestionUpdateResponse(**info)
+
+@router.post("/path_plan/pareto", response_model=ParetoRouteResponse, summary="多目标路径（耗时/距离/拥挤）")
+def pareto_routes(map_req: ParetoRouteRequest):
+    """返回耗时、距离、拥挤暴露三者权衡下的全部 Pareto 最优路径，按耗时升序"""
+    try:
+        routes = map_service.pareto_routes(map_req.start, map_req.end, map_req.mode, map_req.epsilon,
+                                           map_req.max_labels, map_req.departure_time)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if not routes:
+        raise HTTPException(status_code=404, detail="未能找到合适的路径")
+    return ParetoRouteResponse(routes=routes)
+
+@router.post("/path_plan/alternatives", response_model=AlternativeRouteResponse, summary="备选路径")
+def alternative_routes(map_req: AlternativeRouteRequest):
+    """返回至多 k 条互相重叠不超过 max_overlap 的无环路径，第一条为最优路径"""
+    try:
+        routes = map_service.alternative_routes(map_req.start, map_req.end, map_req.mode, map_req.k,
+                                                map_req.max_overlap)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if not routes:
+        raise HTTPException(status_code=404, detail="未能找到合适的路径")
+    return AlternativeRouteResponse(routes=routes)
+
+@router.get("/path_plan/cache_stats", response_model=RouteCacheStatsResponse, summary="路径缓存统计")
+def route_cache_stats():
+    """路径结果缓存的容量、命中、未命中与淘汰次数"""
+    return RouteCacheStatsResponse(**map_service.get_route_cache_stats())
+
+@router.post("/isochrone", response_model=IsochroneResponse, summary="等时圈")
+def isochrone(map_req: IsochroneRequest):
+    """
+    等时圈查询：
+      - 返回在时间（或距离）预算内从起点可到达的节点、只能走到一部分的边界边
+      - 可选返回凸包 / 凹包外轮廓
+      - 可到达的地点按类型分组，便于前端一次渲染
+    """
+    try:
+        result = map_service.isochrone(map_req.start, map_req.mode, map_req.budget, map_req.hull)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return IsochroneResponse(**result)
+
+@router.post("/path_plan/indoor_shortest_path", response_model=IndoorRouteResponse, summary="室内导航")
 def indoor_shortest_path(map_req: IndoorRequest):
-    print(map_req)
-    response = map_service.indoor_shortest_path_v2(map_req.start, map_req.end)
+    try:
+        response = map_service.indoor_shortest_path(map_req.start, map_req.end)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
     return response
 
+@router.post("/path_plan/unified_shortest_path", response_model=UnifiedRouteResponse, summary="室内外联合导航")
+def unified_shortest_path(map_req: UnifiedRouteRequest):
+    try:
+        result = map_service.unified_shortest_path(map_req.start, map_req.end,
+                                                   map_req.start_building, map_req.end_building)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    return UnifiedRouteResponse(**result)
+
 @router.get("/path_plan/indoor_shortest_path", response_model=IndoorResponse, summary="获取室内导航结果")
-def get_indoor_path(floor: str = Query(..., description="楼层")):
-    path, distance = map_service.get_indoor_path(floor)
+def get_indoor_path(floor: str = Query(..., description="楼层"),
+                    id: Optional[str] = Query(default=None, description="室内导航结果ID，为空时取最近一次的结果")):
+    try:
+        path, distance = map_service.get_indoor_path(floor, id)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
     return IndoorResponse(path=path, distance=distance)
     
+def _negotiate_encoding(accept_encoding):
+    """按服务端优先顺序选择客户端接受的压缩编码（q=0 视为不接受）"""
+    accepted = set()
+    for item in accept_encoding.split(","):
+        name, *params = [part.strip() for part in item.split(";")]
+        quality = 1.0
+        for param in params:
+            key, _, value = param.partition("=")
+            if key.strip() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if name and quality > 0:
+            accepted.add(name.lower())
+    for encoding in map_service.GRAPH_ENCODINGS:
+        if encoding in accepted or "*" in accepted:
+            return encoding
+    return "identity"
+
+def _etag_matches(if_none_match, etag):
+    if not if_none_match:
+        return False
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    # If-None-Match 使用弱比较
+    return "*" in candidates or any(tag.removeprefix("W/") == etag.removeprefix("W/") for tag in candidates)
+
 @router.get("/get_graph", summary="获取地图信息")
-def get_graph():
-    """获取地图信息"""
-    return map_service.get_map()
+def get_graph(request: Request,
+              since_version: Optional[int] = Query(default=None, description="只返回该版本之后新增的节点与边")):
+    """
+    获取地图信息：
+      - 每个版本的序列化结果只生成一次，按 Accept-Encoding 返回预压缩的 gzip / br
+      - 带 ETag，If-None-Match 命中时返回 304
+      - 传入 since_version 时返回增量，见 map_service.get_map_delta
+    """
+    if since_version is not None:
+        return map_service.get_map_delta(since_version)
+    encoding = _negotiate_encoding(request.headers.get("accept-encoding", ""))
+    etag, body = map_service.get_map_payload(encoding)
+    headers = {"ETag": etag, "Cache-Control": "no-cache", "Vary": "Accept-Encoding"}
+    if _etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    if encoding != "identity":
+        headers["Content-Encoding"] = encoding
+    return Response(content=body, media_type="application/json", headers=headers)
 
 @router.get("/search_nodes", response_model=List[str],summary="获取节点名字")
 def search_node(name: str = Query(default="__all__", description="节点部分名字")):
@@ -53,15 +209,14 @@ def add_node(node: NodeRequestRaw):
     添加地图节点：
       - 接收节点信息
       - 验证节点ID唯一性
-      - 追加到map.json数据文件
-      - 返回新的图信息
+      - 追加到地图编辑日志
+      - 返回新节点与路网版本号
     """
-    print(node)
     node_data = NodeRequest(**node.nodeData)
     info = map_service.add_node(node_data)
     if not info.get("success", False):
         raise HTTPException(status_code=404, detail="节点编号重复")
-    return info.get("graph", {"nodes" : [] , "edges" : [] })
+    return {"node": info["node"], "version": info["version"]}
 
 @router.post("/add_edge", summary="添加地图边")
 def add_edge(edge: EdgeRequestRaw):
@@ -69,34 +224,78 @@ def add_edge(edge: EdgeRequestRaw):
     添加地图边：
       - 接收边信息
       - 验证边ID和两端点唯一性
-      - 追加到map.json数据文件
-      - 返回新的图信息
+      - 追加到地图编辑日志
+      - 返回新边与路网版本号
     """
-
-    print(edge)
     edge_data = EdgeRequest(**edge.edgeDataToSend)
     info = map_service.add_edge(edge_data)
     if not info.get("success", False):
         raise HTTPException(status_code=404, detail="边信息不合法")
-    return info.get("graph", {"nodes" : [] , "edges" : [] })
+    return {"edge": info["edge"], "version": info["version"]}
+
+@router.post("/import", response_model=MapImportResponse, summary="批量导入地图数据")
+def import_map(nodes: Optional[UploadFile] = File(default=None, description="节点 CSV：id,name,longitude,latitude,type[,popularity]"),
+               edges: Optional[UploadFile] = File(default=None, description="边 CSV：id,start_node,end_node[,walk_speed,bike_speed,ebike_speed]"),
+               geojson: Optional[UploadFile] = File(default=None, description="GeoJSON：Point 为节点，LineString 为边"),
+               skip_invalid: bool = Form(default=False, description="跳过不合法的行，否则整批拒绝")):
+    """
+    批量导入节点与边：
+      - CSV 逐行流式解析，可带表头；GeoJSON 与 CSV 二选一
+      - 编号、端点引用与重复边在内存中校验，边长统一计算
+      - 整批原子提交，只重建一次路网快照
+    """
+    if geojson is not None:
+        try:
+            data = json.load(io.TextIOWrapper(geojson.file, encoding="utf-8-sig"))
+        except (UnicodeDecodeError, json.JSONDecodeError):
+            raise HTTPException(status_code=400, detail="GeoJSON 格式错误")
+        node_rows, edge_rows = iter_geojson(data)
+    elif nodes is not None or edges is not None:
+        node_rows = iter_csv(io.TextIOWrapper(nodes.file, encoding="utf-8-sig", newline=""), NODE_COLUMNS) if nodes else ()
+        edge_rows = iter_csv(io.TextIOWrapper(edges.file, encoding="utf-8-sig", newline=""), EDGE_COLUMNS) if edges else ()
+    else:
+        raise HTTPException(status_code=400, detail="请上传节点/边 CSV 或 GeoJSON 文件")
+    try:
+        result = map_service.import_map(node_rows, edge_rows, skip_invalid)
+    except (UnicodeDecodeError, csv.Error):
+        raise HTTPException(status_code=400, detail="CSV 格式错误或不是 UTF-8 编码")
+    if not result["success"]:
+        raise HTTPException(status_code=400, detail={"error_count": result["error_count"], "errors": result["errors"]})
+    return MapImportResponse(**result)
 
 @router.post("/search_places", response_model=PlaceResponse, summary="查询最近场所")
 def search_places(query: PlaceQueryRequest):
     """
     场所查询服务：
       - 根据用户坐标和场所类型进行搜索
+      - mode 为 straight（默认）时按直线距离，为 network 时按路网步行距离
       - 返回按距离排序的场所列表（由近到远）
       - 当没有匹配类型场所时，返回404错误
     """
     # 调用服务层获取查询结果
     print(query)
-    found_places = map_service.search_places(
-        longitude=query.longitude,
-        latitude=query.latitude,
-        query_type=query.query_type,
-        max_results=query.max_results,
-        max_distance=query.max_distance
-    )
+    if query.mode == "straight":
+        found_places = map_service.search_places(
+            longitude=query.longitude,
+            latitude=query.latitude,
+            query_type=query.query_type,
+            max_results=query.max_results,
+            max_distance=query.max_distance
+        )
+    elif query.mode == "network":
+        try:
+            found_places = map_service.search_places_network(
+                longitude=query.longitude,
+                latitude=query.latitude,
+                query_type=query.query_type,
+                max_results=query.max_results,
+                max_distance=query.max_distance,
+                start_name=query.start
+            )
+        except ValueError as e:
+            raise HTTPException(status_code=404, detail=str(e))
+    else:
+        raise HTTPException(status_code=400, detail=f"不支持的查询方式 {query.mode}")
 
     # 处理无结果情况
     if not found_places:
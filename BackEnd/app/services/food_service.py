@@ -1,34 +1,28 @@
-import math
+import numpy as np
 from typing import List, Optional
 from app.models.foods import FoodResponse
 from app.config import FOODS_FILE
 from utils.file_utils import read_json
+from algorithm.Geo import GeoPoints
 
 # 全局变量存储美食数据
 foods_list = None
+# 美食坐标数组（与 foods_list 顺序一致）
+food_points = None
 
 def _load_foods_data():
     """加载景点数据到内存"""
     global foods_list
+    global food_points
     if foods_list is not None:
         return
     foods_dict = read_json(FOODS_FILE, default={})
     foods_list = foods_dict.get("foods",[])
+    food_points = GeoPoints.from_records(foods_list)
 
 # 服务启动时加载数据
 _load_foods_data()
 
-def haversine(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
-    """计算两个经纬度坐标之间的距离（公里）"""
-    R = 6371000  # 地球半径（米）
-    dlat = math.radians(lat2 - lat1)
-    dlon = math.radians(lon2 - lon1)
-    a = (math.sin(dlat/2) * math.sin(dlat/2) +
-         math.cos(math.radians(lat1)) * math.cos(math.radians(lat2)) *
-         math.sin(dlon/2) * math.sin(dlon/2))
-    c = 2 * math.atan2(math.sqrt(a), math.sqrt(1-a))
-    return R * c
-
 def search_foods(
     latitude: float,
     longitude: float,
@@ -37,26 +31,26 @@ def search_foods(
     sort_key: Optional[str] = None
 ) -> List[FoodResponse]:
     
-    # 初步筛选
-    filtered = foods_list
+    # 初步筛选（保存下标，便于按坐标数组计算距离）
+    filtered = range(len(foods_list))
     
     # 名称筛选
     if search_text:
         search_lower = search_text.lower()
-        filtered = [f for f in filtered if search_lower in f["restaurant_name"].lower()]
+        filtered = [i for i in filtered if search_lower in foods_list[i]["restaurant_name"].lower()]
     
     # 标签筛选
     if tag:
-        filtered = [f for f in filtered if tag in f["tags"]]
-    
-    reverse = sort_key in ["popularity", "rating"]  # 这些字段降序排列
-    
-    def get_sort_value(food):
-        if sort_key == "distance":
-            return haversine(latitude, longitude, food["latitude"], food["longitude"])
-        return food[sort_key]
+        filtered = [i for i in filtered if tag in foods_list[i]["tags"]]
     
-    sorted_foods = sorted(filtered, key=get_sort_value, reverse=reverse)
+    if sort_key == "distance":
+        # 一次向量化计算所有候选的距离（校园范围内使用等距矩形近似）
+        index = np.array(filtered, dtype=np.int64)
+        distances = food_points.distances_from(latitude, longitude, fast=True, index=index)
+        sorted_foods = [foods_list[i] for i in index[np.argsort(distances, kind="stable")].tolist()]
+    else:
+        reverse = sort_key in ["popularity", "rating"]  # 这些字段降序排列
+        sorted_foods = sorted((foods_list[i] for i in filtered), key=lambda food: food[sort_key], reverse=reverse)
     
     # 转换为响应模型
     return [FoodResponse(**food) for food in sorted_foods]
\ No newline at end of file
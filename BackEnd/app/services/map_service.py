@@ -1,338 +1,1204 @@
+import os
+import gzip
+import json
 import math
-import heapq
-import random
-from app.config import MAP_FILE, INDOOR_FILE, INDOOR_CACHE_FILE
-from utils.file_utils import read_json, write_json
+import time
+import uuid
+import hashlib
+import inspect
+import threading
+import weakref
+from collections import deque
+import numpy as np
+from app.config import MAP_FILE, MAP_BINARY_FILE, MAP_LOG_FILE, CH_FILE, APSP_FILE, CONGESTION_FILE, INDOOR_FILE
+from utils.file_utils import read_json, write_json, write_json_atomic
 from app.models.map import *
-from algorithm.Sort import quick_sort
-from algorithm.ShortestPath import dijkstra, astar
+from algorithm.ShortestPath import (dijkstra, bidirectional_astar, shortest_path_tree, tree_path,
+                                    time_dependent_dijkstra, nearest_targets)
+from algorithm.Graph import RoadGraph, OverlayAdjacency, DISTANCE_MODE, MODE_COMBINATIONS
+from algorithm.GraphFile import write_graph_file, load_graph_file
+from algorithm.Geo import haversine, haversine_array, METERS_PER_DEGREE
+from algorithm.ContractionHierarchy import ContractionHierarchy
+from algorithm.Landmarks import Landmarks
+from algorithm.AllPairs import AllPairsShortestPaths
+from algorithm.Tour import solve_tour
+from algorithm.LRUCache import LRUCache
+from algorithm.Congestion import CongestionStore
+from algorithm.NameIndex import NameIndex
+from algorithm.SpatialGrid import TypedSpatialIndex, EdgeGrid
+from algorithm.Hull import convex_hull, concave_hull
+from algorithm.EditLog import EditLog, EditIndex
+from algorithm.MultiLevel import IndoorBuilding, MultiLevelRouter, OUTDOOR
+from algorithm.Pareto import pareto_paths
+from algorithm.KShortest import k_shortest_paths
+from utils.map_import import MapImporter
 
-def get_map():
-    graph = read_json(MAP_FILE, default={})
-    return graph
+try:
+    import brotli
+except ImportError:
+    # 未安装 brotli 时只提供 gzip 压缩
+    brotli = None
 
-def search_node(name: str):
-    map_data = get_map()
-    nodes = map_data.get("nodes",[])
-    node_list=[]
-    for node in nodes:
-        if name == "__all__" or name in node.get("name",""):
-            node_list.append(node.get("name",""))
-    return node_list[:10]
+# 常驻内存的路网快照，修改时整体替换
+road_graph = None
+# 写操作互斥锁（读操作直接取当前快照，无需加锁）
+_graph_lock = threading.Lock()
+
+# 编辑日志累计多少条记录后压缩回 map.json
+MAP_COMPACT_EVERY = 100
+# 地图编辑日志
+edit_log = None
+# (路网版本, 编辑校验索引)，由写操作在持锁时维护
+_edit_index = (None, None)
+# 保留最近多少条编辑记录用于增量查询
+GRAPH_HISTORY_LIMIT = 1000
+# 最近的编辑记录（版本号连续，不随日志压缩清空），用于 get_graph 的 since_version 增量查询
+_edit_history = deque(maxlen=GRAPH_HISTORY_LIMIT)
 
-def haversine(lat1, lon1, lat2, lon2):
+def _read_map_file():
+    """读取 map.json 快照：文件不存在时为空路网；内容不完整或格式错误时抛出 ValueError，不当作空路网加载"""
+    if not os.path.exists(MAP_FILE):
+        return {}
+    with open(MAP_FILE, "r", encoding="utf-8") as f:
+        try:
+            return json.load(f)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"路网快照 {MAP_FILE} 不是完整的 JSON: {e}") from e
+
+def _load_graph():
     """
-    计算两点间的地球表面距离（米），使用 Haversine 公式
+    启动时加载路网到内存：读取快照后重放编辑日志
+    存在二进制路网文件时以内存映射方式加载（没有待重放的记录时直接使用，编辑校验索引在首次写入时再建），
+    否则读取 map.json（文件损坏时抛出 ValueError，不会加载为空路网）
     """
-    R = 6371000  # 地球半径（米）
-    phi1, phi2 = math.radians(lat1), math.radians(lat2)
-    dphi = math.radians(lat2 - lat1)
-    dlambda = math.radians(lon2 - lon1)
-    a = math.sin(dphi/2)**2 + math.cos(phi1) * math.cos(phi2) * math.sin(dlambda/2)**2
-    return 2 * R * math.atan2(math.sqrt(a), math.sqrt(1 - a))
+    global road_graph, edit_log, _edit_index
+    edit_log = EditLog(MAP_LOG_FILE)
+    # 压缩时若在重写快照后、清空日志前中断，日志中会残留已包含在快照里的记录
+    _edit_history.clear()
+    if os.path.exists(MAP_BINARY_FILE):
+        snapshot = load_graph_file(MAP_BINARY_FILE)
+        records = [record for record in edit_log.read() if record.get("version", 0) > snapshot.version]
+        if not records:
+            road_graph = snapshot
+            _edit_index = (None, None)
+            return
+        nodes, edges, version = list(snapshot.nodes), list(snapshot.edges), snapshot.version
+    else:
+        map_data = _read_map_file()
+        nodes, edges = map_data.get("nodes", []), map_data.get("edges", [])
+        version = map_data.get("version", 0)
+        records = [record for record in edit_log.read() if record.get("version", 0) > version]
+    index = EditIndex(nodes, edges)
+    for record in records:
+        index.apply(nodes, edges, record)
+        _edit_history.append(record)
+        version = record["version"]
+    road_graph = RoadGraph(nodes, edges, version)
+    _edit_index = (version, index)
 
-def build_graph(nodes, edges, traffic_mode):
-    """构建距离/时间邻接表"""
-    graph = {}
-    for node in nodes:
-        graph[node['id']] = []
-    
-    for edge in edges:
-        # 为每条边生成随机拥挤度 (0.8~1.0)
-        crowd = random.uniform(0.8, 1.0)
-        u, v = edge['start_node'], edge['end_node']
-        
-        if traffic_mode == 'walk':
-            if edge['walk_speed'] > 0:
-                time = edge['distance'] / (crowd * edge['walk_speed'])
-                graph[u].append((v, time, "walk"))
-                graph[v].append((u, time, "walk"))
-        elif traffic_mode == 'bike':
-            if edge['bike_speed'] > 0:
-                time = edge['distance'] / (crowd * edge['bike_speed'])
-                graph[u].append((v, time, "bike"))
-                graph[v].append((u, time, "bike"))
-        elif traffic_mode == 'ebike':
-            if edge['ebike_speed'] > 0:
-                time = edge['distance'] / (crowd * edge['ebike_speed'])
-                graph[u].append((v, time, "ebike"))
-                graph[v].append((u, time, "ebike"))
-        elif traffic_mode == 'walk_bike':
-            if edge['walk_speed'] > 0:
-                time = edge['distance'] / (crowd * edge['walk_speed'])
-                graph[u].append((v, time, "walk"))
-                graph[v].append((u, time, "walk"))
-            if edge['bike_speed'] > 0:
-                time = edge['distance'] / (crowd * edge['bike_speed'])
-                graph[u].append((v, time, "bike"))
-                graph[v].append((u, time, "bike"))
-        elif traffic_mode == 'walk_ebike':
-            if edge['walk_speed'] > 0:
-                time = edge['distance'] / (crowd * edge['walk_speed'])
-                graph[u].append((v, time, "walk"))
-                graph[v].append((u, time, "walk"))
-            if edge['ebike_speed'] > 0:
-                time = edge['distance'] / (crowd * edge['ebike_speed'])
-                graph[u].append((v, time, "ebike"))
-                graph[v].append((u, time, "ebike"))
+def _get_edit_index(road):
+    """当前快照对应的编辑校验索引（版本不一致时重建），调用方需持有 _graph_lock"""
+    global _edit_index
+    version, index = _edit_index
+    if version != road.version or index is None:
+        index = EditIndex(road.nodes, road.edges)
+        _edit_index = (road.version, index)
+    return index
+
+def _publish_graph(nodes, edges):
+    """发布新版本快照（同时增量更新全源最短路矩阵），调用方需持有 _graph_lock"""
+    global road_graph
+    new_graph = RoadGraph(nodes, edges, road_graph.version + 1)
+    # 先准备好新版本的矩阵再替换快照，读者不会拿到版本不一致的组合
+    _update_all_pairs(road_graph, new_graph)
+    congestion_store.resize(new_graph.edge_count)
+    road_graph = new_graph
+    # 旧版本的结果不会再被命中（键中含版本号），这里提前释放
+    route_cache.clear()
+    return new_graph
+
+def _commit_edit(road, record):
+    """
+    提交一条编辑：追加日志 -> 应用到复制后的列表 -> 发布新快照，调用方需持有 _graph_lock
+    日志写入失败时抛出异常，内存中的路网保持不变
+    """
+    global _edit_index
+    index = _get_edit_index(road)
+    record["version"] = road.version + 1
+    edit_log.append(record)
+    # 复制列表后追加，旧快照保持不变
+    nodes, edges = list(road.nodes), list(road.edges)
+    index.apply(nodes, edges, record)
+    # 先记入历史再发布，读者看到新版本时增量一定可用
+    _edit_history.append(record)
+    new_graph = _publish_graph(nodes, edges)
+    _edit_index = (new_graph.version, index)
+    if len(edit_log) >= MAP_COMPACT_EVERY:
+        _compact_locked()
+    return new_graph
+
+def _compact_locked():
+    """
+    把当前快照写回快照文件（二进制路网文件存在时写该文件，否则写 map.json）并清空编辑日志，调用方需持有 _graph_lock
+    快照先写临时文件再原子替换，替换成功后才清空日志：写入失败时旧快照与日志都保持原样
+    """
+    if os.path.exists(MAP_BINARY_FILE):
+        write_graph_file(MAP_BINARY_FILE, road_graph)
+    else:
+        write_json_atomic(MAP_FILE, road_graph.to_dict())
+    edit_log.truncate()
+    _save_all_pairs(road_graph)
+
+def compact_map():
+    """立即压缩编辑日志"""
+    with _graph_lock:
+        _compact_locked()
+    return {"version": road_graph.version}
+
+def build_binary_map():
+    """
+    把当前路网（快照 + 编辑日志）写为二进制路网文件并清空编辑日志，之后启动与压缩都使用该文件
+    map.json 保持不变，可删除；get_map 仍返回 JSON 格式
+    """
+    with _graph_lock:
+        write_graph_file(MAP_BINARY_FILE, road_graph)
+        edit_log.truncate()
+        _save_all_pairs(road_graph)
+    return {"version": road_graph.version, "nodes": road_graph.node_count, "edges": road_graph.edge_count,
+            "size": os.path.getsize(MAP_BINARY_FILE)}
+
+# 服务启动时加载路网
+_load_graph()
+
+def get_graph() -> RoadGraph:
+    """获取当前路网快照"""
+    return road_graph
+
+def _graph_key(road):
+    """
+    按快照缓存预处理结果（全源矩阵、收缩层次、地标）时使用的键：快照的弱引用 + 版本号
+    版本号相同的不同快照（如测试或基准替换进来的路网）不会误用彼此的结果，缓存也不会留住旧快照
+    """
+    return weakref.ref(road), road.version
+
+def get_map():
+    return road_graph.to_dict()
+
+# get_graph 支持的压缩编码（按优先顺序）
+GRAPH_ENCODINGS = ("br", "gzip") if brotli is not None else ("gzip",)
+# (路网版本, ETag, {编码: 响应体})，每个版本只序列化、压缩一次
+_graph_payload = (None, None, {})
+
+def get_map_payload(encoding="identity"):
+    """
+    获取当前版本地图的序列化结果
+    参数:
+        encoding: identity / gzip / br（br 需安装 brotli）
+    返回:
+        (ETag, 响应体字节)
+    """
+    global _graph_payload
+    road = get_graph()
+    version, etag, bodies = _graph_payload
+    if version != road.version or etag is None:
+        body = json.dumps(road.to_dict(), ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        # 同一版本号在手动修改 map.json 后内容可能不同，ETag 中带上内容摘要
+        etag = f'W/"{road.version}-{hashlib.sha1(body).hexdigest()[:16]}"'
+        bodies = {"identity": body}
+        _graph_payload = (road.version, etag, bodies)
+    body = bodies.get(encoding)
+    if body is None:
+        if encoding == "gzip":
+            body = gzip.compress(bodies["identity"], compresslevel=9, mtime=0)
+        elif encoding == "br" and brotli is not None:
+            body = brotli.compress(bodies["identity"])
         else:
-            distance=edge['distance']
-            graph[u].append((v,distance, traffic_mode))
-            graph[v].append((u,distance, traffic_mode))
-    
-    return graph
+            raise ValueError(f"不支持的编码: {encoding}")
+        bodies[encoding] = body
+    return etag, body
 
-def get_node_by_id(nodes_dict, node_id):
-    """根据ID查找节点信息"""
-    return nodes_dict[node_id]
+def get_map_delta(since_version):
+    """
+    获取 since_version 之后新增的节点与边
+    返回:
+        {"version", "since_version", "full", "nodes", "edges"}
+        nodes 为新增节点及 connected_edges 有变化的端点节点（当前状态，按ID覆盖即可），edges 为新增的边；
+        since_version 早于保留的历史或不合法时 full 为 True，nodes/edges 为完整地图
+    """
+    road = get_graph()
+    history = list(_edit_history)
+    records = [record for record in history if since_version < record["version"] <= road.version]
+    if since_version > road.version or len(records) != road.version - since_version:
+        full_map = road.to_dict()
+        return {"version": road.version, "since_version": since_version, "full": True,
+                "nodes": full_map["nodes"], "edges": full_map["edges"]}
+    node_ids, edges = {}, []
+    for record in records:
+        op = record["op"]
+        added_nodes = [record["node"]] if op == "add_node" else record.get("nodes", [])
+        added_edges = [record["edge"]] if op == "add_edge" else record.get("edges", [])
+        for node in added_nodes:
+            node_ids[node["id"]] = None
+        for edge in added_edges:
+            node_ids[edge["start_node"]] = None
+            node_ids[edge["end_node"]] = None
+            edges.append(edge)
+    nodes = [road.node(node_id) for node_id in node_ids if node_id in road.nodes_by_id]
+    return {"version": road.version, "since_version": since_version, "full": False, "nodes": nodes, "edges": edges}
 
-def one_to_one_shortest_path(start_name, end_name):
-    """一到一最短路查询"""
-    map_data = get_map()
-    nodes = map_data['nodes']
-    edges = map_data['edges']
-    nodes_dict = {}
-    for node in nodes:
-        nodes_dict[node.get('id',0)]=node    
-    start_id = next((node['id'] for node in nodes if node['name'] == start_name), -1)
-    end_id = next((node['id'] for node in nodes if node['name'] == end_name), -1)
+# 路径结果缓存容量（条）
+ROUTE_CACHE_SIZE = 1024
+# 路径结果缓存，键包含路网版本号与拥挤度时间片
+route_cache = LRUCache(ROUTE_CACHE_SIZE)
 
-    if start_id == -1 or end_id == -1:
-        raise("地点不存在")
-    # 构建邻接表
-    graph = build_graph(nodes, edges, "no traffic mode")
-    
-    # 预处理启发式函数（欧氏距离）
-    end_node = get_node_by_id(nodes_dict, end_id)
-    heuristic = lambda node_id: haversine(
-        get_node_by_id(nodes_dict, node_id)['latitude'],
-        get_node_by_id(nodes_dict, node_id)['longitude'],
-        end_node['latitude'],
-        end_node['longitude']
-    )
-    
-    # 调用A*算法
-    path_node_ids, total_distance = astar(start_id, end_id, graph, heuristic)
-    
-    # 获取完整节点信息
-    path_nodes = [get_node_by_id(nodes_dict, node_id) for node_id in path_node_ids]
-    
-    return path_nodes, round(total_distance,2)
-
-def one_to_one_shortest_time(start_name, end_name, traffic_mode="walk"):
-    """一到一最短时间查询"""
-    map_data = get_map()
-    nodes = map_data['nodes']
-    edges = map_data['edges']
-    nodes_dict = {}
-    for node in nodes:
-        nodes_dict[node.get('id',0)]=node   
+def get_route_cache_stats():
+    """路径结果缓存的命中 / 未命中 / 淘汰统计"""
+    return route_cache.stats()
 
-    start_id = next((node['id'] for node in nodes if node['name'] == start_name), -1)
-    end_id = next((node['id'] for node in nodes if node['name'] == end_name), -1)
-    
+# 分时拥挤度存储（边数 x 时间片数）
+congestion_store = None
+
+def _load_congestion():
+    """启动时读取拥挤度数组，文件不存在时使用本地模拟器生成"""
+    global congestion_store
+    store = CongestionStore.load(CONGESTION_FILE)
+    if store is None:
+        store = CongestionStore.simulate(road_graph.edge_count)
+    store.resize(road_graph.edge_count)
+    congestion_store = store
+
+_load_congestion()
+
+def congestion_slot(timestamp=None):
+    """返回时间戳（默认当前时间）所在的拥挤度时间片编号"""
+    return congestion_store.slot_of(timestamp)
+
+def get_congestion(road, slot):
+    """获取某个时间片各边的拥挤度（复制一份，不受之后批量更新的影响）"""
+    return np.array(congestion_store.factors_at(slot)[:road.edge_count], dtype=np.float64)
+
+def _crowd_key(slot):
+    """拥挤度快照的标识 (时间片, 拥挤度版本)，用于在路网快照内缓存按拥挤度生成的结构"""
+    return slot, congestion_store.revision
+
+def _crowd_adjacency(road, traffic_mode, slot):
+    """某时间片拥挤度下的邻接表（在快照内按 出行方式、时间片与拥挤度版本 缓存，调用方不得修改）"""
+    # 先取版本再取拥挤度：批量更新发生在两者之间时，缓存中的数据只会比键新
+    key = _crowd_key(slot)
+    return road.adjacency(traffic_mode, get_congestion(road, slot), key)
+
+def update_congestion(updates):
+    """
+    批量更新拥挤度并保存，无需重建路网
+    在副本上更新并写入文件后再替换全局存储：读到新拥挤度版本的其他进程从文件中一定能读到对应的数据
+    参数:
+        updates: [(边ID, 拥挤度, 时间片或 None)]，时间片为 None 时更新整天
+    返回:
+        {"updated": 更新条数, "revision": 拥挤度版本}
+    """
+    global congestion_store
+    with _graph_lock:
+        road = get_graph()
+        whole_day, by_slot = ([], []), ([], [], [])
+        for edge_id, factor, slot in updates:
+            edge = road.edge_index_of.get(edge_id)
+            if edge is None:
+                raise ValueError(f"边 {edge_id} 不存在")
+            if slot is None:
+                whole_day[0].append(edge)
+                whole_day[1].append(factor)
+            else:
+                by_slot[0].append(edge)
+                by_slot[1].append(factor)
+                by_slot[2].append(slot)
+        store = CongestionStore(congestion_store.factors.copy())
+        store.revision = congestion_store.revision
+        if whole_day[0]:
+            store.update(whole_day[0], whole_day[1])
+        if by_slot[0]:
+            store.update(by_slot[0], by_slot[1], by_slot[2])
+        store.save(CONGESTION_FILE)
+        congestion_store = store
+        return {"updated": len(updates), "revision": store.revision}
+
+# 需要预处理（全源矩阵、收缩层次）的出行方式：只有距离
+# 交通方式的耗时随拥挤度变化，按畅通耗时预处理得到的路线不一定是当前最快的，这些方式始终按拥挤度搜索
+PRECOMPUTE_MODES = (DISTANCE_MODE,)
+# 全源最短路矩阵的节点数上限（约占 12 * n * n 字节），超过时不预计算
+APSP_MAX_NODES = 1000
+# 一次修改新增的边数超过节点数的该比例时重新计算矩阵（逐条松弛的总代价已接近 Floyd-Warshall）
+APSP_REBUILD_RATIO = 0.5
+# 全源最短路矩阵 (快照键, {出行方式: AllPairsShortestPaths})
+all_pairs = (None, {})
+
+def _apsp_prefix(mode):
+    return f"{os.path.splitext(APSP_FILE)[0]}_{mode}"
+
+def build_all_pairs(road=None):
+    """计算全源最短路矩阵（只在内存中，文件由 _save_all_pairs 在压缩日志时写入）"""
+    global all_pairs
+    road = road or get_graph()
+    matrices = {}
+    if road.node_count <= APSP_MAX_NODES:
+        for mode in PRECOMPUTE_MODES:
+            matrices[mode] = AllPairsShortestPaths.build(road.node_count, road.edge_list(mode))
+    all_pairs = (_graph_key(road), matrices)
+    return matrices
+
+def _update_all_pairs(old_road, new_road):
+    """
+    发布新快照时维护全源矩阵，调用方需持有 _graph_lock
+    新快照只在旧快照末尾追加了节点与边时增量更新：新节点补为不可达，每条新边做一次 O(n²) 松弛；
+    否则（或新增边过多时）重新计算
+    """
+    global all_pairs
+    key, matrices = all_pairs
+    n, m = old_road.node_count, old_road.edge_count
+    added = new_road.edge_count - m
+    appended = (key == _graph_key(old_road) and matrices and added >= 0
+                and np.array_equal(new_road.node_ids[:n], old_road.node_ids)
+                and np.array_equal(new_road.edge_u[:m], old_road.edge_u)
+                and np.array_equal(new_road.edge_v[:m], old_road.edge_v)
+                and np.array_equal(new_road.edge_distance[:m], old_road.edge_distance))
+    if (not appended or new_road.node_count > APSP_MAX_NODES
+            or added > new_road.node_count * APSP_REBUILD_RATIO):
+        return build_all_pairs(new_road)
+    # 只有距离模式需要预处理，新边的权重即距离
+    edges = list(zip(new_road.edge_u[m:].tolist(), new_road.edge_v[m:].tolist(),
+                     new_road.edge_distance[m:].tolist(), [DISTANCE_MODE] * added))
+    matrices = {mode: matrix.updated(new_road.node_count, edges) for mode, matrix in matrices.items()}
+    all_pairs = (_graph_key(new_road), matrices)
+    return matrices
+
+def _save_all_pairs(road):
+    """
+    把 road 的全源矩阵保存为 APSP_FILE 旁的 .npy 文件，调用方需持有 _graph_lock
+    在压缩日志、生成二进制路网后调用：此时快照文件与矩阵版本一致，下次启动可直接加载
+    """
+    key, matrices = all_pairs
+    if key != _graph_key(road):
+        return
+    for mode, matrix in matrices.items():
+        matrix.save(_apsp_prefix(mode))
+    write_json(APSP_FILE, {"version": road.version, "node_ids": road.node_ids.tolist(),
+                           "modes": list(matrices)}, indent=None)
+
+def _load_all_pairs():
+    """加载与当前路网版本一致的全源最短路矩阵，不一致时在内存中重新计算（不写文件）"""
+    global all_pairs
+    road = get_graph()
+    meta = read_json(APSP_FILE, default={})
+    if meta.get("version") == road.version and meta.get("node_ids") == road.node_ids.tolist():
+        matrices = {mode: AllPairsShortestPaths.load(_apsp_prefix(mode)) for mode in meta.get("modes", [])
+                    if mode in PRECOMPUTE_MODES}
+        if all(matrix is not None and matrix.node_count == road.node_count for matrix in matrices.values()):
+            all_pairs = (_graph_key(road), matrices)
+            return
+    build_all_pairs(road)
+
+def get_all_pairs(traffic_mode=DISTANCE_MODE):
+    """获取当前路网快照下某出行方式的全源最短路矩阵，不存在（含未预处理的交通方式）时返回 None"""
+    key, matrices = all_pairs
+    if key != _graph_key(get_graph()):
+        return None
+    return matrices.get(traffic_mode)
+
+_load_all_pairs()
+
+# 收缩层次 (快照键, {出行方式: ContractionHierarchy})，与当前快照不一致时视为失效
+contraction_hierarchies = (None, {})
+
+def build_contraction_hierarchies(modes=PRECOMPUTE_MODES):
+    """离线预处理：为各出行方式构建收缩层次，并保存到 map.json 旁的 CH_FILE"""
+    global contraction_hierarchies
+    road = get_graph()
+    hierarchies = {}
+    data = {"version": road.version, "node_ids": road.node_ids.tolist(), "modes": {}}
+    for mode in modes:
+        ch = ContractionHierarchy.build(road.node_count, road.edge_list(mode))
+        hierarchies[mode] = ch
+        data["modes"][mode] = ch.to_dict()
+    write_json(CH_FILE, data, indent=None)
+    contraction_hierarchies = (_graph_key(road), hierarchies)
+    return hierarchies
+
+def _load_contraction_hierarchies():
+    """加载与当前路网版本一致的收缩层次预处理结果"""
+    global contraction_hierarchies
+    road = get_graph()
+    data = read_json(CH_FILE, default={})
+    if data.get("version") != road.version or data.get("node_ids") != road.node_ids.tolist():
+        return
+    hierarchies = {}
+    for mode, ch_data in data.get("modes", {}).items():
+        if mode in PRECOMPUTE_MODES:
+            hierarchies[mode] = ContractionHierarchy.from_dict(ch_data, road.edge_list(mode))
+    contraction_hierarchies = (_graph_key(road), hierarchies)
+
+def get_hierarchy(traffic_mode=DISTANCE_MODE):
+    """获取当前路网快照下某出行方式的收缩层次，不存在（含未预处理的交通方式）时返回 None"""
+    key, hierarchies = contraction_hierarchies
+    if key != _graph_key(get_graph()):
+        return None
+    return hierarchies.get(traffic_mode)
+
+_load_contraction_hierarchies()
+
+# ALT 启发式使用的地标数量
+LANDMARK_COUNT = 8
+# 地标 (快照键, {出行方式: Landmarks})，首次查询时按需计算
+_landmarks = (None, {})
+
+def get_landmarks(traffic_mode):
+    """
+    获取当前路网快照下某出行方式的地标
+    交通方式按畅通耗时预处理；拥挤度只会增加耗时，因此得到的仍是合法下界
+    """
+    global _landmarks
+    road = get_graph()
+    key, cache = _landmarks
+    if key != _graph_key(road):
+        cache = {}
+        _landmarks = (_graph_key(road), cache)
+    mode = traffic_mode if traffic_mode in MODE_COMBINATIONS else DISTANCE_MODE
+    landmarks = cache.get(mode)
+    if landmarks is None:
+        landmarks = Landmarks.build(road.mode_csr(mode), LANDMARK_COUNT)
+        cache[mode] = landmarks
+    return landmarks
+
+# 地点名称联想返回的数量
+NAME_SUGGEST_LIMIT = 10
+
+_name_index = (None, None)
+
+def get_name_index():
+    """获取当前路网版本的名称索引（按需构建）"""
+    global _name_index
+    road = get_graph()
+    version, index = _name_index
+    if version != road.version or index is None:
+        index = NameIndex(road.nodes, NAME_SUGGEST_LIMIT)
+        _name_index = (road.version, index)
+    return index
+
+def search_node(name: str):
+    """
+    地点名称联想：返回包含 name 的名称（前缀匹配优先，其余按热度降序），最多 NAME_SUGGEST_LIMIT 个
+    name 为 __all__ 时返回热度最高的名称
+    """
+    index = get_name_index()
+    return index.search("" if name == "__all__" else name)
+
+def _precomputed_route(road, start_id, end_id, engine="auto"):
+    """
+    使用距离的预处理结果（全源矩阵优先，其次收缩层次）求路径
+    返回:
+        (节点下标列表, 总距离)，没有可用的预处理结果时返回 None
+    """
+    start, end = road.index_of[start_id], road.index_of[end_id]
+    matrix = get_all_pairs() if engine in ("auto", "apsp") else None
+    if matrix is not None:
+        return matrix.path(start, end), matrix.distance(start, end)
+    ch = get_hierarchy() if engine in ("auto", "ch") else None
+    if ch is not None:
+        path_index, total_distance, _ = ch.query(start, end)
+        return path_index, total_distance
+    return None
+
+def _bidirectional_route(road, graph, traffic_mode, start_id, end_id):
+    """在邻接表上运行以 ALT 下界为势函数的双向A*"""
+    landmarks = get_landmarks(traffic_mode)
+    heuristic = landmarks.heuristic(road.index_of[end_id], road.index_of)
+    reverse_heuristic = landmarks.heuristic(road.index_of[start_id], road.index_of)
+    return bidirectional_astar(start_id, end_id, graph, heuristic, reverse_heuristic)
+
+def _path_length(road, path_node_ids):
+    """沿路径累加相邻节点间的地表距离（向量化计算）"""
+    return road.geo.path_length([road.index_of[node_id] for node_id in path_node_ids])
+
+def _resolve_pair(road, start_name, end_name):
+    """起终点名称转为节点ID，有不存在的地点时抛出 ValueError"""
+    start_id = road.resolve(start_name)
+    end_id = road.resolve(end_name)
     if start_id == -1 or end_id == -1:
-        raise("地点不存在")
-    # 构建邻接表
-    graph = build_graph(nodes, edges, traffic_mode)
-    
-    # 调用Dijkstra算法
-    path_node_ids, total_time = dijkstra(start_id, {end_id}, graph)
-    
-    # 计算实际移动距离（使用原始距离）
-    total_distance = 0.0
-    for i in range(len(path_node_ids) - 1):
-        u, v = get_node_by_id(nodes_dict, path_node_ids[i]), get_node_by_id(nodes_dict, path_node_ids[i+1])
-        total_distance += haversine(u['latitude'],u['longitude'],v['latitude'],v['longitude'])
-    
-    # 获取从该点出发使用的交通方式
-    path_mode = []
-    for i in range(len(path_node_ids) - 1):
-        u, v = path_node_ids[i], path_node_ids[i+1]
-        minimun_time = float('inf')
-        mode_select = "walk"
-        for node, time, mode in graph[u]:
-            if node == v and time < minimun_time:
-                minimun_time = time
-                mode_select = mode
-        path_mode.append(mode_select)
+        raise ValueError("地点不存在")
+    return start_id, end_id
 
-    # 获取完整节点信息
-    path_nodes = [get_node_by_id(nodes_dict, node_id) for node_id in path_node_ids]
-    
-    return path_nodes, path_mode, round(total_time,2), round(total_distance,2)
-
-def one_to_many_shortest_path(start_name, target_names):
-    """一到多最短路径查询"""
-    map_data = get_map()
-    nodes = map_data['nodes']
-    edges = map_data['edges']
-    nodes_dict = {}
-    for node in nodes:
-        nodes_dict[node.get('id',0)]=node   
-        
-    start_id = next((node['id'] for node in nodes if node['name'] == start_name), -1)
+def _path_key(road, start_id, end_id, engine):
+    return ("path", start_id, end_id, DISTANCE_MODE, road.version, engine)
+
+def _time_key(road, start_id, end_id, traffic_mode, departure_time, slot):
+    """最短时间的缓存键：时变查询（slot 为 None）按出发时间区分，否则按时间片区分"""
+    return ("time", start_id, end_id, traffic_mode, road.version,
+            congestion_store.revision, departure_time if slot is None else slot)
+
+def _tour_stops(road, start_name, target_names):
+    """多点路径的停靠点：起点在前，目的地按给出的顺序去重"""
+    start_id = road.resolve(start_name)
     if start_id == -1:
-        raise("地点不存在")
-    target_ids=[]
+        raise ValueError("地点不存在")
+    stops = [start_id]
     for end_name in target_names:
-        end_id = next((node['id'] for node in nodes if node['name'] == end_name), -1)
+        end_id = road.resolve(end_name)
         if end_id == -1:
             raise ValueError("有不存在的目的地")
-        target_ids.append(end_id)
-    
-    # 构建邻接表
-    graph = build_graph(nodes, edges, "no traffic mode")
+        if end_id not in stops:
+            stops.append(end_id)
+    return stops
+
+def _tour_key(road, stops, time_budget):
+    return ("tour", stops[0], tuple(stops[1:]), DISTANCE_MODE, road.version, time_budget)
+
+def route_cache_key(name, *args, **kwargs):
+    """
+    路径查询在 route_cache 中的键，与查询函数内部使用的键相同，供路径规划进程池在分派前先查本进程的缓存
+    参数与 name 对应的查询函数（one_to_one_shortest_path / one_to_one_shortest_time /
+    one_to_many_shortest_path）相同；坐标查询与不需要搜索的查询返回 None，地点不存在时抛出 ValueError
+    """
+    query = inspect.signature(ROUTE_QUERIES[name]).bind(*args, **kwargs)
+    query.apply_defaults()
+    query = query.arguments
+    road = get_graph()
+    if name == "one_to_one_shortest_time" and query["traffic_mode"] not in MODE_COMBINATIONS:
+        raise ValueError("出行方式不存在")
+    if name == "one_to_many_shortest_path":
+        stops = _tour_stops(road, query["start_name"], query["target_names"])
+        return _tour_key(road, stops, query["time_budget"]) if len(stops) > 1 else None
+    if query["start_location"] is not None or query["end_location"] is not None:
+        return None
+    start_id, end_id = _resolve_pair(road, query["start_name"], query["end_name"])
+    if name == "one_to_one_shortest_path":
+        return _path_key(road, start_id, end_id, query["engine"])
+    traffic_mode, departure_time = query["traffic_mode"], query["departure_time"]
+    slot = None if departure_time is not None else congestion_slot()
+    return _time_key(road, start_id, end_id, traffic_mode, departure_time, slot)
+
+def one_to_one_shortest_path(start_name, end_name, engine="auto", start_location=None, end_location=None):
+    """
+    一到一最短路查询
+    engine: auto 依次尝试全源矩阵、收缩层次、双向A*；也可指定 apsp / ch / astar
+    start_location / end_location: 可选坐标 (经度, 纬度)，给出时吸附到最近的边上，从边的中间出发或到达
+    """
+    road = get_graph()
+    nodes_dict = road.nodes_by_id
+    if start_location is not None or end_location is not None:
+        start_id, end_id, snaps = _snap_endpoints(road, start_name, end_name, start_location, end_location)
+        path_nodes, total_distance, _ = _snapped_route(road, DISTANCE_MODE, start_id, end_id, snaps)
+        return path_nodes, round(total_distance, 2)
+    start_id, end_id = _resolve_pair(road, start_name, end_name)
+    cache_key = _path_key(road, start_id, end_id, engine)
+    cached = route_cache.get(cache_key)
+    if cached is not None:
+        return cached
+
+    path_node_ids, total_distance = _distance_route(road, start_id, end_id, engine)
     
-    current = start_id
-    remaining_targets = set(target_ids)
-    full_path = [start_id]
-    total_distance = 0.0
+    # 获取完整节点信息
+    path_nodes = [nodes_dict[node_id] for node_id in path_node_ids]
     
-    # 依次访问所有目标点
-    while remaining_targets:
-        # 找到最近的目标点
-        path_segment, dist = dijkstra(current, remaining_targets, graph)
-        
-        if not path_segment:
-            break
+    result = path_nodes, round(total_distance,2)
+    route_cache.put(cache_key, result)
+    return result
+
+def _distance_route(road, start_id, end_id, engine="auto"):
+    """
+    按距离求路径，预处理结果不可用时使用双向A*（ALT 地标下界）
+    返回:
+        (节点ID列表, 总距离)
+    """
+    route = _precomputed_route(road, start_id, end_id, engine)
+    if route is not None:
+        path_index, total_distance = route
+        return [road.nodes[i]['id'] for i in path_index], total_distance
+    graph = road.adjacency(DISTANCE_MODE)
+    path_node_ids, total_distance, _ = _bidirectional_route(road, graph, DISTANCE_MODE, start_id, end_id)
+    return path_node_ids, total_distance
+
+def _time_dependent_route(road, traffic_mode, start_id, end_id, departure_time):
+    """按出发时刻做时变A*（ALT 畅通耗时下界），边的通行时间随途经时间片变化"""
+    landmarks = get_landmarks(traffic_mode)
+    heuristic = landmarks.heuristic(road.index_of[end_id], road.index_of)
+    graph = road.time_dependent_adjacency(traffic_mode)
+    departure = CongestionStore.seconds_of_day(departure_time)
+    return time_dependent_dijkstra(start_id, end_id, graph, departure, congestion_store.arrival, heuristic)
+
+def one_to_one_shortest_time(start_name, end_name, traffic_mode="walk", departure_time=None,
+                             start_location=None, end_location=None):
+    """
+    一到一最短时间查询
+    - 未指定出发时间：在叠加当前时间片拥挤度的邻接表上做双向A*（ALT 畅通耗时下界），
+      不使用按畅通耗时预处理的全源矩阵或收缩层次，拥挤时也能选到当前最快的路线
+    - 指定出发时间（Unix 时间戳）：按分时拥挤度做时变搜索，途经不同时间片时使用对应的拥挤度
+    - start_location / end_location: 可选坐标 (经度, 纬度)，给出时吸附到最近的边上，从边的中间出发或到达
+    出行方式不存在时抛出 ValueError（按名称与按坐标查询相同）
+    """
+    if traffic_mode not in MODE_COMBINATIONS:
+        raise ValueError("出行方式不存在")
+    road = get_graph()
+    nodes_dict = road.nodes_by_id
+    if start_location is not None or end_location is not None:
+        start_id, end_id, snaps = _snap_endpoints(road, start_name, end_name, start_location, end_location)
+        slot = None if departure_time is not None else congestion_slot()
+        path_nodes, total_time, path_mode = _snapped_route(road, traffic_mode, start_id, end_id, snaps,
+                                                           departure_time, slot)
+        total_distance = _nodes_length(path_nodes) if path_nodes else float('inf')
+        return path_nodes, path_mode, round(total_time, 2), round(total_distance, 2)
+    start_id, end_id = _resolve_pair(road, start_name, end_name)
+    time_dependent = departure_time is not None
+    slot = None if time_dependent else congestion_slot()
+    cache_key = _time_key(road, start_id, end_id, traffic_mode, departure_time, slot)
+    cached = route_cache.get(cache_key)
+    if cached is not None:
+        return cached
+
+    if time_dependent:
+        path_node_ids, total_time, path_mode = _time_dependent_route(road, traffic_mode, start_id, end_id,
+                                                                     departure_time)
+    else:
+        # 获取邻接表
+        graph = _crowd_adjacency(road, traffic_mode, slot)
         
-        # 更新路径和距离
-        full_path.extend(path_segment[1:])  # 避免重复添加当前点
-        total_distance += dist
-        current = path_segment[-1]
-        remaining_targets.discard(current)
+        # 调用双向A*算法（ALT 地标下界），同时得到每段使用的交通方式
+        path_node_ids, total_time, path_mode = _bidirectional_route(road, graph, traffic_mode, start_id, end_id)
     
-    # 从最后一个目标点回到起点
-    if full_path[-1] != start_id:
-        return_path, return_dist = dijkstra(current, {start_id}, graph)
-        if return_path:
-            full_path.extend(return_path[1:])
-            total_distance += return_dist
+    # 计算实际移动距离（使用原始距离）
+    total_distance = _path_length(road, path_node_ids)
+
+    # 获取完整节点信息
+    path_nodes = [nodes_dict[node_id] for node_id in path_node_ids]
+    
+    result = path_nodes, path_mode, round(total_time,2), round(total_distance,2)
+    route_cache.put(cache_key, result)
+    return result
+
+# 多点路径中使用 Held-Karp 精确求解的目的地数量上限
+TOUR_EXACT_LIMIT = 15
+# 目的地更多时局部搜索（2-opt / Or-opt）的时间预算（秒）
+TOUR_TIME_BUDGET = 1.0
+
+def one_to_many_shortest_path(start_name, target_names, time_budget=TOUR_TIME_BUDGET):
+    """
+    一到多最短路径查询：从起点出发访问所有目的地后回到起点
+    - 一批单源搜索得到起点与各目的地之间的距离矩阵（存在全源矩阵时直接读取）
+    - 目的地不超过 TOUR_EXACT_LIMIT 个时用 Held-Karp 精确求解，否则在时间预算内做局部搜索
+    返回:
+        full_path_nodes: 拼接后的完整路径
+        total_distance: 回路总距离
+        order: 目的地的访问顺序（名称列表）
+    """
+    road = get_graph()
+    nodes_dict = road.nodes_by_id
+    stops = _tour_stops(road, start_name, target_names)
+    start_id = stops[0]
+    if len(stops) == 1:
+        return [nodes_dict[start_id]], 0.0, []
+
+    cache_key = _tour_key(road, stops, time_budget)
+    cached = route_cache.get(cache_key)
+    if cached is not None:
+        return cached
+
+    matrix = get_all_pairs(DISTANCE_MODE)
+    if matrix is not None:
+        indexes = [road.index_of[node_id] for node_id in stops]
+        dist = matrix.dist[np.ix_(indexes, indexes)]
+        leg = lambda i, j: road.node_ids[matrix.path(indexes[i], indexes[j])].tolist()
+    else:
+        # 每个停靠点做一次单源搜索，所有停靠点确定后即停止
+        graph = road.adjacency(DISTANCE_MODE)
+        trees = [shortest_path_tree(node_id, graph, set(stops)) for node_id in stops]
+        dist = [[trees[i][0].get(node_id, float('inf')) for node_id in stops] for i in range(len(stops))]
+        leg = lambda i, j: tree_path(trees[i][1], stops[j])[0]
+
+    tour, total_distance = solve_tour(dist, time_budget, TOUR_EXACT_LIMIT)
+    if not tour:
+        return [], float('inf'), []
+
+    # 按访问顺序拼接各段路径，最后回到起点
+    full_path = [start_id]
+    for i, j in zip(tour, tour[1:] + tour[:1]):
+        full_path.extend(leg(i, j)[1:])  # 避免重复添加当前点
     
     # 获取完整节点信息
-    full_path_nodes = [get_node_by_id(nodes_dict, node_id) for node_id in full_path]
+    full_path_nodes = [nodes_dict[node_id] for node_id in full_path]
+    order = [nodes_dict[stops[i]].get('name', '') for i in tour[1:]]
     
-    return full_path_nodes, round(total_distance,2)
+    result = full_path_nodes, round(total_distance,2), order
+    route_cache.put(cache_key, result)
+    return result
 
-def indoor_shortest_path(start_name, end_name):
-    indoor_cache = {
-            "1L":{"path": [], "distance": 0},
-            "2L":{"path": [], "distance": 0},
-            "3L":{"path": [], "distance": 0},
-        }
-    write_json(INDOOR_CACHE_FILE, indoor_cache)
-    map_data = read_json(INDOOR_FILE, default={})
-    nodes = map_data.get("nodes",[])
-    edges = map_data.get("edges",[])
-    start_node={}
-    end_node={}
-    graph = build_graph(nodes, edges, "no traffic mode")
-    for node in nodes:
-        if node['name']==start_name:
-            start_node=node
-        if node['name']==end_name:
-            end_node=node
-    if not start_node or not end_node:
+# 可由路径规划进程池分派的查询，route_cache_key 按这些函数的参数计算缓存键
+ROUTE_QUERIES = {query.__name__: query for query in
+                 (one_to_one_shortest_path, one_to_one_shortest_time, one_to_many_shortest_path)}
+
+def batch_shortest_paths(routes):
+    """
+    批量路径规划：按 (起点, 出行方式) 分组，每组只做一次单源最短路树搜索
+    参数:
+        routes: [(起点名称, 终点名称, 出行方式)]，出行方式为 distance 或 MODE_COMBINATIONS 中的交通方式
+    返回:
+        与输入顺序一致的结果字典列表
+    """
+    road = get_graph()
+    nodes_dict = road.nodes_by_id
+    results = [None] * len(routes)
+    groups = {}
+    for i, (start_name, end_name, mode) in enumerate(routes):
+        result = {"start": start_name, "end": end_name, "mode": mode, "found": False}
+        results[i] = result
+        start_id, end_id = road.resolve(start_name), road.resolve(end_name)
+        if mode != DISTANCE_MODE and mode not in MODE_COMBINATIONS:
+            result["detail"] = "出行方式不存在"
+        elif start_id == -1 or end_id == -1:
+            result["detail"] = "地点不存在"
+        else:
+            groups.setdefault((start_id, mode), []).append((i, end_id))
+
+    # 同一批次内每种出行方式只取一次邻接表（共享当前时间片的拥挤度）
+    slot = congestion_slot()
+    graphs = {}
+    for (start_id, mode), items in groups.items():
+        if mode not in graphs:
+            graphs[mode] = _crowd_adjacency(road, mode, slot)
+        dist, prev = shortest_path_tree(start_id, graphs[mode], {end_id for _, end_id in items})
+        for i, end_id in items:
+            result = results[i]
+            if end_id not in dist:
+                result["detail"] = "未能找到合适的路径"
+                continue
+            path_node_ids, path_mode = tree_path(prev, end_id)
+            result["found"] = True
+            result["path"] = [nodes_dict[node_id] for node_id in path_node_ids]
+            if mode == DISTANCE_MODE:
+                result["distance"] = round(dist[end_id], 2)
+            else:
+                result["path_mode"] = path_mode
+                result["time"] = round(dist[end_id], 2)
+                result["distance"] = round(_path_length(road, path_node_ids), 2)
+    return results
+
+# 多目标路径每个节点默认保留的标号数上限
+PARETO_MAX_LABELS = 8
+
+def _pareto_graph(road, traffic_mode, slot):
+    """
+    多目标搜索的邻接表，弧代价向量为 (耗时, 距离, 拥挤暴露)
+    拥挤暴露 = 距离 * (1 - 拥挤度)，即按拥挤程度折算的米数
+    结果在快照内按 出行方式、时间片与拥挤度版本 缓存，调用方不得修改
+    """
+    key = ("pareto", traffic_mode) + _crowd_key(slot)
+    crowd = get_congestion(road, slot)
+    return road.crowd_cached(key, lambda: _build_pareto_graph(road, traffic_mode, crowd))
+
+def _build_pareto_graph(road, traffic_mode, crowd):
+    ids = road.node_ids.tolist()
+    graph = {node_id: [] for node_id in ids}
+    for mode in MODE_COMBINATIONS[traffic_mode]:
+        csr = road.csr[mode]
+        factor = crowd[csr.edge_index]
+        distance = road.edge_distance[csr.edge_index]
+        times = (csr.weights / factor).tolist()
+        exposure = (distance * (1.0 - factor)).tolist()
+        distance = distance.tolist()
+        offsets = csr.offsets.tolist()
+        targets = csr.targets.tolist()
+        for i, node_id in enumerate(ids):
+            arcs = graph[node_id]
+            for k in range(offsets[i], offsets[i + 1]):
+                arcs.append((ids[targets[k]], (times[k], distance[k], exposure[k]), mode))
+    return graph
+
+def pareto_routes(start_name, end_name, traffic_mode="walk", epsilon=0.0, max_labels=PARETO_MAX_LABELS,
+                  departure_time=None):
+    """
+    耗时、距离、拥挤暴露三个目标下的 Pareto 最优路径集合（使用出发时刻所在时间片的拥挤度）
+    参数:
+        epsilon: ε-支配的松弛系数，越大结果越少、搜索越快
+        max_labels: 每个节点保留的标号数上限
+    返回:
+        [{"path", "path_mode", "time", "distance", "crowd"}]，按耗时升序
+    """
+    road = get_graph()
+    start_id, end_id = road.resolve(start_name), road.resolve(end_name)
+    if start_id == -1 or end_id == -1:
         raise ValueError("地点不存在")
-    
-    if start_node['floor'] == end_node['floor']:
-        # 可优化部分：减少节点数
-        # n_nodes = [node for node in nodes if node.get("floor") == start_node['floor']]
-        
-        path, distance = dijkstra(start_node['id'], {end_node['id']}, graph)
-        indoor_cache[start_node['floor']]["path"]=path
-        indoor_cache[start_node['floor']]["distance"]=distance
-        write_json(INDOOR_CACHE_FILE, indoor_cache)
-        return {"success": True}
-    elevator1={}
-    elevator2={}
-    for node in nodes:
-        if node['floor'] == start_node['floor'] and node['type']=='电梯':
-            elevator1=node
-        if node['floor'] == end_node['floor'] and node['type']=='电梯':
-            elevator2=node
-    if not elevator1 or not elevator2:
-        return ValueError("找不到路径")
-    path, distance = dijkstra(start_node['id'], {elevator1['id']}, graph)
-    indoor_cache[start_node['floor']]["path"]=path
-    indoor_cache[start_node['floor']]["distance"]=distance   
-    path, distance = dijkstra(elevator2['id'], {end_node['id']}, graph)
-    indoor_cache[end_node['floor']]["path"]=path
-    indoor_cache[end_node['floor']]["distance"]=distance   
-    write_json(INDOOR_CACHE_FILE, indoor_cache)
-    return {"success": True}
-
-def indoor_shortest_path_v2(start_name, end_name):
-    indoor_cache = {
-            "1L":{"path": [], "distance": 0},
-            "2L":{"path": [], "distance": 0},
-            "3L":{"path": [], "distance": 0},
+    if traffic_mode not in MODE_COMBINATIONS:
+        raise ValueError("出行方式不存在")
+    if epsilon < 0 or max_labels < 1:
+        raise ValueError("epsilon 不能为负，max_labels 至少为 1")
+
+    slot = congestion_slot(departure_time)
+    cache_key = ("pareto", start_id, end_id, traffic_mode, road.version, congestion_store.revision, slot,
+                 epsilon, max_labels)
+    cached = route_cache.get(cache_key)
+    if cached is not None:
+        return cached
+
+    graph = _pareto_graph(road, traffic_mode, slot)
+    # 剩余代价下界：耗时取该出行方式畅通时的 ALT 下界（拥挤只会增加耗时），
+    # 距离取距离 ALT 下界与直线距离中的较大者，拥挤暴露取 0；到不了终点的节点下界为无穷
+    end_index = road.index_of[end_id]
+    end_node = road.node(end_id)
+    straight = road.geo.distances_from(end_node["latitude"], end_node["longitude"])
+    # 边长保留两位小数，可能比直线距离略短
+    distance_bound = np.maximum(get_landmarks(DISTANCE_MODE).lower_bound(end_index), straight - 0.01)
+    bounds = list(zip(get_landmarks(traffic_mode).lower_bound(end_index).tolist(), distance_bound.tolist()))
+    index_of = road.index_of
+
+    def lower_bound(node_id):
+        time_bound, distance = bounds[index_of[node_id]]
+        return (time_bound, distance, 0.0)
+
+    routes = []
+    for (total_time, distance, exposure), path, path_mode in pareto_paths(start_id, end_id, graph, epsilon,
+                                                                          max_labels, lower_bound):
+        routes.append({"path": [road.node(node_id) for node_id in path], "path_mode": path_mode,
+                       "time": round(total_time, 2), "distance": round(distance, 2), "crowd": round(exposure, 2)})
+    route_cache.put(cache_key, routes)
+    return routes
+
+# 备选路径默认的重叠度上限（共享路段代价 / 路径代价）
+ALTERNATIVE_MAX_OVERLAP = 0.8
+
+def alternative_routes(start_name, end_name, traffic_mode=DISTANCE_MODE, k=3, max_overlap=ALTERNATIVE_MAX_OVERLAP):
+    """
+    备选路径：Yen 算法求至多 k 条无环路径，与已选路径重叠过多的候选被过滤
+    参数:
+        traffic_mode: distance 按距离，其余交通方式按当前时间片的通行时间
+        max_overlap: 重叠度上限，1 表示不过滤
+    返回:
+        [{"path", "path_mode", "distance", "time"}]，按代价升序；distance 模式下 time 为 None、path_mode 为空
+    """
+    road = get_graph()
+    start_id, end_id = road.resolve(start_name), road.resolve(end_name)
+    if start_id == -1 or end_id == -1:
+        raise ValueError("地点不存在")
+    if traffic_mode != DISTANCE_MODE and traffic_mode not in MODE_COMBINATIONS:
+        raise ValueError("出行方式不存在")
+    if k < 1 or not 0 <= max_overlap <= 1:
+        raise ValueError("k 至少为 1，max_overlap 应在 0~1 之间")
+
+    slot = congestion_slot()
+    cache_key = ("alternatives", start_id, end_id, traffic_mode, road.version, congestion_store.revision, slot,
+                 k, max_overlap)
+    cached = route_cache.get(cache_key)
+    if cached is not None:
+        return cached
+
+    graph = _crowd_adjacency(road, traffic_mode, slot)
+    routes = []
+    for path, cost, path_mode in k_shortest_paths(start_id, end_id, graph, k, max_overlap):
+        route = {"path": [road.node(node_id) for node_id in path], "path_mode": [],
+                 "distance": round(cost, 2), "time": None}
+        if traffic_mode != DISTANCE_MODE:
+            route["path_mode"] = path_mode
+            route["time"] = round(cost, 2)
+            route["distance"] = round(_path_length(road, path), 2)
+        routes.append(route)
+    route_cache.put(cache_key, routes)
+    return routes
+
+# 等时圈凹包的凹度（越小越凹）
+ISOCHRONE_CONCAVITY = 2.0
+ISOCHRONE_HULLS = ("none", "convex", "concave")
+
+def _outline(points, hull):
+    """在以首点为原点的局部平面（米）上求 [(经度, 纬度)] 的凸包或凹包，没有点时为空"""
+    if not points:
+        return []
+    lon0, lat0 = points[0]
+    scale = math.cos(math.radians(lat0))
+    plane = {((lon - lon0) * METERS_PER_DEGREE * scale, (lat - lat0) * METERS_PER_DEGREE): (lon, lat)
+             for lon, lat in points}
+    if hull == "concave":
+        ring = concave_hull(list(plane), ISOCHRONE_CONCAVITY)
+    else:
+        ring = convex_hull(list(plane))
+    return [list(plane[p]) for p in ring]
+
+def isochrone(start_name, traffic_mode="walk", budget=600.0, hull="convex"):
+    """
+    等时圈：一次受预算限制的 Dijkstra 得到从起点出发可到达的范围
+    参数:
+        traffic_mode: 交通方式（预算单位为秒，使用当前时间片的拥挤度）；distance 时按路网距离（预算单位为米）
+        budget: 时间或距离预算
+        hull: none / convex / concave，外轮廓由可到达节点与边界边上的终止点构成
+    返回:
+        {"reachable", "boundary", "hull", "pois"}，pois 为按节点类型分组的可到达节点
+    """
+    road = get_graph()
+    start_id = road.resolve(start_name)
+    if start_id == -1:
+        raise ValueError("地点不存在")
+    if traffic_mode != DISTANCE_MODE and traffic_mode not in MODE_COMBINATIONS:
+        raise ValueError("出行方式不存在")
+    if hull not in ISOCHRONE_HULLS:
+        raise ValueError(f"外轮廓类型应为 {ISOCHRONE_HULLS} 之一")
+
+    slot = congestion_slot()
+    cache_key = ("isochrone", start_id, traffic_mode, budget, hull, road.version, congestion_store.revision, slot)
+    cached = route_cache.get(cache_key)
+    if cached is not None:
+        return cached
+
+    graph = _crowd_adjacency(road, traffic_mode, slot)
+    dist, _ = shortest_path_tree(start_id, graph, max_cost=budget)
+
+    reachable, pois = [], {}
+    for node_id, cost in sorted(dist.items(), key=lambda item: item[1]):
+        node = road.nodes_by_id[node_id]
+        item = {
+            "id": node_id,
+            "name": node.get("name", ""),
+            "type": node.get("type", ""),
+            "longitude": node.get("longitude", 0.0),
+            "latitude": node.get("latitude", 0.0),
+            "cost": round(cost, 2),
         }
-    write_json(INDOOR_CACHE_FILE, indoor_cache)
+        reachable.append(item)
+        pois.setdefault(item["type"], []).append(item)
+
+    # 边界边：起点一侧可到达、另一侧超出预算，按剩余预算计算能走到的比例（多种交通方式取最远）
+    boundary = {}
+    for node_id, cost in dist.items():
+        for neighbor, weight, mode in graph[node_id]:
+            if neighbor in dist or weight <= 0:
+                continue
+            fraction = (budget - cost) / weight
+            if boundary.get((node_id, neighbor), {}).get("fraction", -1.0) >= fraction:
+                continue
+            u, v = road.nodes_by_id[node_id], road.nodes_by_id[neighbor]
+            boundary[(node_id, neighbor)] = {
+                "start_node": node_id,
+                "end_node": neighbor,
+                "mode": mode,
+                "fraction": round(fraction, 4),
+                "longitude": u["longitude"] + fraction * (v["longitude"] - u["longitude"]),
+                "latitude": u["latitude"] + fraction * (v["latitude"] - u["latitude"]),
+            }
+    boundary = list(boundary.values())
+
+    outline = []
+    if hull != "none":
+        points = [(item["longitude"], item["latitude"]) for item in reachable + boundary]
+        outline = _outline(points, hull)
+
+    result = {"reachable": reachable, "boundary": boundary, "hull": outline, "pois": pois}
+    route_cache.put(cache_key, result)
+    return result
+
+# 常驻内存的室内路网（indoor.json 不经接口修改，启动时加载一次）
+indoor_graph = None
+# 楼层列表，按在 indoor.json 中首次出现的顺序
+indoor_floors = []
+# 室内导航结果保留时间（秒）与条数上限
+INDOOR_RESULT_TTL = 600
+INDOOR_RESULT_LIMIT = 256
+# 结果ID -> (过期时刻, 结果)，每个请求的结果互不覆盖
+indoor_results = LRUCache(INDOOR_RESULT_LIMIT)
+# 最近一次的结果ID，供不带 id 的旧版 GET 请求使用
+_latest_indoor_result = None
+
+# 未标注 building 的室内节点所属的建筑ID
+INDOOR_DEFAULT_BUILDING = "indoor"
+# 室内外联合路由：建筑ID -> IndoorBuilding，以及分层搜索器
+indoor_buildings = {}
+multi_level_router = None
+
+def _load_indoor():
+    """
+    启动时加载室内路网
+    indoor.json 中节点可带 building 字段区分建筑；entrances 为室内外连接
+    [{"building": 建筑ID, "indoor": 室内入口节点ID, "outdoor": 室外节点ID, "distance": 连接距离（可选）}]
+    """
+    global indoor_graph, indoor_floors, indoor_buildings, multi_level_router
     map_data = read_json(INDOOR_FILE, default={})
-    nodes = map_data.get("nodes",[])
-    edges = map_data.get("edges",[])
-    start_node={}
-    end_node={}
-    graph = build_graph(nodes, edges, "no traffic mode")
+    nodes, edges = map_data.get("nodes", []), map_data.get("edges", [])
+    indoor_graph = RoadGraph(nodes, edges)
+    indoor_floors = list(dict.fromkeys(node.get("floor", "") for node in indoor_graph.nodes))
+    multi_level_router = _build_multi_level(nodes, edges, map_data.get("entrances", []))
+
+def _build_multi_level(nodes, edges, entrances):
+    """按建筑拆分室内路网并建立室内外连接"""
+    global indoor_buildings
+    building_of = {node["id"]: node.get("building", INDOOR_DEFAULT_BUILDING) for node in nodes}
+    grouped = {}
     for node in nodes:
-        if node['name']==start_name:
-            start_node=node
-        if node['name']==end_name:
-            end_node=node
-    if not start_node or not end_node:
+        grouped.setdefault(building_of[node["id"]], ([], []))[0].append(node)
+    for edge in edges:
+        building = building_of.get(edge["start_node"])
+        # 跨建筑的边不参与室内路网
+        if building is not None and building == building_of.get(edge["end_node"]):
+            grouped[building][1].append(edge)
+    indoor_buildings = {building: IndoorBuilding(building, b_nodes, b_edges)
+                        for building, (b_nodes, b_edges) in grouped.items()}
+
+    road = get_graph()
+    links = []
+    for entrance in entrances:
+        indoor_id, outdoor_id = entrance.get("indoor"), entrance.get("outdoor")
+        building = entrance.get("building", building_of.get(indoor_id))
+        if building not in indoor_buildings or outdoor_id not in road.nodes_by_id:
+            continue
+        distance = entrance.get("distance")
+        if distance is None:
+            inside, outside = indoor_buildings[building].graph.node(indoor_id), road.node(outdoor_id)
+            distance = haversine(inside["latitude"], inside["longitude"], outside["latitude"], outside["longitude"])
+        links.append((building, indoor_id, outdoor_id, float(distance)))
+    return MultiLevelRouter(indoor_buildings, links)
+
+_load_indoor()
+
+def _floor_segments(path):
+    """把路径按楼层切分为连续的段，[{"floor", "path"}]"""
+    segments = []
+    for node in path:
+        floor = node.get("floor", "")
+        if not segments or segments[-1]["floor"] != floor:
+            segments.append({"floor": floor, "path": []})
+        segments[-1]["path"].append(node)
+    return segments
+
+def indoor_shortest_path(start_name, end_name):
+    """
+    室内最短路径
+    返回:
+        {"success", "id": 结果ID, "distance", "path": 完整路径, "segments": 按楼层切分的连续路段}
+        结果同时在内存中保留 INDOOR_RESULT_TTL 秒，可按 id 分楼层获取
+    """
+    global _latest_indoor_result
+    road = indoor_graph
+    start_id, end_id = road.resolve(start_name), road.resolve(end_name)
+    if start_id == -1 or end_id == -1:
         raise ValueError("地点不存在")
-    path, distance = dijkstra(start_node['id'], {end_node['id']}, graph)
-    distance = round(distance,2)
-    full_path = []
+    path, distance = dijkstra(start_id, {end_id}, road.adjacency(DISTANCE_MODE))
     if distance == float('inf'):
         raise ValueError("路径不存在")
-    for id in path:
-        for node in nodes:
-            if node['id']==id:
-                full_path.append(node)
-                break
-    path_1L=[]
-    path_2L=[]
-    path_3L=[]
-    indoor_cache['1L']['distance']=distance
-    indoor_cache['2L']['distance']=distance
-    indoor_cache['3L']['distance']=distance
-    for node in full_path:
-        if node['floor'] == '1L':
-            path_1L.append(node)
-        elif node['floor'] == '2L':
-            path_2L.append(node)
-        elif node['floor'] == '3L':
-            path_3L.append(node)
-        else:
-            raise ValueError("楼层不存在")
-    indoor_cache['1L']['path']=path_1L
-    indoor_cache['2L']['path']=path_2L
-    indoor_cache['3L']['path']=path_3L
-    
-    write_json(INDOOR_CACHE_FILE, indoor_cache)
-    return {"success": True}
+    full_path = [road.node(node_id) for node_id in path]
+    result = {"success": True, "id": uuid.uuid4().hex, "distance": round(distance, 2),
+              "path": full_path, "segments": _floor_segments(full_path)}
+    indoor_results.put(result["id"], (time.monotonic() + INDOOR_RESULT_TTL, result))
+    _latest_indoor_result = result["id"]
+    return result
 
-def get_indoor_path(floor: str):
-    data = read_json(INDOOR_CACHE_FILE)
-    if floor not in data:
+def get_indoor_path(floor: str, result_id=None):
+    """
+    获取某次室内导航结果在某一楼层上的路径
+    参数:
+        result_id: indoor_shortest_path 返回的结果ID，为空时取最近一次的结果
+    返回:
+        (该楼层上的路径节点, 总距离)
+    """
+    if floor not in indoor_floors:
         raise ValueError("楼层不存在")
-    return data[floor]["path"], data[floor]["distance"]
+    result_id = result_id or _latest_indoor_result
+    entry = indoor_results.get(result_id) if result_id is not None else None
+    if entry is None or entry[0] < time.monotonic():
+        raise ValueError("导航结果不存在或已过期")
+    result = entry[1]
+    return [node for node in result["path"] if node.get("floor", "") == floor], result["distance"]
+
+def _resolve_level(name, building=None):
+    """
+    解析联合路由的地点
+    参数:
+        building: 为空时先找室外路网，再依次找各建筑；为 OUTDOOR 或建筑ID时只在该层查找
+    返回:
+        (层, 节点ID)，不存在时返回 None
+    """
+    road = get_graph()
+    if building in (None, OUTDOOR):
+        node_id = road.resolve(name)
+        if node_id != -1:
+            return OUTDOOR, node_id
+        if building == OUTDOOR:
+            return None
+    candidates = indoor_buildings if building is None else {building: indoor_buildings.get(building)}
+    for building_id, indoor in candidates.items():
+        if indoor is not None and indoor.graph.resolve(name) != -1:
+            return building_id, indoor.graph.resolve(name)
+    return None
+
+def _outdoor_costs(road, sources, targets):
+    """室外起点集合到终点集合两两之间的距离（全源矩阵可用时直接查表）"""
+    sources = [node_id for node_id in sources if node_id in road.index_of]
+    targets = [node_id for node_id in targets if node_id in road.index_of]
+    matrix = get_all_pairs(DISTANCE_MODE)
+    costs = {}
+    if matrix is not None:
+        for a in sources:
+            for b in targets:
+                distance = matrix.distance(road.index_of[a], road.index_of[b])
+                if distance != float('inf'):
+                    costs[(a, b)] = distance
+        return costs
+    graph = road.adjacency(DISTANCE_MODE)
+    for a in sources:
+        dist, _ = shortest_path_tree(a, graph, targets)
+        costs.update(((a, b), dist[b]) for b in targets if b in dist)
+    return costs
+
+def unified_shortest_path(start_name, end_name, start_building=None, end_building=None):
+    """
+    室内外联合最短路径（按距离，跨楼层计入电梯/楼梯换乘代价）
+    返回:
+        {"cost": 含换乘代价的总代价, "distance": 实际距离,
+         "path": 完整路径（节点附带 level）, "segments": [{"level", "floor", "path"}]}
+    """
+    road = get_graph()
+    start = _resolve_level(start_name, start_building)
+    end = _resolve_level(end_name, end_building)
+    if start is None or end is None:
+        raise ValueError("地点不存在")
+
+    cache_key = ("unified", start, end, road.version)
+    cached = route_cache.get(cache_key)
+    if cached is not None:
+        return cached
+
+    cost, legs = multi_level_router.route(
+        start, end,
+        lambda sources, targets: _outdoor_costs(road, sources, targets),
+        lambda a, b: _distance_route(road, a, b))
+    if cost == float('inf'):
+        raise ValueError("路径不存在")
+
+    path, segments, distance = [], [], 0.0
+    for leg in legs:
+        level, ids = leg["level"], leg["path"]
+        distance += leg["link"]
+        if level == OUTDOOR:
+            nodes = [dict(road.node(node_id), level=OUTDOOR) for node_id in ids]
+            distance += leg["cost"]
+        else:
+            indoor = indoor_buildings[level]
+            nodes = [dict(indoor.graph.node(node_id), level=level) for node_id in ids]
+            distance += indoor.path_distance(ids)
+        for node in nodes:
+            floor = node.get("floor") if level != OUTDOOR else None
+            if not segments or (segments[-1]["level"], segments[-1]["floor"]) != (level, floor):
+                segments.append({"level": level, "floor": floor, "path": []})
+            segments[-1]["path"].append(node)
+        path.extend(nodes)
+    result = {"cost": round(cost, 2), "distance": round(distance, 2), "path": path, "segments": segments}
+    route_cache.put(cache_key, result)
+    return result
 
 def add_node(node_data: NodeRequest) -> dict:
     """将请求的节点加入地图数据中"""
-    graph = get_map()
-    nodes = graph.get('nodes', [])
+    with _graph_lock:
+        return _add_node_locked(node_data)
+
+def _add_node_locked(node_data: NodeRequest) -> dict:
+    road = get_graph()
+    index = _get_edit_index(road)
 
     if node_data.id is None:
-        max_id = max((node["id"] for node in nodes), default=-1)
-        node_data.id = max_id + 1
+        node_data.id = index.next_node_id
 
-    for node in nodes:
-        if node["id"] == node_data.id:
-            return {"success": False, "graph": graph}
+    if index.has_node(node_data.id):
+        return {"success": False}
     
     new_node = {
         'id' : node_data.id,
@@ -341,39 +1207,33 @@ def add_node(node_data: NodeRequest) -> dict:
         'popularity' : node_data.popularity,
         'longitude' : node_data.longitude,
         'latitude' : node_data.latitude,
-        'connected_edges' : node_data.connected_edges
+        'connected_edges' : list(node_data.connected_edges)
     }
-    graph['nodes'].append(new_node)
-    write_json(MAP_FILE, graph)
-    return {"success": True, "graph": graph}
+    new_graph = _commit_edit(road, {"op": "add_node", "node": new_node})
+    _carry_place_index(road.version, new_graph.version, new_node)
+    return {"success": True, "node": new_node, "version": new_graph.version}
 
 def add_edge(edge_data: EdgeRequest) -> dict:
     """将请求的边加入地图数据中"""
-    graph = get_map()
+    with _graph_lock:
+        return _add_edge_locked(edge_data)
+
+def _add_edge_locked(edge_data: EdgeRequest) -> dict:
+    road = get_graph()
     if edge_data.start_node == edge_data.end_node:
-        return {"success": False, "graph": graph} # 防止自环
-    nodes = graph.get('nodes', [])
-    edges = graph.get('edges', [])
+        return {"success": False} # 防止自环
+    index = _get_edit_index(road)
 
-    start_node = None
-    end_node = None
-    for node in nodes:
-        if node.get('id',-1) == edge_data.start_node:
-            start_node = node
-        if node.get('id',-1) == edge_data.end_node:
-            end_node = node
+    start_node = road.nodes_by_id.get(edge_data.start_node)
+    end_node = road.nodes_by_id.get(edge_data.end_node)
     if start_node is None or end_node is None:
-        return {"success": False, "graph": graph} # 节点不存在
+        return {"success": False} # 节点不存在
 
     if edge_data.id is None:
-        max_id = max((edge["id"] for edge in edges), default=-1)
-        edge_data.id = max_id + 1
+        edge_data.id = index.next_edge_id
 
-    for edge in edges:
-        if edge['id'] == edge_data.id or \
-        edge['start_node'] == edge_data.start_node and edge['end_node'] == edge_data.end_node or \
-        edge['start_node'] == edge_data.end_node and edge['end_node'] == edge_data.start_node:
-            return {"success": False, "graph": graph} # 边重复
+    if index.has_edge(edge_data.id, edge_data.start_node, edge_data.end_node):
+        return {"success": False} # 边重复
     
     lon1 = start_node.get('longitude')
     lat1 = start_node.get('latitude')
@@ -389,126 +1249,325 @@ def add_edge(edge_data: EdgeRequest) -> dict:
         'bike_speed' : edge_data.bike_speed,
         'ebike_speed' : edge_data.ebike_speed
     }
-    graph['edges'].append(new_edge)
-    for node in graph['nodes']:
-        if node.get('id',-1) == edge_data.start_node:
-            print("start: ",node)
-            node['connected_edges'].append(edge_data.id)
-        if node.get('id',-1) == edge_data.end_node:
-            print("end: ",node)
-            node['connected_edges'].append(edge_data.id)
-    write_json(MAP_FILE, graph)
-    return {"success": True, "graph": graph}
-
-from algorithm.Hash import simple_hash
-
-def _load_places():
-    global head_index
-    global next_index
-    graph = get_map()
-    nodes = graph.get('nodes', [])
-    head_index=[]
-    next_index=[-1]*len(nodes)
-
-    data=[]
-    for i in range(len(nodes)):
-        hash_value = simple_hash(nodes[i].get("type",""))
-        data.append((hash_value,i))
-    data.sort(key=lambda x: x[0])
-    for i in range(len(data)):
-        if i==0 or data[i][0]!=data[i-1][0]:
-            head_index.append((data[i][1],data[i][0]))
-        else:
-            next_index[data[i-1][1]]=data[i][1]
+    new_graph = _commit_edit(road, {"op": "add_edge", "edge": new_edge})
+    # 节点位置与类型不变，场所索引可直接沿用
+    _carry_place_index(road.version, new_graph.version)
+    return {"success": True, "edge": new_edge, "version": new_graph.version}
 
-_load_places()
+def import_map(node_rows=(), edge_rows=(), skip_invalid=False):
+    """
+    批量导入节点与边
+    参数:
+        node_rows / edge_rows: (行号, 字段字典) 的可迭代对象，见 utils.map_import 中的 iter_csv / iter_geojson
+        skip_invalid: 为 False 时任一行不合法则整批不导入；为 True 时跳过不合法的行
+    返回:
+        {"success", "nodes": 导入节点数, "edges": 导入边数, "version", "errors": 不合法的行（最多 100 条）, "error_count"}
+    整批只写一条日志记录、只重建一次快照与预处理
+    """
+    with _graph_lock:
+        road = get_graph()
+        importer = MapImporter(road, _get_edit_index(road))
+        importer.add_nodes(node_rows)
+        importer.add_edges(edge_rows)
+        nodes, edges = importer.finish()
+        result = {"success": True, "nodes": len(nodes), "edges": len(edges), "version": road.version,
+                  "errors": importer.errors, "error_count": importer.error_count}
+        if importer.error_count and not skip_invalid:
+            result.update(success=False, nodes=0, edges=0)
+            return result
+        if not nodes and not edges:
+            return result
+        new_graph = _commit_edit(road, {"op": "import", "nodes": nodes, "edges": edges})
+        # 大批量导入后立即压缩，避免日志中留下体积很大的记录
+        if len(edit_log) and len(nodes) + len(edges) >= MAP_COMPACT_EVERY:
+            _compact_locked()
+        result["version"] = new_graph.version
+        return result
+
+# 场所网格索引的网格边长（米）
+PLACE_GRID_CELL = 100.0
+
+_place_index = (None, None)
+
+def _build_place_index(road):
+    """按场所类型为所有节点建立网格索引（索引中保存节点ID）"""
+    ref_latitude = float(road.latitudes.mean()) if road.node_count else 0.0
+    index = TypedSpatialIndex(PLACE_GRID_CELL, ref_latitude)
+    for node in road.nodes:
+        index.insert(node.get("type", ""), node["id"], node.get("latitude", 0.0), node.get("longitude", 0.0))
+    return index
+
+def get_place_index():
+    """获取当前路网版本的场所索引（版本不一致时重建）"""
+    global _place_index
+    road = get_graph()
+    version, index = _place_index
+    if version != road.version or index is None:
+        index = _build_place_index(road)
+        _place_index = (road.version, index)
+    return index
+
+def _carry_place_index(old_version, new_version, new_node=None):
+    """发布新版本后增量维护场所索引，只需插入新节点（调用方需持有 _graph_lock）"""
+    global _place_index
+    version, index = _place_index
+    if version != old_version or index is None:
+        # 尚未建立或已过期，下次查询时重建
+        return
+    if new_node is not None:
+        index.insert(new_node.get("type", ""), new_node["id"], new_node.get("latitude", 0.0),
+                     new_node.get("longitude", 0.0))
+    _place_index = (new_version, index)
 
 def search_places(longitude: float, latitude: float, query_type: str, max_results: int, max_distance: float):
-    """查询最近的指定类型节点"""
-    graph = get_map()
-    nodes = graph.get('nodes', [])
-    candidates = []
-
-    hash_value = simple_hash(query_type)
-    for index, value in head_index:
-        if hash_value==value:
-            while index != -1:
-                node=nodes[index]
-                lon1=longitude
-                lat1=latitude
-                lon2=node.get('longitude')
-                lat2=node.get('latitude')
-                distance=round(haversine(lat1, lon1, lat2, lon2), 2)
-                if distance <= max_distance:
-                    candidate_node = PlaceDetail(
-                        id=node.get('id'),
-                        name=node.get('name'),
-                        type=node.get('type'),
-                        popularity=node.get('popularity'),
-                        longitude=node.get('longitude'),
-                        latitude=node.get('latitude'),
-                        distance=distance
-                    )
-                    candidates.append(candidate_node)
-                index=next_index[index]
-            break
-            
-    sorted_places = quick_sort(candidates, sort_key=lambda x: x.distance)
-    return sorted_places[:max_results]
-
-def search_places_v2(start_name: str, query_type: str, max_results: int, max_distance: float):
-    """查询最近的指定类型节点"""
-    map_data = get_map()
-    nodes = map_data['nodes']
-    edges = map_data['edges']
-    candidates = []
-    nodes_dict = {}
-    for node in nodes:
-        nodes_dict[node.get('id',0)]=node   
+    """查询最近的指定类型节点（网格索引 k 近邻，只为最终结果构造 PlaceDetail）"""
+    road = get_graph()
+    nearest = get_place_index().nearest(query_type, latitude, longitude, max_results, max_distance)
+    places = []
+    for distance, node_id in nearest:
+        node = road.nodes_by_id.get(node_id)
+        if node is not None:
+            places.append(_place_detail(node, distance))
+    return places
 
-    start_id = next((node['id'] for node in nodes if node['name'] == start_name), -1)
-    for node in nodes:
-        if node['name']==start_name:
-            start_node = node
-    if start_id == -1:
-        raise("地点不存在")
-    # 构建邻接表
-    graph = build_graph(nodes, edges, "no traffic mode")
-    
-    hash_value = simple_hash(query_type)
-    for index, value in head_index:
-        if hash_value==value:
-            while index != -1:
-                node=nodes[index]
-                lon1=start_node.get('longitude')
-                lat1=start_node.get('latitude')
-                lon2=node.get('longitude')
-                lat2=node.get('latitude')
-                distance=round(haversine(lat1, lon1, lat2, lon2), 2)
-                if distance <= max_distance:
-                    candidate_node = PlaceDetail(
-                        id=node.get('id'),
-                        name=node.get('name'),
-                        type=node.get('type'),
-                        popularity=node.get('popularity'),
-                        longitude=node.get('longitude'),
-                        latitude=node.get('latitude'),
-                        distance=distance
-                    )
-                    candidates.append(candidate_node)
-                index=next_index[index]
-            break
-    
-    result = []
-    count = 0
-    while count < max_results:
-        path, distance = dijkstra(start_id,candidates,graph)
-        result.append(get_node_by_id(nodes_dict,path[-1]))
-        count+=1
-    return result
+def _place_detail(node, distance):
+    return PlaceDetail(
+        id=node.get('id'),
+        name=node.get('name'),
+        type=node.get('type'),
+        popularity=node.get('popularity'),
+        longitude=node.get('longitude'),
+        latitude=node.get('latitude'),
+        distance=round(distance, 2)
+    )
+
+def search_places_network(longitude: float, latitude: float, query_type: str, max_results: int,
+                          max_distance: float, start_name: str = None):
+    """
+    按路网距离查询最近的指定类型节点（单次 Dijkstra，确定 max_results 个目标或超出 max_distance 即停止）
+    起点为 start_name 对应的节点；未指定时取离用户坐标最近的路网节点，并计入用户到该节点的直线距离
+    返回:
+        按路网距离升序的 PlaceDetail 列表
+    """
+    road = get_graph()
+    if start_name:
+        start_id = road.resolve(start_name)
+        if start_id == -1:
+            raise ValueError("地点不存在")
+        access = 0.0
+    else:
+        if road.node_count == 0:
+            return []
+        distances = road.geo.distances_from(latitude, longitude)
+        nearest = int(distances.argmin())
+        start_id, access = int(road.node_ids[nearest]), float(distances[nearest])
+
+    targets = get_place_index().members(query_type)
+    if not targets or access > max_distance:
+        return []
+    found = nearest_targets(start_id, road.adjacency(DISTANCE_MODE), targets, max_results, max_distance - access)
+    return [_place_detail(road.nodes_by_id[node_id], access + cost) for node_id, cost in found]
 
-# 示例调用
+# 坐标吸附：边网格的网格边长（米）、默认的最大吸附距离与接口允许的最大吸附距离（米）
+SNAP_GRID_CELL = 50.0
+SNAP_MAX_DISTANCE = 500.0
+SNAP_DISTANCE_LIMIT = 5000.0
+# 吸附产生的临时节点ID（真实节点ID均为非负数，-1 表示地点不存在）
+SNAP_START_ID = -2
+SNAP_END_ID = -3
+SNAP_NAMES = {SNAP_START_ID: "起点", SNAP_END_ID: "终点"}
+
+_edge_grid = (None, None)
+
+def get_edge_grid():
+    """获取当前路网版本的边网格索引（按需构建）"""
+    global _edge_grid
+    road = get_graph()
+    version, grid = _edge_grid
+    if version != road.version or grid is None:
+        u, v = road.edge_u, road.edge_v
+        grid = EdgeGrid(road.latitudes[u], road.longitudes[u], road.latitudes[v], road.longitudes[v],
+                        SNAP_GRID_CELL)
+        _edge_grid = (road.version, grid)
+    return grid
+
+def snap_point(longitude: float, latitude: float, max_distance: float = SNAP_MAX_DISTANCE):
+    """
+    把任意坐标吸附到最近的路网边上（投影到线段）
+    返回:
+        {"edge_id", "start_node", "end_node", "fraction": 投影点到 start_node 的长度占边长的比例,
+         "distance": 坐标到投影点的距离（米）, "longitude", "latitude": 投影点坐标, "edge": 边下标}
+    """
+    road = get_graph()
+    found = get_edge_grid().nearest(float(latitude), float(longitude), max_distance)
+    if found is None:
+        raise ValueError("附近没有道路")
+    distance, edge, fraction, snap_latitude, snap_longitude = found
+    return {
+        "edge_id": road.edges[int(road.edge_positions[edge])]["id"],
+        "start_node": int(road.node_ids[road.edge_u[edge]]),
+        "end_node": int(road.node_ids[road.edge_v[edge]]),
+        "fraction": fraction,
+        "distance": round(distance, 2),
+        "longitude": snap_longitude,
+        "latitude": snap_latitude,
+        "edge": edge,
+    }
+
+def _snap_endpoints(road, start_name, end_name, start_location, end_location):
+    """
+    解析起终点：给出坐标 (经度, 纬度) 时吸附到最近的边并使用临时节点，否则按名称查找
+    返回:
+        (起点ID, 终点ID, {临时节点ID: 吸附结果})
+    """
+    ids, snaps = [], {}
+    for name, location, virtual_id in ((start_name, start_location, SNAP_START_ID),
+                                       (end_name, end_location, SNAP_END_ID)):
+        if location is None:
+            node_id = road.resolve(name)
+            if node_id == -1:
+                raise ValueError("地点不存在")
+            ids.append(node_id)
+        else:
+            snaps[virtual_id] = snap_point(*location)
+            ids.append(virtual_id)
+    return ids[0], ids[1], snaps
+
+def _snap_overlay(road, base, snaps, arcs):
+    """
+    在邻接表上插入临时节点：临时节点与所在边的两个端点相连，同一条边上的两个临时节点之间直接相连
+    参数:
+        snaps: {临时节点ID: 吸附结果}
+        arcs: 函数 (边下标, 长度) -> [弧中邻居之后的字段元组]，不可通行时返回空列表
+    """
+    overlay = OverlayAdjacency(base)
+    placed = list(snaps.items())
+    for virtual_id, snap in placed:
+        edge, fraction = snap["edge"], snap["fraction"]
+        length = float(road.edge_distance[edge])
+        for other, part in ((snap["start_node"], fraction * length), (snap["end_node"], (1.0 - fraction) * length)):
+            for tail in arcs(edge, part):
+                overlay.add_arc(virtual_id, (other,) + tail)
+                overlay.add_arc(other, (virtual_id,) + tail)
+    if len(placed) == 2 and placed[0][1]["edge"] == placed[1][1]["edge"]:
+        (a, snap_a), (b, snap_b) = placed
+        part = abs(snap_a["fraction"] - snap_b["fraction"]) * float(road.edge_distance[snap_a["edge"]])
+        for tail in arcs(snap_a["edge"], part):
+            overlay.add_arc(a, (b,) + tail)
+            overlay.add_arc(b, (a,) + tail)
+    return overlay
+
+def _snap_heuristic(road, landmarks, overlay, target_id, snaps):
+    """
+    叠加临时节点后到 target_id 的 ALT 下界
+    - 目标为临时节点时，真实节点的下界取 min(到所在边端点的下界 + 端点到目标的弧权)
+    - 其他临时节点的下界由其出弧推出：min(弧权 + 邻居的下界)
+    这样得到的下界仍满足一致性，可用于双向A*与时变搜索
+    """
+    index_of = road.index_of
+    if target_id in index_of:
+        bound = landmarks.lower_bound(index_of[target_id])
+    else:
+        bound = np.full(road.node_count, np.inf)
+        for arc in overlay[target_id]:
+            if arc[0] in index_of:
+                bound = np.minimum(bound, landmarks.lower_bound(index_of[arc[0]]) + arc[1])
+    bound = bound.tolist()
+    virtual = {target_id: 0.0}
+    for virtual_id in snaps:
+        if virtual_id != target_id:
+            virtual[virtual_id] = min((arc[1] + (0.0 if arc[0] == target_id else bound[index_of[arc[0]]])
+                                       for arc in overlay[virtual_id]), default=float('inf'))
+    return lambda node_id: virtual[node_id] if node_id in virtual else bound[index_of[node_id]]
+
+def _snap_node(snaps, node_id):
+    """临时节点的节点信息（坐标为投影点）"""
+    snap = snaps[node_id]
+    return {"id": node_id, "name": SNAP_NAMES[node_id], "type": "virtual", "longitude": snap["longitude"],
+            "latitude": snap["latitude"], "edge_id": snap["edge_id"], "fraction": round(snap["fraction"], 4)}
+
+def _snapped_route(road, traffic_mode, start_id, end_id, snaps, departure_time=None, slot=None):
+    """
+    起点或终点为临时节点时的路径搜索（不使用全源矩阵/收缩层次，在叠加后的邻接表上搜索）
+    未指定出发时间的交通方式使用时间片 slot 的拥挤度
+    返回:
+        (节点信息列表, 总代价, 每段交通方式)
+    """
+    landmarks = get_landmarks(traffic_mode)
+    if traffic_mode == DISTANCE_MODE:
+        overlay = _snap_overlay(road, road.adjacency(DISTANCE_MODE), snaps,
+                                lambda edge, length: [(length, DISTANCE_MODE)])
+    elif departure_time is not None:
+        speeds = road.edge_speed
+        overlay = _snap_overlay(road, road.time_dependent_adjacency(traffic_mode), snaps,
+                                lambda edge, length: [(length / float(speeds[mode][edge]), mode, edge)
+                                                      for mode in MODE_COMBINATIONS[traffic_mode]
+                                                      if speeds[mode][edge] > 0])
+    else:
+        speeds = road.edge_speed
+        crowd = get_congestion(road, slot)
+        overlay = _snap_overlay(road, _crowd_adjacency(road, traffic_mode, slot), snaps,
+                                lambda edge, length: [(length / float(crowd[edge] * speeds[mode][edge]), mode)
+                                                      for mode in MODE_COMBINATIONS[traffic_mode]
+                                                      if speeds[mode][edge] > 0])
+    heuristic = _snap_heuristic(road, landmarks, overlay, end_id, snaps)
+    if departure_time is not None:
+        path, cost, path_mode = time_dependent_dijkstra(start_id, end_id, overlay,
+                                                        CongestionStore.seconds_of_day(departure_time),
+                                                        congestion_store.arrival, heuristic)
+    else:
+        reverse_heuristic = _snap_heuristic(road, landmarks, overlay, start_id, snaps)
+        path, cost, path_mode = bidirectional_astar(start_id, end_id, overlay, heuristic, reverse_heuristic)
+    nodes = [_snap_node(snaps, node_id) if node_id in snaps else road.node(node_id) for node_id in path]
+    return nodes, cost, path_mode
+
+def _nodes_length(nodes):
+    """沿节点信息列表累加相邻节点间的地表距离"""
+    if len(nodes) < 2:
+        return 0.0
+    lats = np.array([node["latitude"] for node in nodes], dtype=np.float64)
+    lons = np.array([node["longitude"] for node in nodes], dtype=np.float64)
+    return float(haversine_array(lats[:-1], lons[:-1], lats[1:], lons[1:]).sum())
+
+# 示例调用 / 离线预处理
+# python -m app.services.map_service            运行示例查询
+# python -m app.services.map_service build_ch   生成收缩层次预处理文件
+# python -m app.services.map_service build_binary   生成二进制路网文件（代替 map.json 作为快照）
 if __name__ == '__main__':
+    import sys
+    if sys.argv[1:2] == ["build_ch"]:
+        hierarchies = build_contraction_hierarchies()
+        for mode, ch in hierarchies.items():
+            print(f"{mode}: {len(ch.shortcuts)} 条捷径")
+        sys.exit(0)
+    if sys.argv[1:2] == ["import"] and len(sys.argv) >= 3:
+        # python -m app.services.map_service import <节点.csv> [<边.csv>] | <地图.geojson>
+        from utils.map_import import iter_csv, iter_geojson, NODE_COLUMNS, EDGE_COLUMNS
+        files = sys.argv[2:]
+        if files[0].endswith((".geojson", ".json")):
+            with open(files[0], encoding="utf-8-sig") as f:
+                result = import_map(*iter_geojson(json.load(f)))
+        else:
+            with open(files[0], newline="", encoding="utf-8-sig") as node_file:
+                node_rows = iter_csv(node_file, NODE_COLUMNS)
+                if len(files) > 1:
+                    with open(files[1], newline="", encoding="utf-8-sig") as edge_file:
+                        result = import_map(node_rows, iter_csv(edge_file, EDGE_COLUMNS))
+                else:
+                    result = import_map(node_rows)
+        for error in result["errors"]:
+            print(f"{error['source']} 第 {error['line']} 行: {error['reason']}")
+        print(f"导入 {result['nodes']} 个节点、{result['edges']} 条边，当前版本 {result['version']}")
+        sys.exit(0 if result["success"] else 1)
+    if sys.argv[1:2] == ["build_binary"]:
+        result = build_binary_map()
+        print(f"已生成二进制路网文件: {result['nodes']} 个节点、{result['edges']} 条边，"
+              f"{result['size']} 字节，当前版本 {result['version']}")
+        sys.exit(0)
+    if sys.argv[1:2] == ["compact"]:
+        print(f"已压缩编辑日志，当前版本 {compact_map()['version']}")
+        sys.exit(0)
+
     path, distance= one_to_one_shortest_path("北门", "西门")
     print(path)
     print(distance)
@@ -519,10 +1578,11 @@ if __name__ == '__main__':
     print(time)
     print(distance)
 
-    path, distance= one_to_many_shortest_path("北门", ["西门","东门"])
+    path, distance, order = one_to_many_shortest_path("北门", ["西门","东门"])
     print(path)
     print(distance)
+    print(order)
     # print(f"距离：{distance}, 花费: {time} 分钟")
     # print("路径:")
     # for n in path:
-    #     print(n)
+    #     print(n)
\ No newline at end of file
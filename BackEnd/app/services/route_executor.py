@@ -0,0 +1,227 @@
+import asyncio
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from starlette.concurrency import run_in_threadpool
+from algorithm.Graph import DISTANCE_MODE
+from app.services import map_service
+
+# 路径规划工作进程数，0 时退回 Starlette 线程池执行（不启用进程池）
+ROUTE_WORKERS = min(4, os.cpu_count() or 1)
+# 排队与执行中的请求总数上限，超过时直接拒绝
+ROUTE_QUEUE_SIZE = 64
+# 单个请求的默认超时（秒）
+ROUTE_TIMEOUT = 10.0
+# 允许分派到工作进程的查询（map_service 中的函数名）
+ROUTE_FUNCTIONS = tuple(map_service.ROUTE_QUERIES)
+# 工作进程从这些文件重建路网快照与拥挤度（取父进程当前的路径）
+ROUTE_DATA_FILES = ("MAP_FILE", "MAP_BINARY_FILE", "MAP_LOG_FILE", "CH_FILE", "APSP_FILE", "CONGESTION_FILE")
+# 工作进程读不到请求的路网版本（快照文件无法解析或版本偏低）时的重试次数与间隔（秒），用尽后请求失败
+SYNC_RETRIES = 20
+SYNC_RETRY_DELAY = 0.05
+
+
+class RouteQueueFull(Exception):
+    """排队的请求数已达上限"""
+
+
+class RouteTimeout(Exception):
+    """请求在超时时间内没有完成"""
+
+
+# 工作进程已同步到的父进程状态 (路网版本, 拥挤度版本)
+_synced = None
+
+
+def _init_worker(files):
+    """工作进程初始化：使用父进程的数据文件路径，与导入时加载的默认路径不同时重新加载"""
+    global _synced
+    changed = any(getattr(map_service, name) != path for name, path in files.items())
+    for name, path in files.items():
+        setattr(map_service, name, path)
+    if changed:
+        map_service._load_graph()
+        map_service._load_congestion()
+        map_service._load_all_pairs()
+        map_service._load_contraction_hierarchies()
+    _synced = None
+
+
+def _sync(state):
+    """
+    把工作进程的路网与拥挤度同步到父进程提交请求时的状态
+    - 路网：重新读取快照文件并重放编辑日志（父进程先写日志再发布新版本），全源矩阵随之增量更新；
+      快照无法解析或版本低于请求的版本时重试，仍然失败则抛出异常，不用不完整的路网回答
+    - 拥挤度：重新读取拥挤度文件（父进程写入文件后才发布新的拥挤度版本），并沿用父进程的版本号
+    """
+    global _synced
+    if state == _synced:
+        return
+    version, revision = state
+    road = map_service.get_graph()
+    graph_changed = road.version != version
+    if graph_changed:
+        for attempt in range(SYNC_RETRIES):
+            try:
+                map_service._load_graph()
+            except ValueError:
+                if attempt == SYNC_RETRIES - 1:
+                    raise
+            else:
+                if map_service.get_graph().version >= version:
+                    break
+                if attempt == SYNC_RETRIES - 1:
+                    raise RuntimeError(f"工作进程无法加载路网版本 {version}（文件中为 {map_service.get_graph().version}）")
+            time.sleep(SYNC_RETRY_DELAY)
+        map_service._update_all_pairs(road, map_service.get_graph())
+        map_service.route_cache.clear()
+    if graph_changed or _synced is None or _synced[1] != revision:
+        map_service._load_congestion()
+        map_service.congestion_store.revision = revision
+    _synced = state
+
+
+def _call(function, state, args, kwargs):
+    _sync(state)
+    return function(*args, **kwargs)
+
+
+def _warm_up(state):
+    """启动时让工作进程先完成导入、同步与距离地标的计算，首个请求不必等待"""
+    _sync(state)
+    map_service.get_landmarks(DISTANCE_MODE)
+    return os.getpid()
+
+
+def snapshot_key():
+    """父进程当前的状态：(路网版本, 拥挤度版本)，两者对应的数据均已写入文件"""
+    return map_service.get_graph().version, map_service.congestion_store.revision
+
+
+class RouteExecutor:
+    """
+    路径规划进程池：CPU 密集的搜索在 N 个工作进程中执行，不再在请求线程之间争抢 GIL
+    - 工作进程以 forkserver（不支持时 spawn）方式启动，不从多线程的服务进程 fork，不会继承其他线程持有的锁；
+      进程池在启动时创建并常驻，只在工作进程异常退出后重建
+    - 每个请求带上父进程的 (路网版本, 拥挤度版本)，工作进程发现版本变化时从数据文件重新加载
+    - 分派前先查父进程的路径结果缓存，命中时不占用排队名额，未命中时把工作进程的结果写回该缓存，
+      /map/path_plan/cache_stats 的统计覆盖全部请求
+    - 排队与执行中的请求数不超过 queue_size，超过时抛出 RouteQueueFull
+    - 每个请求有超时时间，超时抛出 RouteTimeout（尚未开始的请求被取消，已开始的在后台执行完后才释放名额）
+    """
+
+    def __init__(self, workers=ROUTE_WORKERS, queue_size=ROUTE_QUEUE_SIZE, timeout=ROUTE_TIMEOUT):
+        self.workers = workers
+        self.queue_size = queue_size
+        self.timeout = timeout
+        methods = multiprocessing.get_all_start_methods()
+        self.context = multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+        self._pool = None
+        self._pending = 0
+        self._lock = threading.Lock()
+        self._stats = {"finished": 0, "rejected": 0, "timeouts": 0, "pools": 0}
+
+    def _get_pool(self):
+        """常驻的进程池（不存在或已损坏时创建），调用方需持有 self._lock"""
+        if self._pool is None:
+            files = {name: getattr(map_service, name) for name in ROUTE_DATA_FILES}
+            self._pool = ProcessPoolExecutor(self.workers, mp_context=self.context,
+                                             initializer=_init_worker, initargs=(files,))
+            self._stats["pools"] += 1
+        return self._pool
+
+    def start(self):
+        """创建进程池并等待全部工作进程完成加载（服务启动时调用）"""
+        if self.workers <= 0:
+            return
+        with self._lock:
+            pool = self._get_pool()
+        state = snapshot_key()
+        for future in [pool.submit(_warm_up, state) for _ in range(self.workers)]:
+            future.result()
+
+    def _release(self, _=None):
+        with self._lock:
+            self._pending -= 1
+            self._stats["finished"] += 1
+
+    def _run_in_thread(self, function, args, kwargs):
+        """线程池中执行查询，线程真正结束时才释放名额（超时取消等待不会提前释放）"""
+        try:
+            return function(*args, **kwargs)
+        finally:
+            self._release()
+
+    async def run(self, name, *args, timeout=None, **kwargs):
+        """
+        在工作进程中执行 map_service 的查询并异步等待结果，查询抛出的异常（如 ValueError）原样抛出
+        参数:
+            name: ROUTE_FUNCTIONS 中的函数名
+            timeout: 超时（秒），默认为 self.timeout
+        """
+        if name not in ROUTE_FUNCTIONS:
+            raise ValueError(f"不支持的查询: {name}")
+        timeout = self.timeout if timeout is None else timeout
+        function = getattr(map_service, name)
+        state, cache_key = None, None
+        if self.workers > 0:
+            # 线程池中执行时查询函数自己读写缓存，这里只处理进程池
+            state = snapshot_key()
+            cache_key = map_service.route_cache_key(name, *args, **kwargs)
+            if cache_key is not None:
+                cached = map_service.route_cache.get(cache_key)
+                if cached is not None:
+                    return cached
+        with self._lock:
+            if self._pending >= self.queue_size:
+                self._stats["rejected"] += 1
+                raise RouteQueueFull("路径规划请求过多，请稍后重试")
+            pool = None
+            if self.workers > 0:
+                pool = self._get_pool()
+                try:
+                    future = pool.submit(_call, function, state, args, kwargs)
+                except BrokenProcessPool:
+                    self._pool = None
+                    pool = self._get_pool()
+                    future = pool.submit(_call, function, state, args, kwargs)
+            self._pending += 1
+        if pool is not None:
+            # 已开始的请求不能取消，done 回调在其执行完后才触发
+            future.add_done_callback(self._release)
+            waiter = asyncio.wrap_future(future)
+        else:
+            waiter = asyncio.ensure_future(run_in_threadpool(self._run_in_thread, function, args, kwargs))
+        try:
+            result = await asyncio.wait_for(waiter, timeout)
+        except asyncio.TimeoutError:
+            with self._lock:
+                self._stats["timeouts"] += 1
+            raise RouteTimeout("路径规划超时")
+        except BrokenProcessPool:
+            # 工作进程异常退出，下次提交时重建
+            with self._lock:
+                if self._pool is pool:
+                    self._pool = None
+            raise
+        if cache_key is not None:
+            map_service.route_cache.put(cache_key, result)
+        return result
+
+    def stats(self):
+        """进程数、排队与执行中的请求数，累计的结束 / 拒绝 / 超时次数与进程池创建次数"""
+        with self._lock:
+            return dict(self._stats, workers=self.workers, pending=self._pending, queue_size=self.queue_size)
+
+    def shutdown(self):
+        with self._lock:
+            if self._pool is not None:
+                self._pool.shutdown(wait=False, cancel_futures=True)
+                self._pool = None
+
+
+# 全局路径规划执行器
+route_executor = RouteExecutor()
@@ -0,0 +1,62 @@
+"""
+ALT 启发式与直线距离（haversine）启发式、单向与双向搜索的对比测试
+运行方式（在 BackEnd 目录下）:
+    python -m benchmarks.alt_benchmark [查询次数]
+输出每种算法的平均确定节点数与平均耗时
+"""
+import random
+import sys
+import time
+
+from algorithm.Graph import DISTANCE_MODE
+from algorithm.ShortestPath import astar, dijkstra, bidirectional_astar, bidirectional_dijkstra
+from app.services.map_service import get_graph, get_landmarks, haversine
+
+
+def run(queries=500, seed=42):
+    road = get_graph()
+    graph = road.adjacency(DISTANCE_MODE)
+    landmarks = get_landmarks(DISTANCE_MODE)
+    rng = random.Random(seed)
+    ids = road.node_ids.tolist()
+    pairs = [(rng.choice(ids), rng.choice(ids)) for _ in range(queries)]
+
+    def haversine_heuristic(end_id):
+        end_node = road.node(end_id)
+        return lambda node_id: haversine(road.node(node_id)['latitude'], road.node(node_id)['longitude'],
+                                         end_node['latitude'], end_node['longitude'])
+
+    def alt_heuristic(end_id):
+        return landmarks.heuristic(road.index_of[end_id], road.index_of)
+
+    results = {}
+    for name, search in (
+        ("dijkstra", lambda s, t, stats: dijkstra(s, {t}, graph, stats)),
+        ("astar+haversine", lambda s, t, stats: astar(s, t, graph, haversine_heuristic(t), stats)),
+        ("astar+ALT", lambda s, t, stats: astar(s, t, graph, alt_heuristic(t), stats)),
+        ("bidi-dijkstra", lambda s, t, stats: bidirectional_dijkstra(s, t, graph, stats=stats)[:2]),
+        ("bidi-astar+ALT", lambda s, t, stats: bidirectional_astar(s, t, graph, alt_heuristic(t), alt_heuristic(s),
+                                                                 stats=stats)[:2]),
+    ):
+        settled = 0
+        costs = []
+        begin = time.perf_counter()
+        for s, t in pairs:
+            stats = {}
+            _, cost = search(s, t, stats)
+            settled += stats.get('settled', 0)
+            costs.append(cost)
+        elapsed = time.perf_counter() - begin
+        results[name] = (settled / queries, elapsed / queries * 1000, costs)
+
+    print(f"节点数: {road.node_count}, 边数: {road.edge_count}, 地标数: {len(landmarks.landmarks)}, 查询次数: {queries}")
+    print(f"{'算法':<18}{'平均确定节点数':>16}{'平均耗时(ms)':>16}")
+    baseline = results["dijkstra"][2]
+    for name, (settled, ms, costs) in results.items():
+        # 所有算法都应得到相同的最短距离
+        assert all(a == b or abs(a - b) < 1e-6 for a, b in zip(costs, baseline)), name
+        print(f"{name:<18}{settled:>16.1f}{ms:>16.3f}")
+
+
+if __name__ == '__main__':
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 500)
@@ -0,0 +1,73 @@
+"""
+路网快照加载的对比测试：map.json（解析 JSON 后构造 RoadGraph）vs 内存映射的二进制路网文件
+运行方式（在 BackEnd 目录下）:
+    python -m benchmarks.graph_file_benchmark [网格边长]
+在合成网格路网（默认 320 x 320，约 10 万个节点）上输出文件大小、加载耗时与加载后常驻的 Python 堆内存
+（tracemalloc 统计；内存映射的数组由页缓存承载，多个进程共享，不计入）
+"""
+import gc
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from algorithm.Graph import RoadGraph, DISTANCE_MODE
+from algorithm.GraphFile import write_graph_file, load_graph_file
+from benchmarks.k_shortest_benchmark import grid_road
+
+
+def _json_load(path):
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    return RoadGraph(data["nodes"], data["edges"], data.get("version", 0))
+
+
+def measure(name, path, load):
+    gc.collect()
+    begin = time.perf_counter()
+    road = load(path)
+    elapsed = time.perf_counter() - begin
+    del road
+    # 内存单独再加载一次统计（tracemalloc 会显著拖慢加载）
+    gc.collect()
+    tracemalloc.start()
+    road = load(path)
+    resident, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    # 加载后的首次查询（含构造距离邻接表）
+    begin = time.perf_counter()
+    road.adjacency(DISTANCE_MODE)
+    first_query = time.perf_counter() - begin
+    print(f"{name:<12}{os.path.getsize(path) / 2 ** 20:>12.1f}{elapsed * 1000:>14.1f}"
+          f"{resident / 2 ** 20:>14.1f}{peak / 2 ** 20:>14.1f}{first_query * 1000:>14.1f}")
+    return road
+
+
+def run(size=320):
+    road = grid_road(size)
+    # 与 map.json 一致：节点带 connected_edges、类型与热度
+    for node in road.nodes:
+        node.update(type="路口", popularity=1)
+    for edge in road.edges:
+        road.nodes_by_id[edge["start_node"]]["connected_edges"].append(edge["id"])
+        road.nodes_by_id[edge["end_node"]]["connected_edges"].append(edge["id"])
+    with tempfile.TemporaryDirectory() as folder:
+        json_path, binary_path = os.path.join(folder, "map.json"), os.path.join(folder, "map.bin")
+        with open(json_path, "w", encoding="utf-8") as f:
+            json.dump(road.to_dict(), f, ensure_ascii=False, indent=4)
+        write_graph_file(binary_path, road)
+        del road
+
+        print(f"节点数: {size * size}, 边数: {2 * size * (size - 1)}")
+        print(f"{'格式':<12}{'大小(MB)':>12}{'加载(ms)':>14}{'常驻(MB)':>14}{'峰值(MB)':>14}{'首次建图(ms)':>14}")
+        from_json = measure("map.json", json_path, _json_load)
+        from_binary = measure("map.bin", binary_path, load_graph_file)
+        assert from_json.adjacency(DISTANCE_MODE) == from_binary.adjacency(DISTANCE_MODE)
+        del from_json, from_binary
+
+
+if __name__ == '__main__':
+    args = [int(arg) for arg in sys.argv[1:]]
+    run(*args)
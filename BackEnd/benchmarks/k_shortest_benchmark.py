@@ -0,0 +1,126 @@
+"""
+备选路径（Yen 算法）的对比测试：共享反向最短路树的偏离搜索 vs 每次偏离重新运行 dijkstra
+运行方式（在 BackEnd 目录下）:
+    python -m benchmarks.k_shortest_benchmark [查询次数] [k] [网格边长]
+分别在校园路网与合成网格路网（默认 224 x 224，约 5 万个节点）上输出平均耗时与确定的节点数（含反向树）；
+网格上逐次 dijkstra 的基线每次查询需要上千次整图规模的搜索，只跑 1 次查询
+"""
+import heapq
+import random
+import sys
+import time
+
+from algorithm.Graph import RoadGraph, DISTANCE_MODE
+from algorithm.KShortest import k_shortest_paths
+from app.services.map_service import get_graph
+
+
+def grid_road(size, seed=7):
+    """size x size 的网格路网，边长在 80~200 米之间随机"""
+    rng = random.Random(seed)
+    nodes, edges = [], []
+    for y in range(size):
+        for x in range(size):
+            nodes.append({"id": y * size + x, "name": f"{x},{y}", "longitude": 116.0 + x * 0.001,
+                          "latitude": 39.0 + y * 0.001, "connected_edges": []})
+    for y in range(size):
+        for x in range(size):
+            u = y * size + x
+            for v in ([u + 1] if x + 1 < size else []) + ([u + size] if y + 1 < size else []):
+                edges.append({"id": len(edges), "start_node": u, "end_node": v, "distance": rng.uniform(80, 200),
+                              "walk_speed": 1.0, "bike_speed": 3.0, "ebike_speed": 0.0})
+    return RoadGraph(nodes, edges)
+
+
+def _dijkstra_excluding(start, end, graph, blocked, removed, stats):
+    """跳过禁用节点与起点被删除出边的 dijkstra，返回 (路径, 代价)"""
+    dist, prev = {start: 0.0}, {}
+    done = set()
+    pq = [(0.0, start)]
+    while pq:
+        cost, node = heapq.heappop(pq)
+        if node in done:
+            continue
+        done.add(node)
+        if node == end:
+            break
+        for neighbor, weight, _ in graph[node]:
+            if neighbor in blocked or (node == start and neighbor in removed):
+                continue
+            if cost + weight < dist.get(neighbor, float('inf')):
+                dist[neighbor] = cost + weight
+                prev[neighbor] = node
+                heapq.heappush(pq, (cost + weight, neighbor))
+    stats['settled'] += len(done)
+    if end not in done:
+        return [], float('inf')
+    path = [end]
+    while path[-1] != start:
+        path.append(prev[path[-1]])
+    return path[::-1], dist[end]
+
+
+def naive_yen(start, end, graph, k, stats):
+    """教科书式 Yen 算法：每次偏离都从偏离点重新运行一次 dijkstra"""
+    path, cost = _dijkstra_excluding(start, end, graph, set(), set(), stats)
+    if not path:
+        return []
+    found, candidates, seen = [(cost, path)], [], {tuple(path)}
+    while len(found) < k:
+        last = found[-1][1]
+        for i in range(len(last) - 1):
+            root = last[:i + 1]
+            removed = {p[i + 1] for _, p in found if p[:i + 1] == root}
+            spur_path, spur_cost = _dijkstra_excluding(root[-1], end, graph, set(root[:-1]), removed, stats)
+            if spur_path:
+                root_cost = sum(min(w for n, w, _ in graph[u] if n == v) for u, v in zip(root, root[1:]))
+                total = root[:-1] + spur_path
+                if tuple(total) not in seen:
+                    seen.add(tuple(total))
+                    heapq.heappush(candidates, (root_cost + spur_cost, total))
+        if not candidates:
+            break
+        found.append(heapq.heappop(candidates))
+    return found
+
+
+def measure(name, road, queries, k, naive_queries):
+    graph = road.adjacency(DISTANCE_MODE)
+    rng = random.Random(42)
+    ids = road.node_ids.tolist()
+    pairs = [(rng.choice(ids), rng.choice(ids)) for _ in range(queries)]
+
+    print(f"[{name}] 节点数: {road.node_count}, 边数: {road.edge_count}, k = {k}")
+    print(f"{'算法':<20}{'查询次数':>10}{'平均确定节点数':>16}{'平均耗时(ms)':>16}")
+    shared = []
+    settled = 0
+    begin = time.perf_counter()
+    for s, t in pairs:
+        stats = {}
+        shared.append([cost for _, cost, _ in k_shortest_paths(s, t, graph, k, stats=stats)])
+        settled += stats['tree'] + stats['settled']
+    elapsed = time.perf_counter() - begin
+    print(f"{'shared-tree Yen':<20}{queries:>10}{settled / queries:>16.1f}{elapsed / queries * 1000:>16.3f}")
+
+    settled = 0
+    begin = time.perf_counter()
+    for (s, t), expected in zip(pairs[:naive_queries], shared):
+        stats = {'settled': 0}
+        costs = [cost for cost, _ in naive_yen(s, t, graph, k, stats)]
+        settled += stats['settled']
+        # 两种实现应得到相同的 k 条路径代价
+        assert len(costs) == len(expected) and all(abs(a - b) < 1e-6 for a, b in zip(costs, expected)), (s, t)
+    elapsed = time.perf_counter() - begin
+    if naive_queries:
+        print(f"{'naive Yen':<20}{naive_queries:>10}{settled / naive_queries:>16.1f}"
+              f"{elapsed / naive_queries * 1000:>16.3f}")
+
+
+def run(queries=100, k=5, size=224):
+    measure("校园路网", get_graph(), queries, k, queries)
+    measure("合成网格", grid_road(size), max(queries // 10, 1), k, 1)
+
+
+if __name__ == '__main__':
+    args = [int(arg) for arg in sys.argv[1:]]
+    run(*args)
@@ -0,0 +1,72 @@
+"""
+路径规划执行方式的对比测试：Starlette 线程池（共享 GIL）vs 路径规划进程池
+运行方式（在 BackEnd 目录下）:
+    python -m benchmarks.route_executor_benchmark [请求数] [并发数] [网格边长]
+在合成网格路网（默认 120 x 120）上并发提交一到一最短路请求（起终点各不相同，不命中缓存），
+输出吞吐量与延迟分位数；进程池的加速取决于 CPU 核数
+工作进程从数据文件加载路网，网格路网先写入临时目录中的二进制路网文件
+"""
+import asyncio
+import os
+import random
+import sys
+import tempfile
+import time
+
+from algorithm.Graph import DISTANCE_MODE
+from app.services import map_service
+from algorithm.GraphFile import write_graph_file
+from app.services.route_executor import RouteExecutor, ROUTE_WORKERS, ROUTE_DATA_FILES
+from benchmarks.k_shortest_benchmark import grid_road
+
+
+async def _load(executor, pairs, concurrency):
+    gate = asyncio.Semaphore(concurrency)
+    latencies = []
+
+    async def one(start, end):
+        async with gate:
+            begin = time.perf_counter()
+            await executor.run("one_to_one_shortest_path", start, end)
+            latencies.append(time.perf_counter() - begin)
+
+    begin = time.perf_counter()
+    await asyncio.gather(*(one(s, t) for s, t in pairs))
+    return time.perf_counter() - begin, sorted(latencies)
+
+
+def measure(name, executor, pairs, concurrency):
+    # 预热：创建进程池，各工作进程加载路网并计算地标
+    executor.start()
+    elapsed, latencies = asyncio.run(_load(executor, pairs, concurrency))
+    p50 = latencies[len(latencies) // 2]
+    p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+    print(f"{name:<16}{len(pairs) / elapsed:>14.1f}{p50 * 1000:>14.1f}{p99 * 1000:>14.1f}")
+    executor.shutdown()
+
+
+def run(requests=400, concurrency=16, size=120):
+    with tempfile.TemporaryDirectory() as data_dir:
+        for name in ROUTE_DATA_FILES:
+            setattr(map_service, name, os.path.join(data_dir, os.path.basename(getattr(map_service, name))))
+        write_graph_file(map_service.MAP_BINARY_FILE, grid_road(size))
+        map_service._load_graph()
+        map_service._load_congestion()
+        map_service._load_all_pairs()
+        map_service.get_landmarks(DISTANCE_MODE)
+        rng = random.Random(42)
+        names = [node["name"] for node in map_service.road_graph.nodes]
+        pairs = [(rng.choice(names), rng.choice(names)) for _ in range(requests)]
+
+        print(f"节点数: {size * size}, 请求数: {requests}, 并发数: {concurrency}, CPU 核数: {os.cpu_count()}")
+        print(f"{'执行方式':<16}{'吞吐(次/秒)':>14}{'p50(ms)':>14}{'p99(ms)':>14}")
+        map_service.route_cache.clear()
+        measure("线程池", RouteExecutor(workers=0, queue_size=concurrency), pairs, concurrency)
+        map_service.route_cache.clear()
+        workers = max(ROUTE_WORKERS, 1)
+        measure(f"进程池 x{workers}", RouteExecutor(workers=workers, queue_size=concurrency), pairs, concurrency)
+
+
+if __name__ == '__main__':
+    args = [int(arg) for arg in sys.argv[1:]]
+    run(*args)
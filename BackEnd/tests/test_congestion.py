@@ -0,0 +1,154 @@
+# tests/test_congestion.py
+import os
+import tempfile
+import time
+import unittest
+
+import numpy as np
+from pydantic import ValidationError
+
+from algorithm.Congestion import CongestionStore, DAY_SECONDS
+from algorithm.Graph import RoadGraph
+from algorithm.ShortestPath import time_dependent_dijkstra, dijkstra
+from app.services import map_service
+from app.models.map import OneToOneTimeRequest, MAX_DEPARTURE_TIME
+from tests.test_road_graph import NODES, EDGES
+
+
+class TestCongestionStore(unittest.TestCase):
+    def test_simulate_range_and_peak(self):
+        store = CongestionStore.simulate(50)
+        self.assertEqual(store.factors.shape, (50, 96))
+        self.assertEqual(store.slot_seconds, 900)
+        self.assertTrue(((store.factors >= 0.8) & (store.factors <= 1.0)).all())
+        # 早高峰比凌晨更拥挤
+        self.assertLess(store.factors[:, 32].mean(), store.factors[:, 12].mean())
+
+    def test_arrival_is_fifo(self):
+        store = CongestionStore(np.array([[1.0, 0.5, 1.0, 1.0]]))
+        slot = store.slot_seconds
+        # 整段在畅通时间片内
+        self.assertAlmostEqual(store.arrival(0, 100.0, 0.0), 100.0)
+        # 跨入拥挤时间片：剩余部分按一半速度行驶
+        self.assertAlmostEqual(store.arrival(0, 100.0, slot - 50.0), slot + 100.0)
+        # 超过一天时循环使用时间片
+        self.assertAlmostEqual(store.arrival(0, 10.0, DAY_SECONDS + slot), DAY_SECONDS + slot + 20.0)
+        times = np.linspace(0, 3 * slot, 200)
+        arrivals = [store.arrival(0, 500.0, t) for t in times]
+        self.assertTrue(all(a <= b + 1e-9 for a, b in zip(arrivals, arrivals[1:])))
+
+    def test_update_resize_and_persist(self):
+        store = CongestionStore.simulate(3, slot_seconds=3600)
+        store.update([0, 2], [0.5, 0.25], slots=[1, 23])
+        store.update([1], [0.9])
+        self.assertAlmostEqual(float(store.factors[0, 1]), 0.5)
+        self.assertAlmostEqual(float(store.factors[2, 23]), 0.25)
+        self.assertTrue(np.allclose(store.factors[1], 0.9))
+        self.assertEqual(store.revision, 2)
+        for bad in (([0], [0.0], None), ([5], [0.5], None), ([0], [0.5], [24])):
+            with self.assertRaises(ValueError):
+                store.update(*bad)
+
+        store.resize(5)
+        self.assertEqual(store.edge_count, 5)
+        np.testing.assert_allclose(store.factors[4], store.factors[:3].mean(axis=0), rtol=1e-6)
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, "congestion.npy")
+            store.save(path)
+            loaded = CongestionStore.load(path)
+            np.testing.assert_array_equal(loaded.factors, store.factors)
+            self.assertEqual(loaded.slot_seconds, 3600)
+            self.assertIsNone(CongestionStore.load(os.path.join(temp_dir, "missing.npy")))
+
+    def test_slot_of_uses_local_time(self):
+        store = CongestionStore.simulate(1)
+        noon = time.mktime((2024, 5, 1, 12, 10, 0, 0, 0, -1))
+        self.assertEqual(store.slot_of(noon), 48)
+
+    def test_departure_time_is_bounded(self):
+        # 超出范围的出发时间在请求校验时被拒绝，不会在换算时间片时溢出
+        for value in (-1e30, -1.0, 1e30):
+            with self.assertRaises(ValidationError):
+                OneToOneTimeRequest(start="A", end="C", departure_time=value)
+        self.assertEqual(OneToOneTimeRequest(departure_time=MAX_DEPARTURE_TIME).departure_time, MAX_DEPARTURE_TIME)
+
+
+class TestTimeDependentDijkstra(unittest.TestCase):
+    def test_constant_factors_match_static_dijkstra(self):
+        road = RoadGraph(NODES, EDGES)
+        factors = np.array([0.5, 0.8])
+        store = CongestionStore(np.repeat(factors[:, None], 24, axis=1))
+        graph = road.time_dependent_adjacency("walk_ebike")
+        path, total_time, path_mode = time_dependent_dijkstra(0, 2, graph, 1000.0, store.arrival)
+        static = road.adjacency("walk_ebike", crowd=factors)
+        expected_path, expected_time = dijkstra(0, {2}, static)
+        self.assertEqual(path, expected_path)
+        self.assertAlmostEqual(total_time, expected_time, places=4)
+        self.assertEqual(path_mode, ["walk", "ebike"])
+
+        # 不可达
+        graph = road.time_dependent_adjacency("bike")
+        self.assertEqual(time_dependent_dijkstra(0, 2, graph, 0.0, store.arrival)[0], [])
+
+
+class TestCongestionService(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.original = (map_service.road_graph, map_service.congestion_store, map_service.CONGESTION_FILE,
+                         map_service.APSP_FILE, map_service.all_pairs)
+        map_service.road_graph = RoadGraph(list(NODES), list(EDGES), version=7)
+        map_service.congestion_store = CongestionStore.simulate(len(EDGES))
+        map_service.CONGESTION_FILE = os.path.join(self.temp_dir.name, "congestion.npy")
+        map_service.APSP_FILE = os.path.join(self.temp_dir.name, "map_apsp.json")
+        map_service.route_cache.clear()
+
+    def tearDown(self):
+        (map_service.road_graph, map_service.congestion_store, map_service.CONGESTION_FILE,
+         map_service.APSP_FILE, map_service.all_pairs) = self.original
+        map_service.route_cache.clear()
+        self.temp_dir.cleanup()
+
+    def test_update_changes_departure_time_result(self):
+        departure = time.mktime((2024, 5, 1, 3, 0, 0, 0, 0, -1))
+        map_service.update_congestion([(0, 1.0, None), (1, 1.0, None)])
+        _, _, free_time, _ = map_service.one_to_one_shortest_time("A", "C", "walk", departure_time=departure)
+        self.assertAlmostEqual(free_time, 172.0)
+
+        info = map_service.update_congestion([(0, 0.5, None)])
+        self.assertEqual(info["updated"], 1)
+        self.assertTrue(os.path.exists(map_service.CONGESTION_FILE))
+        # 拥挤度版本变化后不会命中旧缓存
+        _, _, slow_time, _ = map_service.one_to_one_shortest_time("A", "C", "walk", departure_time=departure)
+        self.assertAlmostEqual(slow_time, 258.0)
+
+        with self.assertRaises(ValueError):
+            map_service.update_congestion([(99, 0.5, None)])
+
+    def test_shortest_time_follows_current_congestion(self):
+        # A-B-C 与绕行的 A-D-C：畅通时经过 B 更快，A-B 拥挤后经过 D 更快
+        nodes = list(NODES) + [{"id": 3, "name": "D", "type": "路口", "longitude": 116.001, "latitude": 39.001,
+                                "connected_edges": [2, 3]}]
+        edges = list(EDGES) + [
+            {"id": 2, "start_node": 0, "end_node": 3, "distance": 100.0, "walk_speed": 1.0, "bike_speed": 0.0,
+             "ebike_speed": 0.0},
+            {"id": 3, "start_node": 3, "end_node": 2, "distance": 100.0, "walk_speed": 1.0, "bike_speed": 0.0,
+             "ebike_speed": 0.0},
+        ]
+        map_service.road_graph = RoadGraph(nodes, edges, version=7)
+        map_service.congestion_store = CongestionStore.simulate(len(edges))
+        map_service.build_all_pairs()
+        map_service.update_congestion([(0, 1.0, None), (1, 1.0, None), (2, 1.0, None), (3, 1.0, None)])
+        path, _, free_time, _ = map_service.one_to_one_shortest_time("A", "C", "walk")
+        self.assertEqual(([node["name"] for node in path], free_time), (["A", "B", "C"], 172.0))
+
+        # 全源矩阵只按距离预处理，拥挤时按当前拥挤度选路
+        map_service.update_congestion([(0, 0.5, None)])
+        path, _, slow_time, _ = map_service.one_to_one_shortest_time("A", "C", "walk")
+        self.assertEqual(([node["name"] for node in path], slow_time), (["A", "D", "C"], 200.0))
+        self.assertEqual([node["name"] for node in map_service.one_to_one_shortest_path("A", "C")[0]],
+                         ["A", "B", "C"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,65 @@
+# tests/test_contraction_hierarchy.py
+import random
+import unittest
+
+from algorithm.ContractionHierarchy import ContractionHierarchy
+from algorithm.ShortestPath import dijkstra
+
+
+def grid_edges(width, height, seed=7):
+    """生成带随机权重的网格图，交替使用两种交通方式"""
+    rng = random.Random(seed)
+    edges = []
+    for y in range(height):
+        for x in range(width):
+            u = y * width + x
+            if x + 1 < width:
+                edges.append((u, u + 1, rng.uniform(1, 10), "walk"))
+            if y + 1 < height:
+                edges.append((u, u + width, rng.uniform(1, 10), "bike"))
+    return edges
+
+
+class TestContractionHierarchy(unittest.TestCase):
+    def setUp(self):
+        self.width, self.height = 12, 10
+        self.edges = grid_edges(self.width, self.height)
+        self.graph = {i: [] for i in range(self.width * self.height)}
+        for u, v, w, mode in self.edges:
+            self.graph[u].append((v, w, mode))
+            self.graph[v].append((u, w, mode))
+
+    def assert_matches_dijkstra(self, ch):
+        rng = random.Random(1)
+        n = self.width * self.height
+        for _ in range(200):
+            s, t = rng.randrange(n), rng.randrange(n)
+            _, expected = dijkstra(s, {t}, self.graph)
+            path, cost, modes = ch.query(s, t)
+            self.assertAlmostEqual(cost, expected)
+            self.assertEqual(path[0], s)
+            self.assertEqual(path[-1], t)
+            # 展开后的路径只包含原始边，且总长与查询结果一致
+            length = 0.0
+            for (u, v), mode in zip(zip(path, path[1:]), modes):
+                weight, edge_mode = min((w, m) for x, w, m in self.graph[u] if x == v)
+                self.assertEqual(mode, edge_mode)
+                length += weight
+            self.assertAlmostEqual(length, cost)
+
+    def test_query_matches_dijkstra(self):
+        ch = ContractionHierarchy.build(self.width * self.height, self.edges)
+        self.assert_matches_dijkstra(ch)
+
+    def test_round_trip(self):
+        ch = ContractionHierarchy.build(self.width * self.height, self.edges)
+        restored = ContractionHierarchy.from_dict(ch.to_dict(), self.edges)
+        self.assert_matches_dijkstra(restored)
+
+    def test_unreachable(self):
+        ch = ContractionHierarchy.build(3, [(0, 1, 1.0, "walk")])
+        self.assertEqual(ch.query(0, 2), ([], float('inf'), []))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,65 @@
+# tests/test_edit_log.py
+import os
+import tempfile
+import unittest
+
+from algorithm.EditLog import EditLog, EditIndex
+
+NODES = [
+    {"id": 0, "name": "A", "connected_edges": [0]},
+    {"id": 1, "name": "B", "connected_edges": [0]},
+]
+EDGES = [{"id": 0, "start_node": 0, "end_node": 1, "distance": 10.0}]
+
+
+class TestEditLog(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.temp_dir.name, "edits.jsonl")
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_append_read_truncate(self):
+        log = EditLog(self.path)
+        log.append({"version": 1, "op": "add_node", "node": {"id": 2, "name": "中"}})
+        log.append({"version": 2, "op": "add_node", "node": {"id": 3}})
+        self.assertEqual(len(EditLog(self.path)), 2)
+        self.assertEqual(log.read()[0]["node"]["name"], "中")
+        log.truncate()
+        self.assertEqual((len(log), log.read()), (0, []))
+
+    def test_torn_last_line_is_ignored(self):
+        log = EditLog(self.path)
+        log.append({"version": 1, "op": "add_node", "node": {"id": 2}})
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write('{"version": 2, "op": "add_')
+        self.assertEqual([record["version"] for record in EditLog(self.path).read()], [1])
+
+
+class TestEditIndex(unittest.TestCase):
+    def test_duplicates_and_next_ids(self):
+        index = EditIndex(NODES, EDGES)
+        self.assertEqual((index.next_node_id, index.next_edge_id), (2, 1))
+        self.assertTrue(index.has_node(1))
+        self.assertTrue(index.has_edge(0, 5, 6))
+        self.assertTrue(index.has_edge(7, 1, 0))
+        self.assertFalse(index.has_edge(7, 0, 2))
+
+    def test_apply_copies_endpoints(self):
+        index = EditIndex(NODES, EDGES)
+        nodes, edges = list(NODES), list(EDGES)
+        index.apply(nodes, edges, {"op": "add_node", "node": {"id": 2, "name": "C", "connected_edges": []}})
+        index.apply(nodes, edges, {"op": "add_edge", "edge": {"id": 1, "start_node": 1, "end_node": 2}})
+        self.assertEqual(nodes[1]["connected_edges"], [0, 1])
+        self.assertEqual(nodes[2]["connected_edges"], [1])
+        # 原列表与原节点字典不变
+        self.assertEqual((len(NODES), NODES[1]["connected_edges"]), (2, [0]))
+        self.assertTrue(index.has_edge(9, 2, 1))
+        self.assertEqual((index.next_node_id, index.next_edge_id), (3, 2))
+        with self.assertRaises(ValueError):
+            index.apply(nodes, edges, {"op": "delete_node"})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,60 @@
+# tests/test_geo.py
+import unittest
+
+import numpy as np
+
+from algorithm.Geo import (GeoPoints, haversine, haversine_array, haversine_matrix, equirectangular_array,
+                           equirectangular_error_bound, FAST_PATH_MAX_DISTANCE, FAST_PATH_MAX_LATITUDE,
+                           EARTH_RADIUS)
+
+
+class TestGeo(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(3)
+        self.lats = 39.95 + rng.uniform(0, 0.03, 50)
+        self.lons = 116.34 + rng.uniform(0, 0.03, 50)
+
+    def test_vectorized_matches_scalar(self):
+        one_to_many = haversine_array(self.lats[0], self.lons[0], self.lats, self.lons)
+        matrix = haversine_matrix(self.lats, self.lons, self.lats[:5], self.lons[:5])
+        self.assertEqual(matrix.shape, (50, 5))
+        for j in range(50):
+            expected = haversine(self.lats[0], self.lons[0], self.lats[j], self.lons[j])
+            self.assertAlmostEqual(one_to_many[j], expected, places=6)
+            self.assertAlmostEqual(matrix[j, 0], expected, places=6)
+
+        points = GeoPoints(self.lats, self.lons)
+        expected = sum(haversine(self.lats[i], self.lons[i], self.lats[i + 1], self.lons[i + 1]) for i in range(3))
+        self.assertAlmostEqual(points.path_length([0, 1, 2, 3]), expected, places=6)
+        self.assertEqual(points.path_length([4]), 0.0)
+
+    def test_equirectangular_error_bound(self):
+        rng = np.random.default_rng(11)
+        n = 100000
+        lat1 = rng.uniform(-FAST_PATH_MAX_LATITUDE, FAST_PATH_MAX_LATITUDE, n)
+        lon1 = rng.uniform(-180, 180, n)
+        distance = rng.uniform(1, FAST_PATH_MAX_DISTANCE, n)
+        angle = rng.uniform(0, 2 * np.pi, n)
+        lat2 = lat1 + np.degrees(distance * np.sin(angle) / EARTH_RADIUS)
+        lon2 = lon1 + np.degrees(distance * np.cos(angle) / EARTH_RADIUS / np.cos(np.radians(lat1)))
+        exact = haversine_array(lat1, lon1, lat2, lon2)
+        approx = equirectangular_array(lat1, lon1, lat2, lon2)
+        bound = np.array([equirectangular_error_bound(d, max(abs(a), abs(b)))
+                          for d, a, b in zip(exact, lat1, lat2)])
+        self.assertTrue((np.abs(approx - exact) <= bound + 1e-6).all())
+        self.assertLess(equirectangular_error_bound(FAST_PATH_MAX_DISTANCE, FAST_PATH_MAX_LATITUDE), 0.03)
+
+    def test_fast_path_only_within_range(self):
+        points = GeoPoints(self.lats, self.lons)
+        fast = points.distances_from(39.96, 116.35, fast=True)
+        exact = points.distances_from(39.96, 116.35)
+        self.assertFalse(np.array_equal(fast, exact))
+        self.assertLess(np.abs(fast - exact).max(), 0.01)
+        # 查询点远离数据集时退回 Haversine
+        np.testing.assert_array_equal(points.distances_from(31.2, 121.5, fast=True),
+                                      points.distances_from(31.2, 121.5))
+        np.testing.assert_array_equal(points.distances_from(39.96, 116.35, index=np.array([3, 1])), exact[[3, 1]])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,83 @@
+# tests/test_graph_file.py
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+from algorithm.Graph import RoadGraph, DISTANCE_MODE
+from algorithm.GraphFile import StringTable, write_graph_file, load_graph_file, read_graph_header, ALIGNMENT
+
+NODES = [
+    {"id": 5, "name": "北门", "type": "大门", "popularity": 10, "longitude": 116.0, "latitude": 39.0,
+     "connected_edges": [0]},
+    {"id": 7, "name": "", "type": "路口", "longitude": 116.001, "latitude": 39.0, "connected_edges": [0, 1]},
+    {"id": 9, "name": "食堂", "type": "食堂", "popularity": 3, "longitude": 116.002, "latitude": 39.001,
+     "connected_edges": [1]},
+]
+EDGES = [
+    {"id": 0, "start_node": 5, "end_node": 7, "distance": 86.0, "walk_speed": 1.0, "bike_speed": 3.0,
+     "ebike_speed": 0.0},
+    {"id": 1, "start_node": 7, "end_node": 9, "distance": 120.5, "walk_speed": 1.0, "bike_speed": 0.0,
+     "ebike_speed": 5.0, "note": "坡道"},
+    # 端点不存在的边不写入
+    {"id": 2, "start_node": 9, "end_node": 42, "distance": 10.0, "walk_speed": 1.0, "bike_speed": 0.0,
+     "ebike_speed": 0.0},
+]
+
+
+class TestGraphFile(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.temp_dir.name, "map.bin")
+        self.road = RoadGraph(NODES, EDGES, version=4)
+        write_graph_file(self.path, self.road)
+        self.loaded = load_graph_file(self.path)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_string_table(self):
+        table = StringTable(*StringTable.encode(["北门", "", "abc"]))
+        self.assertEqual((len(table), table[0], table[1], table[-1]), (3, "北门", "", "abc"))
+        self.assertEqual(table.tolist(), ["北门", "", "abc"])
+        with self.assertRaises(IndexError):
+            table[3]
+
+    def test_round_trip(self):
+        self.assertEqual(self.loaded.version, 4)
+        self.assertEqual(self.loaded.to_dict(), {"nodes": NODES, "edges": EDGES[:2], "version": 4})
+        self.assertEqual(self.loaded.resolve("食堂"), 9)
+        self.assertEqual(self.loaded.node(7)["connected_edges"], [0, 1])
+        self.assertNotIn(42, self.loaded.nodes_by_id)
+        self.assertEqual(self.loaded.edge_index_of, {0: 0, 1: 1})
+        # 访问返回的是新字典，修改不影响快照
+        self.loaded.node(5)["name"] = "改"
+        self.assertEqual(self.loaded.node(5)["name"], "北门")
+
+    def test_arrays_are_mapped(self):
+        header, base = read_graph_header(self.path)
+        self.assertEqual(base % ALIGNMENT, 0)
+        self.assertTrue(all(offset % ALIGNMENT == 0 for _, _, offset in header["arrays"].values()))
+        self.assertIsInstance(self.loaded.latitudes, np.memmap)
+        self.assertIsInstance(self.loaded.csr["walk"].weights, np.memmap)
+        for mode in (DISTANCE_MODE, "walk_ebike"):
+            crowd = np.ones(self.road.edge_count)
+            self.assertEqual(self.loaded.adjacency(mode, crowd), self.road.adjacency(mode, crowd))
+        self.assertEqual(self.loaded.edge_list("walk_bike"), self.road.edge_list("walk_bike"))
+        self.assertEqual(self.loaded.find_edge(1, 2, "ebike"), 1)
+
+    def test_rewrite_keeps_mapped_snapshot(self):
+        # 原子替换文件后，已加载的快照仍读取旧内容
+        write_graph_file(self.path, RoadGraph(NODES[:2], EDGES[:1], version=5))
+        self.assertEqual(self.loaded.node_count, 3)
+        self.assertEqual(self.loaded.node(9)["name"], "食堂")
+        self.assertEqual(load_graph_file(self.path).node_count, 2)
+        with open(self.path, "r+b") as f:
+            f.write(b"NOTGRAPH")
+        with self.assertRaises(ValueError):
+            load_graph_file(self.path)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,52 @@
+# tests/test_hull.py
+import random
+import unittest
+
+from algorithm.Hull import convex_hull, concave_hull
+
+
+def area(polygon):
+    return sum(a[0] * b[1] - b[0] * a[1] for a, b in zip(polygon, polygon[1:] + polygon[:1])) / 2
+
+
+def covers(polygon, p):
+    """点在多边形内部或边上"""
+    inside = False
+    for a, b in zip(polygon, polygon[1:] + polygon[:1]):
+        cross = (b[0] - a[0]) * (p[1] - a[1]) - (b[1] - a[1]) * (p[0] - a[0])
+        if abs(cross) < 1e-9 and min(a[0], b[0]) - 1e-9 <= p[0] <= max(a[0], b[0]) + 1e-9 \
+                and min(a[1], b[1]) - 1e-9 <= p[1] <= max(a[1], b[1]) + 1e-9:
+            return True
+        if (a[1] > p[1]) != (b[1] > p[1]):
+            x = a[0] + (p[1] - a[1]) * (b[0] - a[0]) / (b[1] - a[1])
+            if p[0] < x:
+                inside = not inside
+    return inside
+
+
+class TestHull(unittest.TestCase):
+    def test_convex_hull(self):
+        points = [(0, 0), (2, 0), (2, 2), (0, 2), (1, 1), (1, 0), (0.5, 1.5)]
+        hull = convex_hull(points)
+        self.assertEqual(sorted(hull), [(0, 0), (0, 2), (2, 0), (2, 2)])
+        self.assertGreater(area(hull), 0)  # 逆时针
+        self.assertEqual(convex_hull([(1, 1), (1, 1)]), [(1, 1)])
+
+    def test_concave_hull_follows_u_shape(self):
+        rng = random.Random(1)
+        points = []
+        for _ in range(300):
+            x, y = rng.uniform(0, 30), rng.uniform(0, 30)
+            # 挖去中上部形成 U 形
+            if not (10 < x < 20 and y > 10):
+                points.append((x, y))
+        convex = convex_hull(points)
+        concave = concave_hull(points, concavity=2.0)
+        self.assertLess(area(concave), area(convex) * 0.9)
+        self.assertGreater(area(concave), 0)
+        for p in points:
+            self.assertTrue(covers(concave, p), p)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,72 @@
+# tests/test_indoor.py
+import unittest
+
+from algorithm.Graph import RoadGraph
+from app.services import map_service
+
+NODES = [
+    {"id": 0, "name": "大门", "type": "大门", "floor": "1L", "longitude": 116.0, "latitude": 39.0, "connected_edges": [0]},
+    {"id": 1, "name": "1L电梯", "type": "电梯", "floor": "1L", "longitude": 116.0001, "latitude": 39.0, "connected_edges": [0, 1]},
+    {"id": 2, "name": "B1电梯", "type": "电梯", "floor": "B1", "longitude": 116.0001, "latitude": 39.0, "connected_edges": [1, 2]},
+    {"id": 3, "name": "超市", "type": "生活服务场所", "floor": "B1", "longitude": 116.0002, "latitude": 39.0, "connected_edges": [2]},
+    {"id": 4, "name": "孤岛", "type": "厕所", "floor": "B1", "longitude": 116.0003, "latitude": 39.0, "connected_edges": []},
+]
+EDGES = [
+    {"id": 0, "start_node": 0, "end_node": 1, "distance": 8.6, "walk_speed": 1.0},
+    {"id": 1, "start_node": 1, "end_node": 2, "distance": 5.0, "walk_speed": 1.0},
+    {"id": 2, "start_node": 2, "end_node": 3, "distance": 8.6, "walk_speed": 1.0},
+]
+
+
+class TestIndoorNavigation(unittest.TestCase):
+    def setUp(self):
+        self.original = (map_service.indoor_graph, map_service.indoor_floors, map_service._latest_indoor_result)
+        map_service.indoor_graph = RoadGraph(NODES, EDGES)
+        map_service.indoor_floors = ["1L", "B1"]
+        map_service._latest_indoor_result = None
+
+    def tearDown(self):
+        map_service.indoor_graph, map_service.indoor_floors, map_service._latest_indoor_result = self.original
+
+    def test_segments_by_floor(self):
+        result = map_service.indoor_shortest_path("大门", "超市")
+        self.assertEqual(result["distance"], 22.2)
+        self.assertEqual([node["id"] for node in result["path"]], [0, 1, 2, 3])
+        self.assertEqual([(segment["floor"], [node["id"] for node in segment["path"]])
+                          for segment in result["segments"]], [("1L", [0, 1]), ("B1", [2, 3])])
+
+        path, distance = map_service.get_indoor_path("B1", result["id"])
+        self.assertEqual(([node["name"] for node in path], distance), (["B1电梯", "超市"], 22.2))
+        # 每次请求的结果互不覆盖，不带 id 时取最近一次的结果
+        other = map_service.indoor_shortest_path("超市", "1L电梯")
+        self.assertEqual(len(map_service.get_indoor_path("1L", result["id"])[0]), 2)
+        self.assertEqual(map_service.get_indoor_path("1L")[0], [NODES[1]])
+        self.assertNotEqual(other["id"], result["id"])
+
+    def test_errors(self):
+        for start, end in (("大门", "不存在"), ("大门", "孤岛")):
+            with self.assertRaises(ValueError):
+                map_service.indoor_shortest_path(start, end)
+        result = map_service.indoor_shortest_path("大门", "超市")
+        with self.assertRaises(ValueError):
+            map_service.get_indoor_path("3L", result["id"])
+        with self.assertRaises(ValueError):
+            map_service.get_indoor_path("1L", "unknown")
+
+    def test_result_expires(self):
+        original = map_service.INDOOR_RESULT_TTL
+        map_service.INDOOR_RESULT_TTL = -1
+        try:
+            result = map_service.indoor_shortest_path("大门", "超市")
+            with self.assertRaises(ValueError):
+                map_service.get_indoor_path("1L", result["id"])
+        finally:
+            map_service.INDOOR_RESULT_TTL = original
+
+    def test_floors_from_data(self):
+        map_service._load_indoor()
+        self.assertEqual(map_service.indoor_floors, ["1L", "2L", "3L"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,106 @@
+# tests/test_k_shortest.py
+import itertools
+import random
+import unittest
+
+from algorithm.Graph import RoadGraph, DISTANCE_MODE
+from algorithm.KShortest import k_shortest_paths
+from app.services import map_service
+
+# 菱形路网：A-B-D 与 A-C-D 两条路线，另有 B-C 相连
+NODES = [
+    {"id": 0, "name": "A", "type": "大门", "longitude": 116.0, "latitude": 39.0, "connected_edges": [0, 1]},
+    {"id": 1, "name": "B", "type": "路口", "longitude": 116.001, "latitude": 39.001, "connected_edges": [0, 2, 4]},
+    {"id": 2, "name": "C", "type": "路口", "longitude": 116.001, "latitude": 38.999, "connected_edges": [1, 3, 4]},
+    {"id": 3, "name": "D", "type": "食堂", "longitude": 116.002, "latitude": 39.0, "connected_edges": [2, 3]},
+]
+EDGES = [
+    {"id": 0, "start_node": 0, "end_node": 1, "distance": 100.0, "walk_speed": 1.0, "bike_speed": 3.0, "ebike_speed": 0.0},
+    {"id": 1, "start_node": 0, "end_node": 2, "distance": 120.0, "walk_speed": 1.0, "bike_speed": 0.0, "ebike_speed": 0.0},
+    {"id": 2, "start_node": 1, "end_node": 3, "distance": 100.0, "walk_speed": 1.0, "bike_speed": 3.0, "ebike_speed": 0.0},
+    {"id": 3, "start_node": 2, "end_node": 3, "distance": 120.0, "walk_speed": 1.0, "bike_speed": 0.0, "ebike_speed": 0.0},
+    {"id": 4, "start_node": 1, "end_node": 2, "distance": 30.0, "walk_speed": 1.0, "bike_speed": 0.0, "ebike_speed": 0.0},
+]
+
+
+def random_graph(seed, n=8, m=16):
+    rng = random.Random(seed)
+    graph = {i: [] for i in range(n)}
+    for _ in range(m):
+        u, v = rng.sample(range(n), 2)
+        weight = float(rng.randint(1, 9))
+        graph[u].append((v, weight, "walk"))
+        graph[v].append((u, weight, "walk"))
+    return graph
+
+
+def brute_force(graph, start, end):
+    """枚举所有简单路径（按节点序列去重），返回升序代价列表"""
+    costs = {}
+
+    def walk(node, path, total):
+        if node == end:
+            costs[tuple(path)] = min(costs.get(tuple(path), float('inf')), total)
+            return
+        for neighbor, weight, _ in graph[node]:
+            if neighbor not in path:
+                walk(neighbor, path + [neighbor], total + weight)
+
+    walk(start, [start], 0.0)
+    return sorted(costs.values())
+
+
+class TestKShortestPaths(unittest.TestCase):
+    def test_matches_brute_force(self):
+        for slack in (0.0, 0.1, 10.0):
+            for seed in range(20):
+                graph = random_graph(seed)
+                for start, end in itertools.permutations(range(4), 2):
+                    routes = k_shortest_paths(start, end, graph, 6, max_candidates=100, tree_slack=slack)
+                    self.assertEqual([cost for _, cost, _ in routes], brute_force(graph, start, end)[:6])
+                    for path, _, path_mode in routes:
+                        self.assertEqual((path[0], path[-1]), (start, end))
+                        self.assertEqual(len(set(path)), len(path))
+                        self.assertEqual(len(path_mode), len(path) - 1)
+
+    def test_overlap_filter(self):
+        road = RoadGraph(NODES, EDGES)
+        graph = road.adjacency(DISTANCE_MODE)
+        routes = k_shortest_paths(0, 3, graph, 4)
+        self.assertEqual([cost for _, cost, _ in routes], [200.0, 240.0, 250.0, 250.0])
+        self.assertEqual({tuple(path) for path, _, _ in routes[2:]}, {(0, 1, 2, 3), (0, 2, 1, 3)})
+        # A-C-B-D 与 A-B-C-D 和最短路共享 100 米，超过 30% 的重叠上限
+        stats = {}
+        routes = k_shortest_paths(0, 3, graph, 4, max_overlap=0.3, stats=stats)
+        self.assertEqual([(path, cost) for path, cost, _ in routes], [([0, 1, 3], 200.0), ([0, 2, 3], 240.0)])
+        self.assertEqual(stats["candidates"], 4)
+        self.assertEqual(k_shortest_paths(0, 3, {0: [], 3: []}, 3), [])
+        self.assertEqual(k_shortest_paths(0, 0, graph, 3), [([0], 0.0, [])])
+
+
+class TestAlternativeRoutes(unittest.TestCase):
+    def setUp(self):
+        self.original_graph = map_service.road_graph
+        map_service.road_graph = RoadGraph(list(NODES), list(EDGES), version=19)
+        map_service.route_cache.clear()
+
+    def tearDown(self):
+        map_service.road_graph = self.original_graph
+
+    def test_routes(self):
+        routes = map_service.alternative_routes("A", "D", DISTANCE_MODE, 3, 0.3)
+        self.assertEqual([route["distance"] for route in routes], [200.0, 240.0])
+        self.assertEqual([node["name"] for node in routes[1]["path"]], ["A", "C", "D"])
+        self.assertIsNone(routes[0]["time"])
+        self.assertIs(map_service.alternative_routes("A", "D", DISTANCE_MODE, 3, 0.3), routes)
+        # 骑行只能走 A-B-D
+        routes = map_service.alternative_routes("A", "D", "walk_bike", 3, 1.0)
+        self.assertEqual(routes[0]["path_mode"], ["bike", "bike"])
+        self.assertGreater(routes[0]["time"], 0)
+        for bad in (("A", "不存在"), ("A", "D", "car"), ("A", "D", DISTANCE_MODE, 0), ("A", "D", DISTANCE_MODE, 3, 2.0)):
+            with self.assertRaises(ValueError):
+                map_service.alternative_routes(*bad)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,42 @@
+# tests/test_lru_cache.py
+import unittest
+
+from algorithm.LRUCache import LRUCache
+
+
+class TestLRUCache(unittest.TestCase):
+    def test_eviction_order(self):
+        cache = LRUCache(2)
+        cache.put("a", 1)
+        cache.put("b", 2)
+        # 访问 a 后 b 成为最久未使用
+        self.assertEqual(cache.get("a"), 1)
+        cache.put("c", 3)
+        self.assertNotIn("b", cache)
+        self.assertIn("a", cache)
+        self.assertIn("c", cache)
+        self.assertEqual(len(cache), 2)
+
+    def test_counters(self):
+        cache = LRUCache(1)
+        self.assertIsNone(cache.get("x"))
+        cache.put("x", 1)
+        cache.put("x", 2)
+        self.assertEqual(cache.get("x"), 2)
+        cache.put("y", 3)
+        stats = cache.stats()
+        self.assertEqual((stats["hits"], stats["misses"], stats["evictions"]), (1, 1, 1))
+        self.assertEqual(stats["hit_rate"], 0.5)
+
+        cache.clear()
+        self.assertEqual(len(cache), 0)
+        self.assertIsNone(cache.get("y"))
+        self.assertEqual(cache.stats()["misses"], 2)
+
+    def test_invalid_capacity(self):
+        with self.assertRaises(ValueError):
+            LRUCache(0)
+
+
+if __name__ == "__main__":
+    unittest.main()
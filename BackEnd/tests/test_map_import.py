@@ -0,0 +1,88 @@
+# tests/test_map_import.py
+import io
+import unittest
+
+from algorithm.Graph import RoadGraph
+from algorithm.EditLog import EditIndex
+from algorithm.Geo import haversine
+from utils.map_import import MapImporter, iter_csv, iter_geojson, NODE_COLUMNS, EDGE_COLUMNS
+
+NODES = [
+    {"id": 0, "name": "A", "type": "大门", "popularity": 10, "longitude": 116.0, "latitude": 39.0, "connected_edges": []},
+]
+
+
+def importer():
+    road = RoadGraph(list(NODES), [])
+    return MapImporter(road, EditIndex(road.nodes, road.edges))
+
+
+class TestParsers(unittest.TestCase):
+    def test_csv_with_and_without_header(self):
+        rows = list(iter_csv(io.StringIO("1,B,116.001,39.0,路口\n\n2,C,116.002,39.0,食堂,5\n"), NODE_COLUMNS))
+        self.assertEqual([line for line, _ in rows], [1, 3])
+        self.assertEqual(rows[1][1]["popularity"], "5")
+        rows = list(iter_csv(io.StringIO("id,end_node,start_node\n7,1,2\n"), EDGE_COLUMNS))
+        self.assertEqual(rows, [(2, {"id": "7", "end_node": "1", "start_node": "2"})])
+
+    def test_geojson(self):
+        nodes, edges = iter_geojson({"type": "FeatureCollection", "features": [
+            {"type": "Feature", "geometry": {"type": "LineString", "coordinates": [[116.0, 39.0], [116.001, 39.0]]},
+             "properties": {}},
+            {"type": "Feature", "geometry": {"type": "Point", "coordinates": [116.001, 39.0]},
+             "properties": {"name": "B"}},
+        ]})
+        self.assertEqual(list(nodes), [(2, {"name": "B", "longitude": 116.001, "latitude": 39.0})])
+        (number, fields), = edges
+        self.assertEqual((number, fields["start_coordinate"]), (1, [116.0, 39.0]))
+
+
+class TestMapImporter(unittest.TestCase):
+    def test_valid_batch(self):
+        batch = importer()
+        batch.add_nodes([(1, {"name": "B", "longitude": "116.001", "latitude": "39.0"}),
+                         (2, {"id": "5", "name": "C", "longitude": "116.002", "latitude": "39.0", "type": "食堂"})])
+        batch.add_edges([(1, {"start_node": "0", "end_node": "1"}),
+                         (2, {"start_coordinate": [116.001, 39.0], "end_coordinate": [116.002, 39.0],
+                              "walk_speed": "1.5"})])
+        nodes, edges = batch.finish()
+        self.assertEqual(batch.errors, [])
+        self.assertEqual([(node["id"], node["type"], node["popularity"]) for node in nodes],
+                         [(1, "default", 100), (5, "食堂", 100)])
+        self.assertEqual([(edge["id"], edge["start_node"], edge["end_node"]) for edge in edges], [(0, 0, 1), (1, 1, 5)])
+        self.assertEqual(edges[0]["distance"], round(haversine(39.0, 116.0, 39.0, 116.001), 2))
+        self.assertEqual((edges[1]["walk_speed"], edges[1]["bike_speed"]), (1.5, 3.0))
+
+    def test_invalid_rows_are_reported(self):
+        batch = importer()
+        batch.add_nodes([(1, {"id": "0", "name": "重复编号", "longitude": "116", "latitude": "39"}),
+                         (2, {"name": "A", "longitude": "116", "latitude": "39"}),
+                         (3, {"name": "坐标错误", "longitude": "abc", "latitude": "39"}),
+                         (4, {"name": "超出范围", "longitude": "200", "latitude": "39"}),
+                         (5, {"name": "B", "longitude": "116.001", "latitude": "39"})])
+        batch.add_edges([(1, {"start_node": "0", "end_node": "9"}),
+                         (2, {"start_node": "1", "end_node": "1"}),
+                         (3, {"start_node": "0", "end_node": "1"}),
+                         (4, {"start_node": "1", "end_node": "0"}),
+                         (5, {"start_coordinate": [1.0, 1.0], "end_node": "0"})])
+        self.assertEqual([(e["source"], e["line"]) for e in batch.errors],
+                         [("nodes", 1), ("nodes", 2), ("nodes", 3), ("nodes", 4),
+                          ("edges", 1), ("edges", 2), ("edges", 4), ("edges", 5)])
+        self.assertEqual((len(batch.nodes), len(batch.edges)), (1, 1))
+
+    def test_non_finite_values_are_rejected(self):
+        batch = importer()
+        batch.add_nodes([(1, {"name": "经度 NaN", "longitude": "nan", "latitude": "39"}),
+                         (2, {"name": "纬度 inf", "longitude": "116", "latitude": "inf"}),
+                         (3, {"name": "B", "longitude": "116.001", "latitude": "39"})])
+        batch.add_edges([(1, {"start_node": "0", "end_node": "1", "walk_speed": "nan"}),
+                         (2, {"start_node": "0", "end_node": "1", "bike_speed": "inf"}),
+                         (3, {"start_node": "0", "end_node": "1", "ebike_speed": "-inf"})])
+        self.assertEqual([(e["source"], e["line"]) for e in batch.errors],
+                         [("nodes", 1), ("nodes", 2), ("edges", 1), ("edges", 2), ("edges", 3)])
+        self.assertTrue(all("有限数" in e["reason"] for e in batch.errors))
+        self.assertEqual((len(batch.nodes), len(batch.edges)), (1, 0))
+
+
+if __name__ == "__main__":
+    unittest.main()
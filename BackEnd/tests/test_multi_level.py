@@ -0,0 +1,115 @@
+# tests/test_multi_level.py
+import unittest
+
+from algorithm.Graph import RoadGraph
+from algorithm.MultiLevel import IndoorBuilding, MultiLevelRouter, OUTDOOR, TRANSFER_COSTS
+from app.services import map_service
+
+# 室外：北门(0) - 路口(1) - 楼前(2)，另有一个楼侧(3) 直接连路口
+OUTDOOR_NODES = [
+    {"id": 0, "name": "北门", "type": "大门", "longitude": 116.0, "latitude": 39.0, "connected_edges": [0]},
+    {"id": 1, "name": "路口", "type": "路口", "longitude": 116.001, "latitude": 39.0, "connected_edges": [0, 1, 2]},
+    {"id": 2, "name": "楼前", "type": "路口", "longitude": 116.002, "latitude": 39.0, "connected_edges": [1]},
+    {"id": 3, "name": "楼侧", "type": "路口", "longitude": 116.001, "latitude": 39.001, "connected_edges": [2]},
+]
+OUTDOOR_EDGES = [
+    {"id": 0, "start_node": 0, "end_node": 1, "distance": 100.0, "walk_speed": 1.0},
+    {"id": 1, "start_node": 1, "end_node": 2, "distance": 100.0, "walk_speed": 1.0},
+    {"id": 2, "start_node": 1, "end_node": 3, "distance": 100.0, "walk_speed": 1.0},
+]
+# 教学楼：一层大厅(10)、一层侧门(11)、电梯(12/13)、二层教室(14)
+INDOOR_NODES = [
+    {"id": 10, "name": "大厅", "type": "大门", "floor": "1F", "building": "教一", "longitude": 116.002, "latitude": 39.0001},
+    {"id": 11, "name": "侧门", "type": "大门", "floor": "1F", "building": "教一", "longitude": 116.001, "latitude": 39.0011},
+    {"id": 12, "name": "1F电梯", "type": "电梯", "floor": "1F", "building": "教一", "longitude": 116.0015, "latitude": 39.0005},
+    {"id": 13, "name": "2F电梯", "type": "电梯", "floor": "2F", "building": "教一", "longitude": 116.0015, "latitude": 39.0005},
+    {"id": 14, "name": "201教室", "type": "教室", "floor": "2F", "building": "教一", "longitude": 116.0016, "latitude": 39.0005},
+]
+INDOOR_EDGES = [
+    {"id": 10, "start_node": 10, "end_node": 12, "distance": 60.0},
+    {"id": 11, "start_node": 11, "end_node": 12, "distance": 10.0},
+    {"id": 12, "start_node": 12, "end_node": 13, "distance": 0.0},
+    {"id": 13, "start_node": 13, "end_node": 14, "distance": 8.0},
+]
+ELEVATOR = sum(TRANSFER_COSTS["电梯"])
+
+
+class TestIndoorBuilding(unittest.TestCase):
+    def test_transfer_cost(self):
+        building = IndoorBuilding("教一", INDOOR_NODES, INDOOR_EDGES)
+        self.assertEqual(building.floors, ["1F", "2F"])
+        self.assertIn((13, ELEVATOR, "电梯"), building.adjacency[12])
+        dist, _ = building.tree(11, {14})
+        self.assertEqual(dist[14], 18.0 + ELEVATOR)
+        self.assertEqual(building.path_distance([11, 12, 13, 14]), 18.0)
+
+
+class TestMultiLevelRouter(unittest.TestCase):
+    def setUp(self):
+        self.building = IndoorBuilding("教一", INDOOR_NODES, INDOOR_EDGES)
+        self.outdoor = RoadGraph(OUTDOOR_NODES, OUTDOOR_EDGES)
+        self.calls = []
+
+    def costs(self, sources, targets):
+        self.calls.append((sorted(sources), sorted(targets)))
+        table = {(0, 2): 200.0, (0, 3): 200.0, (0, 0): 0.0, (2, 3): 200.0, (3, 2): 200.0, (2, 2): 0.0, (3, 3): 0.0}
+        return {(a, b): table[(a, b)] for a in sources for b in targets if (a, b) in table}
+
+    def path(self, a, b):
+        paths = {(0, 2): [0, 1, 2], (0, 3): [0, 1, 3]}
+        return paths[(a, b)], 200.0
+
+    def test_outdoor_to_classroom(self):
+        router = MultiLevelRouter({"教一": self.building}, [("教一", 10, 2, 5.0), ("教一", 11, 3, 5.0)])
+        cost, legs = router.route((OUTDOOR, 0), ("教一", 14), self.costs, self.path)
+        # 侧门更近：200 + 5 + 10 + 电梯 + 8
+        self.assertEqual(cost, 223.0 + ELEVATOR)
+        self.assertEqual([(leg["level"], leg["path"]) for leg in legs],
+                         [(OUTDOOR, [0, 1, 3]), ("教一", [11, 12, 13, 14])])
+        self.assertEqual((legs[1]["link"], legs[1]["cost"]), (5.0, 18.0 + ELEVATOR))
+        # 室外只在起点与两个入口对应的室外节点之间计算
+        self.assertEqual(self.calls, [([0], [2, 3])])
+
+    def test_same_building_prefers_indoor(self):
+        router = MultiLevelRouter({"教一": self.building}, [("教一", 10, 2, 5.0), ("教一", 11, 3, 5.0)])
+        cost, legs = router.route(("教一", 10), ("教一", 11), self.costs, self.path)
+        self.assertEqual(cost, 70.0)
+        self.assertEqual([leg["path"] for leg in legs], [[10, 12, 11]])
+
+    def test_unreachable(self):
+        router = MultiLevelRouter({"教一": self.building}, [])
+        self.assertEqual(router.route((OUTDOOR, 0), ("教一", 14), self.costs, self.path), (float('inf'), []))
+
+
+class TestUnifiedService(unittest.TestCase):
+    def setUp(self):
+        self.original = (map_service.road_graph, map_service.indoor_buildings, map_service.multi_level_router)
+        map_service.road_graph = RoadGraph(OUTDOOR_NODES, OUTDOOR_EDGES, version=21)
+        map_service.route_cache.clear()
+        map_service.multi_level_router = map_service._build_multi_level(
+            INDOOR_NODES, INDOOR_EDGES, [{"indoor": 10, "outdoor": 2}, {"indoor": 11, "outdoor": 3, "distance": 5.0}])
+
+    def tearDown(self):
+        map_service.road_graph, map_service.indoor_buildings, map_service.multi_level_router = self.original
+
+    def test_route_and_segments(self):
+        result = map_service.unified_shortest_path("北门", "201教室")
+        self.assertEqual([node["id"] for node in result["path"]], [0, 1, 3, 11, 12, 13, 14])
+        self.assertEqual(result["distance"], 223.0)
+        self.assertEqual(result["cost"], 223.0 + ELEVATOR)
+        self.assertEqual([(s["level"], s["floor"], len(s["path"])) for s in result["segments"]],
+                         [(OUTDOOR, None, 3), ("教一", "1F", 2), ("教一", "2F", 2)])
+        self.assertEqual(result["path"][3]["level"], "教一")
+
+        # 反向
+        result = map_service.unified_shortest_path("201教室", "北门")
+        self.assertEqual([node["id"] for node in result["path"]], [14, 13, 12, 11, 3, 1, 0])
+        # 纯室外
+        result = map_service.unified_shortest_path("北门", "楼前")
+        self.assertEqual((result["distance"], len(result["segments"])), (200.0, 1))
+        with self.assertRaises(ValueError):
+            map_service.unified_shortest_path("北门", "201教室", end_building=OUTDOOR)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,49 @@
+# tests/test_name_index.py
+import unittest
+
+from algorithm.NameIndex import NameIndex
+
+NODES = [
+    {"id": 0, "name": "北门", "popularity": 50},
+    {"id": 1, "name": "东门", "popularity": 90},
+    {"id": 2, "name": "图书馆", "popularity": 80},
+    {"id": 3, "name": "图书馆东门", "popularity": 10},
+    {"id": 4, "name": "北门", "popularity": 70},
+    {"id": 5, "name": "学生食堂", "popularity": 30},
+    {"id": 6, "name": "", "popularity": 100},
+]
+
+
+class TestNameIndex(unittest.TestCase):
+    def setUp(self):
+        self.index = NameIndex(NODES, limit=3)
+
+    def test_prefix_top_by_popularity(self):
+        self.assertEqual(self.index.prefix("图"), ["图书馆", "图书馆东门"])
+        self.assertEqual(self.index.prefix("图书馆东"), ["图书馆东门"])
+        self.assertEqual(self.index.prefix("南"), [])
+        # 空前缀返回热度最高的名称，重名只保留一次（取最高热度）
+        self.assertEqual(self.index.prefix(""), ["东门", "图书馆", "北门"])
+
+    def test_substring_search(self):
+        # 前缀匹配优先，其余按热度降序
+        self.assertEqual(self.index.search("东"), ["东门", "图书馆东门"])
+        self.assertEqual(self.index.search("门"), ["东门", "北门", "图书馆东门"])
+        self.assertEqual(self.index.search("食堂"), ["学生食堂"])
+        self.assertEqual(self.index.search("馆东门"), ["图书馆东门"])
+        self.assertEqual(self.index.search("门东"), [])
+        self.assertEqual(self.index.search("门", limit=1), ["东门"])
+
+    def test_matches_linear_scan(self):
+        nodes = [{"id": i, "name": f"地点{i % 37}号楼{i % 5}", "popularity": (i * 7919) % 101}
+                 for i in range(500)]
+        index = NameIndex(nodes, limit=10)
+        for query in ("地点1", "号楼3", "3号", "7", "楼"):
+            expected = {node["name"] for node in nodes if query in node["name"]}
+            result = index.search(query, limit=1000)
+            self.assertEqual(set(result), expected)
+            self.assertEqual(len(result), len(expected))
+
+
+if __name__ == "__main__":
+    unittest.main()
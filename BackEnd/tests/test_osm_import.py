@@ -0,0 +1,171 @@
+# tests/test_osm_import.py
+import os
+import tempfile
+import unittest
+from xml.sax.saxutils import quoteattr
+
+import numpy as np
+
+from algorithm.Geo import haversine
+from algorithm.Graph import RoadGraph, DISTANCE_MODE
+from algorithm.ShortestPath import shortest_path_tree
+from utils import osm_import
+from utils.osm_import import OsmGraphBuilder, way_speeds
+
+# OSM 节点ID -> (经度, 纬度)；15 位于裁剪范围外，没有坐标
+LOCATIONS = {
+    1: (116.0, 39.0), 2: (116.001, 39.0), 3: (116.002, 39.0), 4: (116.003, 39.0), 5: (116.004, 39.0),
+    6: (116.005, 39.0), 7: (116.006, 39.0), 8: (116.0065, 39.0005), 9: (116.006, 39.001),
+    10: (116.002, 39.001), 11: (116.002, 39.002), 12: (116.002, 38.999), 13: (116.003, 38.9995),
+    14: (116.003, 39.002), 20: (116.01, 39.0), 21: (116.011, 39.0),
+}
+WAYS = [
+    ({"highway": "residential", "name": "学院路"}, [1, 2, 3, 4, 5]),
+    ({"highway": "footway"}, [3, 10, 11]),
+    # 5 只连接两条 way，链经过 5 继续
+    ({"highway": "cycleway", "name": "绿道"}, [5, 6, 7]),
+    # 在 7 处挂接的环
+    ({"highway": "service"}, [7, 8, 9, 7]),
+    # 与学院路 3-4-5 平行
+    ({"highway": "track"}, [3, 12, 13, 5]),
+    ({"highway": "residential"}, [11, 14, 15]),
+    ({"highway": "motorway"}, [1, 20, 21]),
+    ({"highway": "footway", "foot": "no"}, [5, 20]),
+]
+# 只出现在 .osm 文件中、读取时应被忽略的 way：不是道路
+OTHER_WAYS = [
+    ({"building": "yes", "name": "图书馆"}, [2, 10, 11, 2]),
+]
+
+
+def write_osm(path, ways):
+    """把 LOCATIONS 与 ways 写成 OSM XML（节点在前、way 在后，15 不写出，模拟裁剪）"""
+    lines = ['<?xml version="1.0" encoding="UTF-8"?>', '<osm version="0.6" generator="test">']
+    for osm_id, (lon, lat) in sorted(LOCATIONS.items()):
+        lines.append(f'  <node id="{osm_id}" version="1" lat="{lat}" lon="{lon}"/>')
+    for way_id, (tags, refs) in enumerate(ways, start=100):
+        lines.append(f'  <way id="{way_id}" version="1">')
+        lines.extend(f'    <nd ref="{ref}"/>' for ref in refs)
+        lines.extend(f'    <tag k={quoteattr(k)} v={quoteattr(v)}/>' for k, v in tags.items())
+        lines.append('  </way>')
+    lines.append('</osm>')
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("\n".join(lines) + "\n")
+
+
+def raw_graph():
+    """未收缩的路网：每个 OSM 节点都是路网节点，每段都是一条边"""
+    nodes = [{"id": osm_id, "name": "", "longitude": lon, "latitude": lat} for osm_id, (lon, lat) in LOCATIONS.items()]
+    edges = []
+    for tags, refs in WAYS:
+        speeds = way_speeds(tags)
+        if speeds is None:
+            continue
+        for a, b in zip(refs, refs[1:]):
+            if a in LOCATIONS and b in LOCATIONS:
+                (lon1, lat1), (lon2, lat2) = LOCATIONS[a], LOCATIONS[b]
+                edges.append({"id": len(edges), "start_node": a, "end_node": b,
+                              "distance": haversine(lat1, lon1, lat2, lon2), "walk_speed": speeds[0],
+                              "bike_speed": speeds[1], "ebike_speed": speeds[2]})
+    return RoadGraph(nodes, edges)
+
+
+class TestWaySpeeds(unittest.TestCase):
+    def test_tags(self):
+        self.assertEqual(way_speeds({"highway": "residential"}), (1.0, 3.0, 5.0))
+        self.assertEqual(way_speeds({"highway": "footway"}), (1.0, 0.0, 0.0))
+        self.assertEqual(way_speeds({"highway": "footway", "bicycle": "designated"}),
+                         (1.0, osm_import.ALLOWED_BIKE_SPEED, 0.0))
+        self.assertEqual(way_speeds({"highway": "cycleway", "bicycle": "dismount"}), (1.0, 0.0, 0.0))
+        self.assertEqual(way_speeds({"highway": "service", "access": "private", "foot": "yes"}), (1.0, 0.0, 0.0))
+        for tags in ({"highway": "motorway"}, {"building": "yes"}, {"highway": "pedestrian", "area": "yes"},
+                     {"highway": "steps", "foot": "no"}):
+            self.assertIsNone(way_speeds(tags))
+
+
+def build_directly():
+    """不经过 osmium，直接把 WAYS 交给 OsmGraphBuilder"""
+    builder = OsmGraphBuilder()
+    for tags, refs in WAYS:
+        builder.count_way(tags, refs)
+    builder.finish_counting()
+    for tags, refs in WAYS:
+        builder.add_way(tags, [(ref, *LOCATIONS[ref]) if ref in LOCATIONS else None for ref in refs])
+    return builder.build()
+
+
+class TestOsmGraphBuilder(unittest.TestCase):
+    def setUp(self):
+        self.nodes, self.edges = build_directly()
+        self.road = RoadGraph(self.nodes, self.edges)
+        self.osm_id = {node["id"]: node["osm_id"] for node in self.nodes}
+
+    def test_chains_are_contracted(self):
+        # 保留路口、尽头与拆环/拆平行边的节点，其余度为 2 的节点被收缩
+        kept = sorted(self.osm_id.values())
+        self.assertEqual(kept, [1, 3, 5, 7, 8, 9, 12, 14])
+        pairs = [tuple(sorted((self.osm_id[e["start_node"]], self.osm_id[e["end_node"]]))) for e in self.edges]
+        self.assertEqual(len(pairs), len(set(pairs)))
+        self.assertTrue(all(a != b for a, b in pairs))
+        self.assertIn((5, 7), pairs)
+        self.assertEqual(self.nodes[kept.index(3)]["name"], "学院路")
+        self.assertEqual(self.nodes[kept.index(5)]["name"], "学院路/绿道")
+        for node in self.nodes:
+            self.assertEqual(sorted(node["connected_edges"]),
+                             [e["id"] for e in self.edges if node["id"] in (e["start_node"], e["end_node"])])
+
+    def test_costs_are_preserved(self):
+        raw = raw_graph()
+        self.assertAlmostEqual(sum(e["distance"] for e in self.edges), float(raw.edge_distance.sum()), places=1)
+        for mode in (DISTANCE_MODE, "walk", "bike", "ebike"):
+            contracted_graph = self.road.adjacency(mode, np.ones(self.road.edge_count))
+            raw_adjacency = raw.adjacency(mode, np.ones(raw.edge_count))
+            for source in self.road.node_ids.tolist():
+                dist, _ = shortest_path_tree(source, contracted_graph, set(contracted_graph))
+                expected, _ = shortest_path_tree(self.osm_id[source], raw_adjacency, set(raw_adjacency))
+                for node_id, cost in dist.items():
+                    self.assertAlmostEqual(cost, expected[self.osm_id[node_id]], delta=0.05)
+                self.assertEqual(len(dist), len([n for n in expected if n in self.osm_id.values()]))
+
+    def test_import_requires_osmium(self):
+        if osm_import.osmium is not None:
+            self.skipTest("已安装 osmium")
+        with self.assertRaises(RuntimeError):
+            osm_import.import_osm("missing.osm.pbf")
+
+
+@unittest.skipUnless(osm_import.osmium is not None, "未安装 osmium")
+class TestImportOsm(unittest.TestCase):
+    """经 osmium 读取 .osm 文件：way 的节点坐标由 osmium 补全，非道路的 way 被过滤"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.temp_dir.name, "campus.osm")
+        write_osm(self.path, WAYS + OTHER_WAYS)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_matches_builder(self):
+        nodes, edges = osm_import.import_osm(self.path)
+        expected_nodes, expected_edges = build_directly()
+        self.assertEqual(edges, expected_edges)
+        self.assertEqual([node["osm_id"] for node in nodes], [1, 3, 5, 7, 8, 9, 12, 14])
+        for node, expected in zip(nodes, expected_nodes):
+            self.assertEqual(node["connected_edges"], expected["connected_edges"])
+            self.assertEqual(node["name"], expected["name"])
+            self.assertAlmostEqual(node["longitude"], expected["longitude"], places=6)
+            self.assertAlmostEqual(node["latitude"], expected["latitude"], places=6)
+
+    def test_tags_are_filtered(self):
+        # motorway、foot=no 的 footway 与 building 都不导入：20、21 不出现，也不影响 5 是否被保留
+        nodes, _ = osm_import.import_osm(self.path)
+        osm_ids = {node["osm_id"] for node in nodes}
+        self.assertFalse(osm_ids & {20, 21})
+        only_building = os.path.join(self.temp_dir.name, "building.osm")
+        write_osm(only_building, OTHER_WAYS)
+        self.assertEqual(osm_import.import_osm(only_building), ([], []))
+
+
+if __name__ == "__main__":
+    unittest.main()
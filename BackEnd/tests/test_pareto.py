@@ -0,0 +1,110 @@
+# tests/test_pareto.py
+import itertools
+import random
+import unittest
+
+from algorithm.Graph import RoadGraph
+from algorithm.Pareto import pareto_paths
+from app.services import map_service
+
+NODES = [
+    {"id": 0, "name": "A", "type": "大门", "longitude": 116.0, "latitude": 39.0, "connected_edges": [0]},
+    {"id": 1, "name": "B", "type": "路口", "longitude": 116.001, "latitude": 39.0, "connected_edges": [0, 1]},
+    {"id": 2, "name": "C", "type": "食堂", "longitude": 116.002, "latitude": 39.0, "connected_edges": [1]},
+]
+EDGES = [
+    {"id": 0, "start_node": 0, "end_node": 1, "distance": 86.0, "walk_speed": 1.0, "bike_speed": 3.0, "ebike_speed": 0.0},
+    {"id": 1, "start_node": 1, "end_node": 2, "distance": 86.0, "walk_speed": 1.0, "bike_speed": 0.0, "ebike_speed": 5.0},
+]
+
+
+def random_graph(seed, n=7, m=14):
+    rng = random.Random(seed)
+    graph = {i: [] for i in range(n)}
+    for _ in range(m):
+        u, v = rng.sample(range(n), 2)
+        arc = (float(rng.randint(1, 9)), float(rng.randint(1, 9)))
+        graph[u].append((v, arc, "walk"))
+        graph[v].append((u, arc, "walk"))
+    return graph
+
+
+def brute_force(graph, start, end):
+    """枚举所有简单路径，返回 Pareto 最优的代价向量集合"""
+    costs = set()
+
+    def walk(node, visited, total):
+        if node == end:
+            costs.add(total)
+            return
+        for neighbor, arc, _ in graph[node]:
+            if neighbor not in visited:
+                walk(neighbor, visited | {neighbor}, tuple(a + b for a, b in zip(total, arc)))
+
+    walk(start, {start}, (0.0, 0.0))
+    return {c for c in costs
+            if not any(o != c and all(x <= y for x, y in zip(o, c)) for o in costs)}
+
+
+class TestParetoPaths(unittest.TestCase):
+    def test_matches_brute_force(self):
+        for seed in range(20):
+            graph = random_graph(seed)
+            for start, end in itertools.permutations(range(4), 2):
+                routes = pareto_paths(start, end, graph, max_labels=64)
+                self.assertEqual({costs for costs, _, _ in routes}, brute_force(graph, start, end))
+                for costs, path, path_mode in routes:
+                    self.assertEqual((path[0], path[-1]), (start, end))
+                    self.assertEqual(len(path_mode), len(path) - 1)
+
+    def test_lower_bound_keeps_front(self):
+        graph = random_graph(3)
+        # 取各目标上的单目标最短距离作为下界（一致）
+        bounds = {}
+        for k in range(2):
+            single = {u: [(v, (arc[k],), mode) for v, arc, mode in arcs] for u, arcs in graph.items()}
+            for node in graph:
+                routes = pareto_paths(node, 0, single)
+                bounds.setdefault(node, []).append(routes[0][0][0] if routes else float('inf'))
+        for start in range(1, 7):
+            plain, pruned = {}, {}
+            expected = pareto_paths(start, 0, graph, max_labels=64, stats=plain)
+            routes = pareto_paths(start, 0, graph, max_labels=64, lower_bound=lambda node: bounds[node], stats=pruned)
+            self.assertEqual([costs for costs, _, _ in routes], [costs for costs, _, _ in expected])
+            self.assertLessEqual(pruned["labels"], plain["labels"])
+
+    def test_epsilon_and_label_limit(self):
+        # 0 -> 1 的三条平行路线互不支配
+        graph = {0: [(1, (10.0, 30.0), "a"), (1, (20.0, 20.0), "b"), (1, (21.0, 19.0), "c")], 1: []}
+        self.assertEqual(len(pareto_paths(0, 1, graph)), 3)
+        # (20, 20) 以 10% 的松弛支配 (21, 19)
+        self.assertEqual([modes for _, _, modes in pareto_paths(0, 1, graph, epsilon=0.1)], [["a"], ["b"]])
+        self.assertEqual(len(pareto_paths(0, 1, graph, max_labels=1)), 1)
+        self.assertEqual(pareto_paths(0, 1, {0: [], 1: []}), [])
+
+
+class TestParetoRoutes(unittest.TestCase):
+    def setUp(self):
+        self.original_graph = map_service.road_graph
+        map_service.road_graph = RoadGraph(list(NODES), list(EDGES), version=17)
+        map_service.route_cache.clear()
+
+    def tearDown(self):
+        map_service.road_graph = self.original_graph
+
+    def test_routes(self):
+        routes = map_service.pareto_routes("A", "C", "walk_ebike")
+        route, = routes
+        self.assertEqual([node["id"] for node in route["path"]], [0, 1, 2])
+        # B-C 段电动车比步行快且距离相同，步行方案被支配
+        self.assertEqual(route["path_mode"], ["walk", "ebike"])
+        self.assertEqual(route["distance"], 172.0)
+        self.assertGreaterEqual(route["time"], 86.0 + 86.0 / 5.0)
+        self.assertIs(map_service.pareto_routes("A", "C", "walk_ebike"), routes)
+        for bad in (("A", "不存在", "walk"), ("A", "C", "car"), ("A", "C", "walk", -1.0)):
+            with self.assertRaises(ValueError):
+                map_service.pareto_routes(*bad)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,458 @@
+# tests/test_road_graph.py
+import os
+import gzip
+import json
+import tempfile
+import unittest
+from unittest import mock
+
+import numpy as np
+from pydantic import ValidationError
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from algorithm.Graph import RoadGraph, DISTANCE_MODE
+from algorithm.Congestion import CongestionStore
+from algorithm.Geo import haversine
+from algorithm.EditLog import EditLog
+from algorithm.AllPairs import AllPairsShortestPaths
+from app.services import map_service
+from app.routers import map as map_router
+from app.routers.map import router
+from app.services.route_executor import RouteExecutor
+from app.models.map import NodeRequest, EdgeRequest, IsochroneRequest
+from utils.file_utils import read_json, write_json
+
+NODES = [
+    {"id": 0, "name": "A", "type": "大门", "popularity": 10, "longitude": 116.0, "latitude": 39.0, "connected_edges": [0]},
+    {"id": 1, "name": "B", "type": "路口", "popularity": 20, "longitude": 116.001, "latitude": 39.0, "connected_edges": [0, 1]},
+    {"id": 2, "name": "C", "type": "食堂", "popularity": 30, "longitude": 116.002, "latitude": 39.0, "connected_edges": [1]},
+]
+EDGES = [
+    {"id": 0, "start_node": 0, "end_node": 1, "distance": 86.0, "walk_speed": 1.0, "bike_speed": 3.0, "ebike_speed": 0.0},
+    {"id": 1, "start_node": 1, "end_node": 2, "distance": 86.0, "walk_speed": 1.0, "bike_speed": 0.0, "ebike_speed": 5.0},
+]
+
+
+class TestRoadGraph(unittest.TestCase):
+    def test_csr_adjacency(self):
+        road = RoadGraph(NODES, EDGES)
+        self.assertEqual(road.resolve("B"), 1)
+        self.assertEqual(road.resolve("不存在"), -1)
+        csr = road.csr[DISTANCE_MODE]
+        self.assertEqual(csr.offsets.tolist(), [0, 1, 3, 4])
+        # bike 模式只包含 bike_speed > 0 的边
+        self.assertEqual(road.csr["bike"].offsets.tolist(), [0, 1, 2, 2])
+
+        # 距离邻接表为无向图，每条边在两个端点各出现一次
+        actual = road.adjacency(DISTANCE_MODE)
+        expected = {0: [(1, 86.0)], 1: [(0, 86.0), (2, 86.0)], 2: [(1, 86.0)]}
+        self.assertEqual({node_id: sorted((v, w) for v, w, _ in neighbors) for node_id, neighbors in actual.items()},
+                         expected)
+
+    def test_time_adjacency_uses_crowd(self):
+        road = RoadGraph(NODES, EDGES)
+        graph = road.adjacency("walk_ebike", crowd=np.array([0.5, 1.0]))
+        self.assertIn((1, 172.0, "walk"), graph[0])
+        self.assertIn((2, 86.0 / 5.0, "ebike"), graph[1])
+        # 交通方式必须给出拥挤度；给出标识时按 (出行方式, 标识) 缓存
+        with self.assertRaises(ValueError):
+            road.adjacency("walk")
+        crowd = np.array([0.5, 1.0])
+        cached = road.adjacency("walk", crowd, (3, 0))
+        self.assertIs(road.adjacency("walk", crowd, (3, 0)), cached)
+        self.assertIsNot(road.adjacency("walk", crowd, (3, 1)), cached)
+        self.assertEqual(road.adjacency("walk", crowd), cached)
+
+
+class TestGraphVersion(unittest.TestCase):
+    def setUp(self):
+        self.temp_file = tempfile.NamedTemporaryFile(delete=False)
+        self.temp_file.close()
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.original_files = (map_service.MAP_FILE, map_service.APSP_FILE, map_service.MAP_BINARY_FILE)
+        self.original_graph = map_service.road_graph
+        self.original_store = map_service.congestion_store
+        self.original_all_pairs = map_service.all_pairs
+        self.original_log = (map_service.MAP_LOG_FILE, map_service.edit_log, map_service._edit_index)
+        self.original_history = list(map_service._edit_history)
+        map_service._edit_history.clear()
+        map_service.congestion_store = CongestionStore.simulate(len(EDGES))
+        map_service.MAP_FILE = self.temp_file.name
+        map_service.MAP_LOG_FILE = os.path.join(self.temp_dir.name, "map_edits.jsonl")
+        map_service.edit_log = EditLog(map_service.MAP_LOG_FILE)
+        map_service.APSP_FILE = os.path.join(self.temp_dir.name, "map_apsp.json")
+        map_service.MAP_BINARY_FILE = os.path.join(self.temp_dir.name, "map.bin")
+        map_service.road_graph = RoadGraph(list(NODES), list(EDGES), version=3)
+        map_service.build_all_pairs()
+        map_service.route_cache.clear()
+
+    def tearDown(self):
+        os.unlink(self.temp_file.name)
+        self.temp_dir.cleanup()
+        map_service.MAP_FILE, map_service.APSP_FILE, map_service.MAP_BINARY_FILE = self.original_files
+        map_service.road_graph = self.original_graph
+        map_service.congestion_store = self.original_store
+        map_service.all_pairs = self.original_all_pairs
+        map_service.MAP_LOG_FILE, map_service.edit_log, map_service._edit_index = self.original_log
+        map_service._edit_history.clear()
+        map_service._edit_history.extend(self.original_history)
+
+    def test_add_node_and_edge_bump_version(self):
+        old = map_service.get_graph()
+        self.assertEqual(map_service.search_places(116.0, 39.0, "大门", 5, 1000.0)[0].name, "A")
+        info = map_service.add_node(NodeRequest(name="D", type="景点", longitude=116.003, latitude=39.0))
+        self.assertTrue(info["success"])
+        self.assertEqual((info["node"]["id"], info["version"]), (3, 4))
+        self.assertEqual(map_service.get_graph().version, 4)
+        # 名称索引随版本重建
+        self.assertEqual(map_service.search_node("D"), ["D"])
+        # 场所索引增量插入新节点
+        places = map_service.search_places(116.003, 39.0, "景点", 5, 10.0)
+        self.assertEqual([place.id for place in places], [3])
+        # 旧快照不受影响
+        self.assertEqual(old.node_count, 3)
+
+        info = map_service.add_edge(EdgeRequest(start_node=2, end_node=3))
+        self.assertTrue(info["success"])
+        self.assertEqual((info["edge"]["id"], info["version"]), (2, 5))
+        road = map_service.get_graph()
+        self.assertEqual(road.version, 5)
+        self.assertEqual(road.node(3)["connected_edges"], [2])
+        self.assertEqual(old.node(2)["connected_edges"], [1])
+        # 全源矩阵随修改自动重建
+        # 全源矩阵随修改增量更新，与重新计算的结果一致；修改时不写矩阵文件
+        matrix = map_service.get_all_pairs(DISTANCE_MODE)
+        expected = AllPairsShortestPaths.build(road.node_count, road.edge_list(DISTANCE_MODE))
+        self.assertTrue(np.array_equal(matrix.dist, expected.dist))
+        self.assertFalse(os.path.exists(map_service.APSP_FILE))
+        # 交通方式不预处理，按拥挤度搜索
+        self.assertIsNone(map_service.get_all_pairs("walk"))
+        for engine in ("apsp", "astar"):
+            path, distance = map_service.one_to_one_shortest_path("A", "D", engine=engine)
+            self.assertEqual([node["id"] for node in path], [0, 1, 2, 3])
+
+        # 相同查询命中缓存，修改路网后不再命中
+        hits = map_service.route_cache.hits
+        first = map_service.one_to_one_shortest_time("A", "D", "walk")
+        self.assertIs(map_service.one_to_one_shortest_time("A", "D", "walk"), first)
+        self.assertEqual(map_service.route_cache.hits, hits + 1)
+        map_service.add_node(NodeRequest(name="E", longitude=116.004, latitude=39.0))
+        self.assertIsNot(map_service.one_to_one_shortest_time("A", "D", "walk"), first)
+        # 新增的边同步扩展拥挤度数组
+        self.assertEqual(map_service.congestion_store.edge_count, 3)
+
+        # 重复边被拒绝，版本不变
+        info = map_service.add_edge(EdgeRequest(start_node=3, end_node=2))
+        self.assertFalse(info["success"])
+        self.assertEqual(map_service.get_graph().version, 6)
+        self.assertEqual(len(map_service.edit_log), 3)
+
+    def test_failed_compaction_keeps_snapshot_and_log(self):
+        write_json(map_service.MAP_FILE, map_service.get_graph().to_dict())
+        map_service.add_node(NodeRequest(name="D", longitude=116.003, latitude=39.0))
+
+        def partial_dump(data, f, **kwargs):
+            f.write('{"version": 4, "nodes": [')
+            raise OSError("磁盘已满")
+
+        # 写入快照中途失败：旧快照完整，日志不清空，不留下临时文件
+        with mock.patch("utils.file_utils.json.dump", partial_dump):
+            with self.assertRaises(OSError):
+                map_service.compact_map()
+        self.assertEqual(read_json(map_service.MAP_FILE)["version"], 3)
+        self.assertEqual(len(map_service.edit_log), 1)
+        self.assertFalse(os.path.exists(map_service.MAP_FILE + ".tmp"))
+        map_service._load_graph()
+        self.assertEqual(map_service.get_graph().version, 4)
+
+        # 快照文件损坏时加载失败，不当作空路网
+        with open(map_service.MAP_FILE, "w", encoding="utf-8") as f:
+            f.write('{"version": 3, "nodes": [')
+        road = map_service.get_graph()
+        with self.assertRaises(ValueError):
+            map_service._load_graph()
+        self.assertIs(map_service.get_graph(), road)
+
+    def test_edits_are_logged_and_replayed(self):
+        write_json(map_service.MAP_FILE, map_service.get_graph().to_dict())
+        map_service.add_node(NodeRequest(name="D", longitude=116.003, latitude=39.0))
+        map_service.add_edge(EdgeRequest(start_node=2, end_node=3))
+        # 快照文件不被重写，修改只追加到日志
+        self.assertEqual(read_json(map_service.MAP_FILE)["version"], 3)
+        self.assertEqual([record["op"] for record in map_service.edit_log.read()], ["add_node", "add_edge"])
+
+        current = map_service.get_graph()
+        map_service._load_graph()
+        replayed = map_service.get_graph()
+        self.assertEqual(replayed.version, 5)
+        self.assertEqual(replayed.to_dict(), current.to_dict())
+        # 与启动时相同，重新加载路网后在内存中计算全源矩阵
+        map_service._load_all_pairs()
+
+        # 压缩后快照包含全部修改，日志清空，重新加载结果不变
+        self.assertEqual(map_service.compact_map(), {"version": 5})
+        self.assertEqual(len(map_service.edit_log), 0)
+        self.assertEqual(read_json(map_service.MAP_FILE)["version"], 5)
+        # 压缩时一并保存全源矩阵，版本与快照一致，重新加载时直接读取
+        self.assertEqual(read_json(map_service.APSP_FILE)["version"], 5)
+        map_service._load_graph()
+        self.assertEqual(map_service.get_graph().to_dict(), current.to_dict())
+        # 新分配的编号接着快照中的最大编号
+        info = map_service.add_edge(EdgeRequest(start_node=0, end_node=3))
+        self.assertEqual((info["edge"]["id"], info["version"]), (3, 6))
+
+    def test_binary_snapshot(self):
+        self.assertEqual(map_service.build_binary_map()["version"], 3)
+        map_service._load_graph()
+        loaded = map_service.get_graph()
+        self.assertIsInstance(loaded.edge_distance, np.memmap)
+        self.assertEqual(loaded.to_dict(), RoadGraph(list(NODES), list(EDGES), version=3).to_dict())
+        self.assertEqual(map_service.one_to_one_shortest_path("A", "C")[1], 172.0)
+
+        # 修改照常追加到日志并可重放，压缩时重写二进制文件而不是 map.json
+        map_service.add_node(NodeRequest(name="D", longitude=116.003, latitude=39.0))
+        map_service.add_edge(EdgeRequest(start_node=2, end_node=3))
+        current = map_service.get_graph()
+        map_service._load_graph()
+        self.assertEqual(map_service.get_graph().to_dict(), current.to_dict())
+        map_service.compact_map()
+        self.assertEqual(read_json(map_service.MAP_FILE, default={}), {})
+        map_service._load_graph()
+        self.assertIsInstance(map_service.get_graph().edge_distance, np.memmap)
+        self.assertEqual(map_service.get_graph().to_dict(), current.to_dict())
+        self.assertEqual(map_service.get_map()["nodes"][3]["connected_edges"], [2])
+
+    def test_import_is_atomic(self):
+        nodes = [(1, {"name": "D", "longitude": "116.003", "latitude": "39.0"}),
+                 (2, {"name": "E", "longitude": "116.004", "latitude": "39.0"})]
+        edges = [(1, {"start_node": "2", "end_node": "3"}), (2, {"start_node": "3", "end_node": "9"})]
+        result = map_service.import_map(nodes, edges)
+        self.assertFalse(result["success"])
+        self.assertEqual([(e["source"], e["line"]) for e in result["errors"]], [("edges", 2)])
+        self.assertEqual((map_service.get_graph().version, len(map_service.edit_log)), (3, 0))
+
+        result = map_service.import_map(nodes, edges, skip_invalid=True)
+        self.assertEqual((result["nodes"], result["edges"], result["version"]), (2, 1, 4))
+        road = map_service.get_graph()
+        self.assertEqual((road.node_count, road.edge_count), (5, 3))
+        self.assertEqual(road.node(2)["connected_edges"], [1, 2])
+        self.assertEqual(road.node(3)["connected_edges"], [2])
+        self.assertEqual(map_service.congestion_store.edge_count, 3)
+        path, distance = map_service.one_to_one_shortest_path("A", "D")
+        self.assertEqual([node["id"] for node in path], [0, 1, 2, 3])
+        # 整批只写一条日志，重放结果一致
+        self.assertEqual([record["op"] for record in map_service.edit_log.read()], ["import"])
+        write_json(map_service.MAP_FILE, {"nodes": NODES, "edges": EDGES, "version": 3})
+        map_service._load_graph()
+        self.assertEqual(map_service.get_graph().to_dict(), road.to_dict())
+
+    def test_graph_payload_and_delta(self):
+        etag, body = map_service.get_map_payload()
+        self.assertEqual(json.loads(body), map_service.get_graph().to_dict())
+        gzip_etag, compressed = map_service.get_map_payload("gzip")
+        self.assertEqual(gzip_etag, etag)
+        self.assertEqual(gzip.decompress(compressed), body)
+        # 同一版本只序列化一次
+        self.assertIs(map_service.get_map_payload()[1], body)
+
+        map_service.add_node(NodeRequest(name="D", longitude=116.003, latitude=39.0))
+        map_service.add_edge(EdgeRequest(start_node=2, end_node=3))
+        self.assertNotEqual(map_service.get_map_payload()[0], etag)
+
+        delta = map_service.get_map_delta(3)
+        self.assertFalse(delta["full"])
+        self.assertEqual(delta["version"], 5)
+        self.assertEqual([node["id"] for node in delta["nodes"]], [3, 2])
+        self.assertEqual(delta["nodes"][0]["connected_edges"], [2])
+        self.assertEqual([edge["id"] for edge in delta["edges"]], [2])
+        delta = map_service.get_map_delta(4)
+        self.assertEqual(([node["id"] for node in delta["nodes"]], len(delta["edges"])), ([2, 3], 1))
+        self.assertEqual((map_service.get_map_delta(5)["nodes"], map_service.get_map_delta(5)["edges"]), ([], []))
+        # 超出保留历史或版本不合法时返回完整地图
+        for since in (2, 6):
+            delta = map_service.get_map_delta(since)
+            self.assertTrue(delta["full"])
+            self.assertEqual(len(delta["nodes"]), 4)
+
+    def test_get_graph_route(self):
+        app = FastAPI()
+        app.include_router(router, prefix="/map")
+        client = TestClient(app)
+        response = client.get("/map/get_graph", headers={"Accept-Encoding": "gzip;q=1, br;q=0"})
+        self.assertEqual(response.headers["content-encoding"], "gzip")
+        self.assertEqual(response.json()["version"], 3)
+        etag = response.headers["etag"]
+        response = client.get("/map/get_graph", headers={"If-None-Match": etag})
+        self.assertEqual((response.status_code, response.content), (304, b""))
+        response = client.get("/map/get_graph", headers={"Accept-Encoding": "identity"})
+        self.assertNotIn("content-encoding", response.headers)
+
+        map_service.add_node(NodeRequest(name="D", longitude=116.003, latitude=39.0))
+        self.assertEqual(client.get("/map/get_graph", headers={"If-None-Match": etag}).status_code, 200)
+        delta = client.get("/map/get_graph", params={"since_version": 3}).json()
+        self.assertEqual([node["name"] for node in delta["nodes"]], ["D"])
+
+    def test_compaction_threshold(self):
+        original = map_service.MAP_COMPACT_EVERY
+        map_service.MAP_COMPACT_EVERY = 2
+        try:
+            map_service.add_node(NodeRequest(name="D", longitude=116.003, latitude=39.0))
+            self.assertEqual(len(map_service.edit_log), 1)
+            map_service.add_node(NodeRequest(name="E", longitude=116.004, latitude=39.0))
+            self.assertEqual(len(map_service.edit_log), 0)
+            self.assertEqual(read_json(map_service.MAP_FILE)["version"], 5)
+        finally:
+            map_service.MAP_COMPACT_EVERY = original
+
+
+class TestBatchRoutes(unittest.TestCase):
+    def setUp(self):
+        self.original_graph = map_service.road_graph
+        map_service.road_graph = RoadGraph(list(NODES), list(EDGES))
+        map_service.route_cache.clear()
+
+    def tearDown(self):
+        map_service.road_graph = self.original_graph
+
+    def test_batch_matches_single_queries(self):
+        results = map_service.batch_shortest_paths([
+            ("A", "C", DISTANCE_MODE),
+            ("A", "B", DISTANCE_MODE),
+            ("A", "C", "walk_ebike"),
+            ("A", "不存在", DISTANCE_MODE),
+            ("A", "C", "car"),
+        ])
+        self.assertEqual([r["found"] for r in results], [True, True, True, False, False])
+        # 与真实地图版本号相同的测试路网不会误用真实地图的全源矩阵
+        path, distance = map_service.one_to_one_shortest_path("A", "C")
+        self.assertEqual([n["id"] for n in results[0]["path"]], [n["id"] for n in path])
+        self.assertAlmostEqual(results[0]["distance"], distance, places=2)
+        self.assertEqual(results[1]["distance"], 86.0)
+        self.assertEqual(results[2]["path_mode"], ["walk", "ebike"])
+        self.assertGreater(results[2]["time"], 0)
+        self.assertEqual(results[3]["detail"], "地点不存在")
+        self.assertEqual(results[4]["detail"], "出行方式不存在")
+
+
+class TestSearchPlacesNetwork(unittest.TestCase):
+    def setUp(self):
+        self.original_graph = map_service.road_graph
+        map_service.road_graph = RoadGraph(list(NODES), list(EDGES), version=11)
+
+    def tearDown(self):
+        map_service.road_graph = self.original_graph
+
+    def test_network_order_and_radius(self):
+        places = map_service.search_places_network(116.0, 39.0, "食堂", 5, 1000.0, start_name="A")
+        self.assertEqual([(place.name, place.distance) for place in places], [("C", 172.0)])
+        self.assertEqual(map_service.search_places_network(116.0, 39.0, "食堂", 5, 100.0, start_name="A"), [])
+        # 未指定起点时从最近的路网节点出发，并计入到该节点的直线距离
+        places = map_service.search_places_network(116.0021, 39.0, "路口", 5, 1000.0)
+        self.assertEqual(places[0].name, "B")
+        self.assertAlmostEqual(places[0].distance, 86.0 + haversine(39.0, 116.0021, 39.0, 116.002), places=2)
+        with self.assertRaises(ValueError):
+            map_service.search_places_network(116.0, 39.0, "食堂", 5, 1000.0, start_name="不存在")
+
+
+class TestIsochrone(unittest.TestCase):
+    def setUp(self):
+        self.original_graph = map_service.road_graph
+        map_service.road_graph = RoadGraph(list(NODES), list(EDGES), version=13)
+        map_service.route_cache.clear()
+
+    def tearDown(self):
+        map_service.road_graph = self.original_graph
+
+    def test_reachable_and_boundary(self):
+        result = map_service.isochrone("A", DISTANCE_MODE, 100.0, "convex")
+        self.assertEqual([(item["id"], item["cost"]) for item in result["reachable"]], [(0, 0.0), (1, 86.0)])
+        self.assertEqual(sorted(result["pois"]), ["大门", "路口"])
+        boundary, = result["boundary"]
+        self.assertEqual((boundary["start_node"], boundary["end_node"]), (1, 2))
+        self.assertAlmostEqual(boundary["fraction"], 14.0 / 86.0, places=4)
+        self.assertAlmostEqual(boundary["longitude"], 116.001 + 0.001 * 14.0 / 86.0)
+        # 所有点共线，外轮廓退化为线段的两个端点
+        self.assertEqual(len(result["hull"]), 2)
+
+        # walk 模式按时间预算（拥挤度不大于 1，耗时不少于畅通耗时）
+        result = map_service.isochrone("A", "walk", 80.0, "none")
+        self.assertEqual([item["id"] for item in result["reachable"]], [0])
+        self.assertEqual(result["hull"], [])
+        for bad in (("不存在", "walk", 1.0, "none"), ("A", "car", 1.0, "none"), ("A", "walk", 1.0, "circle")):
+            with self.assertRaises(ValueError):
+                map_service.isochrone(*bad)
+        # 预算为负时没有可到达的点，外轮廓为空；接口拒绝负预算
+        self.assertEqual(map_service.isochrone("A", "walk", -1.0, "convex")["hull"], [])
+        with self.assertRaises(ValidationError):
+            IsochroneRequest(start="A", budget=-1.0)
+
+
+class TestCoordinateRouting(unittest.TestCase):
+    def setUp(self):
+        self.original_graph = map_service.road_graph
+        map_service.road_graph = RoadGraph(list(NODES), list(EDGES), version=17)
+        map_service.route_cache.clear()
+        # 测试路网只在本进程的内存中，路由在线程池中执行（工作进程从数据文件加载路网）
+        self.original_executor = map_router.route_executor
+        map_router.route_executor = RouteExecutor(workers=0)
+
+    def tearDown(self):
+        map_service.road_graph = self.original_graph
+        map_router.route_executor = self.original_executor
+
+    def test_snap_point(self):
+        snap = map_service.snap_point(116.0003, 39.0001)
+        self.assertEqual((snap["edge_id"], snap["start_node"], snap["end_node"]), (0, 0, 1))
+        self.assertAlmostEqual(snap["fraction"], 0.3, places=3)
+        self.assertAlmostEqual(snap["longitude"], 116.0003, places=6)
+        self.assertAlmostEqual(snap["distance"], haversine(39.0001, 116.0003, 39.0, 116.0003), places=1)
+        with self.assertRaises(ValueError):
+            map_service.snap_point(116.0, 39.1)
+
+    def test_route_from_mid_edge(self):
+        path, distance = map_service.one_to_one_shortest_path("", "C", start_location=(116.0003, 39.0))
+        self.assertEqual([node["id"] for node in path], [map_service.SNAP_START_ID, 1, 2])
+        self.assertEqual(path[0]["type"], "virtual")
+        self.assertAlmostEqual(distance, 86.0 * 0.7 + 86.0, places=1)
+        # 起终点在同一条边上时直接沿边行走
+        path, distance = map_service.one_to_one_shortest_path("", "", start_location=(116.0012, 39.0),
+                                                              end_location=(116.0018, 39.0))
+        self.assertEqual([node["id"] for node in path], [map_service.SNAP_START_ID, map_service.SNAP_END_ID])
+        self.assertAlmostEqual(distance, 86.0 * 0.6, places=1)
+
+        path, modes, time, distance = map_service.one_to_one_shortest_time("A", "", "walk_ebike",
+                                                                           end_location=(116.0015, 39.0))
+        self.assertEqual([node["id"] for node in path], [0, 1, map_service.SNAP_END_ID])
+        self.assertEqual(modes, ["walk", "ebike"])
+        full_path, _, full_time, _ = map_service.one_to_one_shortest_time("A", "C", "walk_ebike")
+        self.assertLess(time, full_time)
+        with self.assertRaises(ValueError):
+            map_service.one_to_one_shortest_path("不存在", "", end_location=(116.0015, 39.0))
+        # 不存在的出行方式按名称与按坐标查询都被拒绝
+        with self.assertRaises(ValueError):
+            map_service.one_to_one_shortest_time("A", "C", "car")
+        with self.assertRaises(ValueError):
+            map_service.one_to_one_shortest_time("A", "", "car", end_location=(116.0015, 39.0))
+        with self.assertRaises(ValueError):
+            map_service.route_cache_key("one_to_one_shortest_time", "A", "C", "car")
+
+    def test_route_endpoint(self):
+        app = FastAPI()
+        app.include_router(router, prefix="/map")
+        client = TestClient(app)
+        response = client.get("/map/snap", params={"longitude": 116.0015, "latitude": 39.0})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["edge_id"], 1)
+        self.assertEqual(client.get("/map/snap", params={"longitude": 116.0, "latitude": 39.1}).status_code, 404)
+        # 最大吸附距离有上限
+        response = client.get("/map/snap", params={"longitude": 116.0, "latitude": 39.1, "max_distance": 1e7})
+        self.assertEqual(response.status_code, 422)
+        response = client.post("/map/path_plan/one_to_one_shortest_path",
+                               json={"start_location": {"longitude": 116.0003, "latitude": 39.0}, "end": "C"})
+        self.assertEqual(response.status_code, 200)
+        self.assertAlmostEqual(response.json()["distance"], 86.0 * 0.7 + 86.0, places=1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,150 @@
+# tests/test_route_executor.py
+import asyncio
+import os
+import tempfile
+import time
+import unittest
+from unittest import mock
+
+from app.services import map_service, route_executor
+from app.services.route_executor import RouteExecutor, RouteQueueFull, RouteTimeout, ROUTE_DATA_FILES
+from app.models.map import NodeRequest, EdgeRequest
+from utils.file_utils import write_json
+
+NODES = [
+    {"id": 0, "name": "A", "type": "大门", "longitude": 116.0, "latitude": 39.0, "connected_edges": [0]},
+    {"id": 1, "name": "B", "type": "路口", "longitude": 116.001, "latitude": 39.0, "connected_edges": [0, 1]},
+    {"id": 2, "name": "C", "type": "食堂", "longitude": 116.002, "latitude": 39.0, "connected_edges": [1]},
+]
+EDGES = [
+    {"id": 0, "start_node": 0, "end_node": 1, "distance": 86.0, "walk_speed": 1.0, "bike_speed": 3.0, "ebike_speed": 0.0},
+    {"id": 1, "start_node": 1, "end_node": 2, "distance": 86.0, "walk_speed": 1.0, "bike_speed": 0.0, "ebike_speed": 5.0},
+]
+
+
+def slow_route(*args, **kwargs):
+    time.sleep(0.5)
+    return "done"
+
+
+class TestRouteExecutor(unittest.TestCase):
+    """工作进程不继承父进程内存，测试路网写入临时目录中的数据文件，由工作进程自行加载"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.original_files = {name: getattr(map_service, name) for name in ROUTE_DATA_FILES}
+        self.original = (map_service.road_graph, map_service.congestion_store, map_service.all_pairs,
+                         map_service.edit_log, map_service._edit_index, list(map_service._edit_history),
+                         map_service.one_to_one_shortest_time)
+        for name, path in self.original_files.items():
+            setattr(map_service, name, os.path.join(self.temp_dir.name, os.path.basename(path)))
+        write_json(map_service.MAP_FILE, {"version": 21, "nodes": NODES, "edges": EDGES})
+        map_service._load_graph()
+        map_service._load_congestion()
+        map_service._load_all_pairs()
+        map_service.route_cache.clear()
+        self.executor = RouteExecutor(workers=2, queue_size=2, timeout=20.0)
+
+    def tearDown(self):
+        self.executor.shutdown()
+        for name, path in self.original_files.items():
+            setattr(map_service, name, path)
+        (map_service.road_graph, map_service.congestion_store, map_service.all_pairs, map_service.edit_log,
+         map_service._edit_index, history, map_service.one_to_one_shortest_time) = self.original
+        map_service._edit_history.clear()
+        map_service._edit_history.extend(history)
+        map_service.route_cache.clear()
+        self.temp_dir.cleanup()
+
+    def test_results_match_and_follow_snapshot(self):
+        self.executor.start()
+        expected = map_service.one_to_one_shortest_path("A", "C")
+        map_service.route_cache.clear()
+        result = asyncio.run(self.executor.run("one_to_one_shortest_path", "A", "C"))
+        self.assertEqual(result, expected)
+        with self.assertRaises(ValueError):
+            asyncio.run(self.executor.run("one_to_one_shortest_path", "A", "不存在"))
+        with self.assertRaises(ValueError):
+            asyncio.run(self.executor.run("add_node", "A"))
+
+        # 重复查询命中父进程的缓存，不再分派
+        finished = self.executor.stats()["finished"]
+        self.assertEqual(asyncio.run(self.executor.run("one_to_one_shortest_path", "A", "C")), result)
+        self.assertEqual(self.executor.stats()["finished"], finished)
+        self.assertGreaterEqual(map_service.get_route_cache_stats()["hits"], 1)
+
+        # 新增节点 D 与边 C-D：工作进程按新版本重新加载路网，进程池不重建
+        with self.assertRaises(ValueError):
+            asyncio.run(self.executor.run("one_to_one_shortest_path", "A", "D"))
+        map_service.add_node(NodeRequest(name="D", longitude=116.003, latitude=39.0))
+        map_service.add_edge(EdgeRequest(start_node=2, end_node=3))
+        path, distance = asyncio.run(self.executor.run("one_to_one_shortest_path", "A", "D"))
+        self.assertEqual([node["id"] for node in path], [0, 1, 2, 3])
+
+        # 拥挤度更新后，工作进程读取新的拥挤度
+        before = asyncio.run(self.executor.run("one_to_one_shortest_time", "A", "C", "walk"))
+        map_service.update_congestion([(0, 0.1, None)])
+        after = asyncio.run(self.executor.run("one_to_one_shortest_time", "A", "C", "walk"))
+        self.assertGreater(after[2], before[2])
+        map_service.route_cache.clear()
+        self.assertEqual(after, map_service.one_to_one_shortest_time("A", "C", "walk"))
+        stats = self.executor.stats()
+        self.assertEqual((stats["pools"], stats["pending"]), (1, 0))
+
+    def test_sync_rejects_incomplete_snapshot(self):
+        road, revision = map_service.get_graph(), map_service.congestion_store.revision
+        with mock.patch.object(route_executor, "SYNC_RETRY_DELAY", 0):
+            # 快照文件不完整：重试后失败，不会按空路网回答
+            with open(map_service.MAP_FILE, "w", encoding="utf-8") as f:
+                f.write('{"version": 22, "nodes": [')
+            with self.assertRaises(ValueError):
+                route_executor._sync((22, revision))
+            self.assertIs(map_service.get_graph(), road)
+            # 文件中的版本低于请求的版本
+            write_json(map_service.MAP_FILE, {"version": 21, "nodes": NODES, "edges": EDGES})
+            with self.assertRaises(RuntimeError):
+                route_executor._sync((22, revision))
+
+    def test_queue_limit_and_timeout(self):
+        # 按函数对象分派，工作进程按模块路径导入替换后的函数
+        map_service.one_to_one_shortest_time = slow_route
+
+        async def scenario():
+            first = asyncio.ensure_future(self.executor.run("one_to_one_shortest_time", "A", "C"))
+            second = asyncio.ensure_future(self.executor.run("one_to_one_shortest_time", "A", "B", timeout=0.05))
+            await asyncio.sleep(0)
+            with self.assertRaises(RouteQueueFull):
+                await self.executor.run("one_to_one_shortest_time", "B", "C")
+            with self.assertRaises(RouteTimeout):
+                await second
+            return await first
+
+        self.assertEqual(asyncio.run(scenario()), "done")
+        # 超时的请求执行完后才释放名额
+        deadline = time.time() + 20
+        while self.executor.stats()["pending"] and time.time() < deadline:
+            time.sleep(0.05)
+        stats = self.executor.stats()
+        self.assertEqual((stats["pending"], stats["rejected"], stats["timeouts"]), (0, 1, 1))
+
+    def test_thread_fallback(self):
+        executor = RouteExecutor(workers=0, queue_size=1)
+        result = asyncio.run(executor.run("one_to_one_shortest_time", "A", "C", "walk_ebike"))
+        self.assertEqual(result, map_service.one_to_one_shortest_time("A", "C", "walk_ebike"))
+        self.assertEqual(executor.stats()["pools"], 0)
+
+        # 超时后线程仍在执行，名额保持占用，不会放进超过上限的请求
+        map_service.one_to_one_shortest_time = slow_route
+        with self.assertRaises(RouteTimeout):
+            asyncio.run(executor.run("one_to_one_shortest_time", "A", "C", timeout=0.05))
+        self.assertEqual(executor.stats()["pending"], 1)
+        with self.assertRaises(RouteQueueFull):
+            asyncio.run(executor.run("one_to_one_shortest_time", "A", "C"))
+        deadline = time.time() + 5
+        while executor.stats()["pending"] and time.time() < deadline:
+            time.sleep(0.05)
+        self.assertEqual(executor.stats()["pending"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,162 @@
+# tests/test_shortest_path.py
+import random
+import unittest
+
+import numpy as np
+
+from algorithm.Graph import RoadGraph, DISTANCE_MODE
+from algorithm.Landmarks import Landmarks
+from algorithm.AllPairs import AllPairsShortestPaths
+from algorithm.ShortestPath import (dijkstra, astar, dijkstra_csr, bidirectional_astar, bidirectional_dijkstra,
+                                    shortest_path_tree, nearest_targets)
+
+
+def random_road(width=10, height=8, seed=3):
+    """生成网格状测试路网，边长随机，部分边禁止骑行"""
+    rng = random.Random(seed)
+    nodes, edges = [], []
+    for y in range(height):
+        for x in range(width):
+            nodes.append({"id": y * width + x, "name": f"{x},{y}", "type": "路口", "popularity": 1,
+                          "longitude": 116.0 + x * 0.001, "latitude": 39.0 + y * 0.001, "connected_edges": []})
+    for y in range(height):
+        for x in range(width):
+            u = y * width + x
+            for v in ([u + 1] if x + 1 < width else []) + ([u + width] if y + 1 < height else []):
+                edges.append({"id": len(edges), "start_node": u, "end_node": v,
+                              "distance": rng.uniform(80, 200), "walk_speed": 1.0,
+                              "bike_speed": rng.choice([0.0, 3.0]), "ebike_speed": 0.0})
+    return RoadGraph(nodes, edges)
+
+
+def random_crowd(road, seed=9):
+    """每条边 0.8~1.0 的拥挤度"""
+    rng = random.Random(seed)
+    return np.array([rng.uniform(0.8, 1.0) for _ in range(road.edge_count)])
+
+
+class TestLandmarks(unittest.TestCase):
+    def setUp(self):
+        self.road = random_road()
+
+    def test_lower_bound_is_admissible(self):
+        csr = self.road.mode_csr(DISTANCE_MODE)
+        landmarks = Landmarks.build(csr, k=4)
+        self.assertEqual(len(landmarks.landmarks), 4)
+        for target in (0, 17, 79):
+            exact = dijkstra_csr(csr.offsets, csr.targets, csr.weights, target)
+            bound = landmarks.lower_bound(target)
+            for v in range(self.road.node_count):
+                self.assertLessEqual(bound[v], exact[v] + 1e-9)
+            self.assertEqual(bound[target], 0.0)
+
+    def test_astar_with_alt_matches_dijkstra(self):
+        for mode in (DISTANCE_MODE, "walk_bike"):
+            graph = self.road.adjacency(mode, random_crowd(self.road))
+            landmarks = Landmarks.build(self.road.mode_csr(mode), k=4)
+            rng = random.Random(5)
+            for _ in range(50):
+                s, t = rng.randrange(self.road.node_count), rng.randrange(self.road.node_count)
+                stats_alt, stats_dij = {}, {}
+                _, expected = dijkstra(s, {t}, graph, stats_dij)
+                _, cost = astar(s, t, graph, landmarks.heuristic(self.road.index_of[t], self.road.index_of), stats_alt)
+                self.assertAlmostEqual(cost, expected)
+                self.assertLessEqual(stats_alt['settled'], stats_dij['settled'])
+
+
+class TestBidirectional(unittest.TestCase):
+    def setUp(self):
+        self.road = random_road()
+
+    def check_path(self, graph, path, cost, modes):
+        """路径上的每段边都存在，交通方式与该段最短的弧一致，总长等于 cost"""
+        self.assertEqual(len(modes), len(path) - 1)
+        length = 0.0
+        for u, v, mode in zip(path, path[1:], modes):
+            weight, best_mode = min((w, m) for x, w, m in graph[u] if x == v)
+            self.assertEqual(mode, best_mode)
+            length += weight
+        self.assertAlmostEqual(length, cost)
+
+    def test_matches_dijkstra(self):
+        rng = random.Random(11)
+        for mode in (DISTANCE_MODE, "walk_bike"):
+            graph = self.road.adjacency(mode, random_crowd(self.road))
+            landmarks = Landmarks.build(self.road.mode_csr(mode), k=4)
+            for _ in range(100):
+                s, t = rng.randrange(self.road.node_count), rng.randrange(self.road.node_count)
+                _, expected = dijkstra(s, {t}, graph)
+                path, cost, modes = bidirectional_dijkstra(s, t, graph)
+                self.assertAlmostEqual(cost, expected)
+                self.check_path(graph, path, cost, modes)
+                path, cost, modes = bidirectional_astar(s, t, graph, landmarks.heuristic(t), landmarks.heuristic(s))
+                self.assertAlmostEqual(cost, expected)
+                self.check_path(graph, path, cost, modes)
+
+    def test_unreachable(self):
+        graph = {0: [(1, 1.0, "walk")], 1: [(0, 1.0, "walk")], 2: []}
+        self.assertEqual(bidirectional_dijkstra(0, 2, graph), ([], float('inf'), []))
+        self.assertEqual(bidirectional_dijkstra(1, 1, graph), ([1], 0.0, []))
+
+
+class TestNearestTargets(unittest.TestCase):
+    def test_matches_full_tree(self):
+        road = random_road()
+        graph = road.adjacency(DISTANCE_MODE)
+        rng = random.Random(5)
+        targets = set(rng.sample(road.node_ids.tolist(), 12))
+        dist, _ = shortest_path_tree(0, graph)
+        ranked = sorted((dist[node], node) for node in targets)
+
+        found = nearest_targets(0, graph, targets, 4)
+        self.assertEqual([node for node, _ in found], [node for _, node in ranked[:4]])
+        for (node, cost), (expected, _) in zip(found, ranked):
+            self.assertAlmostEqual(cost, expected)
+
+        # 距离上限内的目标全部返回，且只确定了部分节点
+        limit = ranked[6][0] + 1e-6
+        stats = {}
+        found = nearest_targets(0, graph, targets, 100, max_cost=limit, stats=stats)
+        self.assertEqual(len(found), 7)
+        self.assertLess(stats['settled'], road.node_count)
+        self.assertEqual(nearest_targets(0, graph, set(), 3), [])
+
+
+class TestAllPairs(unittest.TestCase):
+    def test_matrix_matches_dijkstra(self):
+        road = random_road()
+        for mode in (DISTANCE_MODE, "walk_bike"):
+            matrix = AllPairsShortestPaths.build(road.node_count, road.edge_list(mode))
+            csr = road.mode_csr(mode)
+            for s in (0, 33, 79):
+                exact = dijkstra_csr(csr.offsets, csr.targets, csr.weights, s)
+                for t in range(road.node_count):
+                    self.assertAlmostEqual(matrix.distance(s, t), exact[t])
+                    path = matrix.path(s, t)
+                    self.assertEqual((path[0], path[-1]), (s, t))
+
+    def test_incremental_update_matches_rebuild(self):
+        road = random_road()
+        edges = road.edge_list(DISTANCE_MODE)
+        # 先用前 60 个节点之间的部分边建矩阵，再追加其余节点与边
+        head = [edge for edge in edges if edge[0] < 60 and edge[1] < 60][:70]
+        tail = [edge for edge in edges if edge not in head]
+        matrix = AllPairsShortestPaths.build(60, head).updated(road.node_count, tail)
+        expected = AllPairsShortestPaths.build(road.node_count, edges)
+        self.assertTrue(np.allclose(matrix.dist, expected.dist))
+        weight = {(u, v): w for u, v, w, _ in edges}
+        weight.update({(v, u): w for u, v, w, _ in edges})
+        for s in (0, 33, 79):
+            for t in range(road.node_count):
+                path = matrix.path(s, t)
+                self.assertEqual((path[0], path[-1]), (s, t))
+                self.assertAlmostEqual(sum(weight[pair] for pair in zip(path, path[1:])), matrix.distance(s, t))
+
+    def test_unreachable(self):
+        matrix = AllPairsShortestPaths.build(3, [(0, 1, 2.0, DISTANCE_MODE)])
+        self.assertEqual(matrix.path(0, 2), [])
+        self.assertEqual(matrix.path(1, 0), [1, 0])
+
+
+if __name__ == "__main__":
+    unittest.main()
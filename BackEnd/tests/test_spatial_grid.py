@@ -0,0 +1,85 @@
+# tests/test_spatial_grid.py
+import random
+import unittest
+
+from algorithm.Geo import haversine as _haversine
+from algorithm.SpatialGrid import SpatialGrid, TypedSpatialIndex, EdgeGrid
+
+
+class TestSpatialGrid(unittest.TestCase):
+    def setUp(self):
+        rng = random.Random(7)
+        self.points = [(39.95 + rng.uniform(0, 0.02), 116.35 + rng.uniform(0, 0.02)) for _ in range(400)]
+        self.grid = SpatialGrid(cell_size=150.0, ref_latitude=39.96)
+        for i, (lat, lon) in enumerate(self.points):
+            self.grid.insert(i, lat, lon)
+
+    def brute(self, lat, lon):
+        return sorted((_haversine(lat, lon, plat, plon), i) for i, (plat, plon) in enumerate(self.points))
+
+    def test_within_matches_brute_force(self):
+        for lat, lon, radius in ((39.96, 116.36, 300.0), (39.95, 116.35, 50.0), (39.9, 116.3, 20000.0)):
+            expected = {i for d, i in self.brute(lat, lon) if d <= radius}
+            self.assertEqual({i for _, i in self.grid.within(lat, lon, radius)}, expected)
+
+    def test_nearest_matches_brute_force(self):
+        for lat, lon in ((39.96, 116.36), (39.97, 116.37), (40.5, 117.0)):
+            expected = self.brute(lat, lon)[:7]
+            result = self.grid.nearest(lat, lon, 7)
+            self.assertEqual([i for _, i in result], [i for _, i in expected])
+        limited = self.grid.nearest(39.96, 116.36, 50, max_distance=100.0)
+        self.assertTrue(all(d <= 100.0 for d, _ in limited))
+        self.assertEqual(len(limited), sum(1 for d, _ in self.brute(39.96, 116.36) if d <= 100.0))
+        self.assertEqual(len(self.grid.nearest(39.96, 116.36, 1000)), 400)
+
+    def test_typed_index(self):
+        index = TypedSpatialIndex(cell_size=100.0, ref_latitude=39.0)
+        index.insert("食堂", 1, 39.0, 116.0)
+        index.insert("大门", 2, 39.0, 116.0005)
+        index.insert("食堂", 3, 39.001, 116.0)
+        self.assertEqual([i for _, i in index.nearest("食堂", 39.0, 116.0, 5)], [1, 3])
+        self.assertEqual(index.nearest("超市", 39.0, 116.0, 5), [])
+        self.assertEqual([i for _, i in index.within("大门", 39.0, 116.0, 50.0)], [2])
+
+
+class TestEdgeGrid(unittest.TestCase):
+    def test_nearest_matches_brute_force(self):
+        rng = random.Random(11)
+        ends = [(39.95 + rng.uniform(0, 0.02), 116.35 + rng.uniform(0, 0.02)) for _ in range(300)]
+        segments = [(ends[i], ends[(i * 7 + 1) % len(ends)]) for i in range(len(ends))]
+        lat1, lon1 = zip(*(a for a, _ in segments))
+        lat2, lon2 = zip(*(b for _, b in segments))
+        grid = EdgeGrid(lat1, lon1, lat2, lon2, cell_size=80.0)
+        self.assertEqual(len(grid), 300)
+
+        def brute(x, y):
+            best = float('inf')
+            for ax, ay, bx, by in grid.segments:
+                dx, dy = bx - ax, by - ay
+                length = dx * dx + dy * dy
+                t = 0.0 if length == 0 else min(max(((x - ax) * dx + (y - ay) * dy) / length, 0.0), 1.0)
+                best = min(best, ((x - ax - t * dx) ** 2 + (y - ay - t * dy) ** 2) ** 0.5)
+            return best
+
+        for _ in range(50):
+            lat, lon = 39.94 + rng.uniform(0, 0.04), 116.34 + rng.uniform(0, 0.04)
+            distance, index, t, plat, plon = grid.nearest(lat, lon)
+            x, y = grid._project(lat, lon)
+            self.assertAlmostEqual(distance, brute(x, y), places=6)
+            # 投影点位于该线段上
+            ax, ay, bx, by = grid.segments[index]
+            px, py = grid._project(plat, plon)
+            self.assertAlmostEqual(px, ax + t * (bx - ax), places=4)
+            self.assertAlmostEqual(py, ay + t * (by - ay), places=4)
+        self.assertIsNone(grid.nearest(40.5, 117.0, max_distance=100.0))
+        # 查询点在网格范围外：跳过空圈后结果仍与暴力一致
+        distance, *_ = grid.nearest(39.9, 116.3)
+        self.assertAlmostEqual(distance, brute(*grid._project(39.9, 116.3)), places=6)
+        # 到外包矩形的距离超过 max_distance 时直接返回 None
+        x, y = grid._project(39.9, 116.3)
+        self.assertIsNone(grid.nearest(39.9, 116.3, max_distance=0.99 * (grid.bounds[1] - y)))
+        self.assertIsNone(EdgeGrid([], [], [], []).nearest(39.0, 116.0))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,40 @@
+# tests/test_tour.py
+import itertools
+import random
+import unittest
+
+from algorithm.Tour import held_karp, improve_tour, nearest_neighbor_tour, solve_tour, tour_cost
+
+
+def random_matrix(k, seed):
+    rng = random.Random(seed)
+    points = [(rng.random(), rng.random()) for _ in range(k + 1)]
+    return [[((a[0] - b[0]) ** 2 + (a[1] - b[1]) ** 2) ** 0.5 for b in points] for a in points]
+
+
+class TestTour(unittest.TestCase):
+    def test_held_karp_is_optimal(self):
+        for k in range(1, 8):
+            dist = random_matrix(k, seed=k)
+            expected = min(tour_cost(dist, [0] + list(p)) for p in itertools.permutations(range(1, k + 1)))
+            tour, cost = held_karp(dist)
+            self.assertEqual(tour[0], 0)
+            self.assertEqual(sorted(tour), list(range(k + 1)))
+            self.assertAlmostEqual(cost, expected)
+            self.assertAlmostEqual(tour_cost(dist, tour), cost)
+
+    def test_local_search_improves_nearest_neighbor(self):
+        dist = random_matrix(40, seed=99)
+        initial = nearest_neighbor_tour(dist)
+        tour = improve_tour(dist, initial, time_budget=1.0)
+        self.assertEqual(tour[0], 0)
+        self.assertEqual(sorted(tour), list(range(41)))
+        self.assertLessEqual(tour_cost(dist, tour), tour_cost(dist, initial))
+
+    def test_unreachable_target(self):
+        dist = [[0, 1, float('inf')], [1, 0, float('inf')], [float('inf'), float('inf'), 0]]
+        self.assertEqual(solve_tour(dist), ([], float('inf')))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -16,14 +16,33 @@ def read_json(file_path, default=None):
             data = default if default is not None else {}
     return data
 
-def write_json(file_path, data):
+def write_json(file_path, data, indent=4):
     """
-    将数据写入指定 JSON 文件，保存时格式化为可读的形式。
+    将数据写入指定 JSON 文件，默认格式化为可读的形式；
+    indent 为 None 时紧凑输出，用于体积较大的预处理文件。
     """
     # 创建父目录（如果不存在）
     os.makedirs(os.path.dirname(file_path), exist_ok=True)
     with open(file_path, "w", encoding="utf-8") as f:
-        json.dump(data, f, ensure_ascii=False, indent=4)
+        json.dump(data, f, ensure_ascii=False, indent=indent)
+
+def write_json_atomic(file_path, data, indent=4):
+    """
+    与 write_json 相同，但先写同目录下的临时文件并落盘，再原子替换目标文件；
+    写入中途失败（崩溃、磁盘已满）时目标文件保持原样，读者不会读到写了一半的内容。
+    """
+    os.makedirs(os.path.dirname(os.path.abspath(file_path)), exist_ok=True)
+    temp_path = f"{file_path}.tmp"
+    try:
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, indent=indent)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, file_path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.unlink(temp_path)
+        raise
 
 def append_json(file_path, new_data):
     """
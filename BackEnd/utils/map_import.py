@@ -0,0 +1,217 @@
+import csv
+import math
+import numpy as np
+from algorithm.Geo import haversine_array
+
+# CSV 无表头时的列顺序（与 data_raw/map_node.csv、map_edge.csv 一致，多余的列可省略）
+NODE_COLUMNS = ("id", "name", "longitude", "latitude", "type", "popularity")
+EDGE_COLUMNS = ("id", "start_node", "end_node", "walk_speed", "bike_speed", "ebike_speed")
+
+# 批量导入的默认值（与 data_raw/csv2json.py 保持一致）
+DEFAULT_NODE = {"type": "default", "popularity": 100}
+DEFAULT_SPEEDS = {"walk_speed": 1.0, "bike_speed": 3.0, "ebike_speed": 0.0}
+
+
+def iter_csv(stream, columns):
+    """
+    逐行读取 CSV，返回 (行号, {列名: 值}) 的生成器
+    stream 需以 utf-8-sig 打开（兼容带 BOM 的文件）
+    首行第一列等于 columns[0] 时视为表头，按表头列名取值；否则按 columns 的顺序取值
+    """
+    reader = csv.reader(stream)
+    header = None
+    for line, row in enumerate(reader, start=1):
+        if not row or not any(cell.strip() for cell in row):
+            continue
+        if line == 1 and row[0].strip() == columns[0]:
+            header = [cell.strip() for cell in row]
+            continue
+        keys = header or columns
+        yield line, {key: cell.strip() for key, cell in zip(keys, row)}
+
+
+def iter_geojson(data):
+    """
+    解析 GeoJSON FeatureCollection
+    - Point 要素为节点，属性中的 id/name/type/popularity 为节点字段
+    - LineString 要素为边，属性中的 start_node/end_node 缺省时按首末坐标匹配节点
+    返回:
+        (节点生成器, 边生成器)，元素均为 (要素序号, 字段字典)
+    """
+    features = data.get("features", []) if isinstance(data, dict) else []
+    points, lines = [], []
+    for number, feature in enumerate(features, start=1):
+        geometry = (feature or {}).get("geometry") or {}
+        properties = dict((feature or {}).get("properties") or {})
+        coordinates = geometry.get("coordinates") or []
+        if geometry.get("type") == "Point" and len(coordinates) >= 2:
+            properties["longitude"], properties["latitude"] = coordinates[0], coordinates[1]
+            points.append((number, properties))
+        elif geometry.get("type") == "LineString" and len(coordinates) >= 2:
+            properties["start_coordinate"] = coordinates[0][:2]
+            properties["end_coordinate"] = coordinates[-1][:2]
+            lines.append((number, properties))
+    return iter(points), iter(lines)
+
+
+def _coordinate_key(longitude, latitude):
+    return round(float(longitude), 7), round(float(latitude), 7)
+
+
+def _blank(value):
+    return value is None or value == ""
+
+
+class MapImporter:
+    """
+    批量导入的校验与组装
+    - 节点/边逐条校验：编号与已有路网及本批次均不重复、坐标合法、边的端点存在、无自环、端点对不重复
+    - 未给出编号时接着已有的最大编号分配
+    - 边长在 finish 时对整批边一次性向量化计算
+    参数:
+        road: 当前路网快照
+        index: 当前快照对应的 EditIndex（只读，导入提交时才会更新）
+    """
+
+    def __init__(self, road, index, max_errors=100):
+        self.road = road
+        self.index = index
+        self.max_errors = max_errors
+        self.nodes = []
+        self.edges = []
+        self.errors = []
+        self.error_count = 0
+        self._batch_nodes = {}
+        self._batch_edge_ids = set()
+        self._batch_pairs = set()
+        self._names = set(road.name_to_id)
+        self._next_node_id = index.next_node_id
+        self._next_edge_id = index.next_edge_id
+        self._coordinates = None
+
+    def _error(self, source, line, reason):
+        self.error_count += 1
+        if len(self.errors) < self.max_errors:
+            self.errors.append({"source": source, "line": line, "reason": reason})
+
+    def _node_of(self, node_id):
+        node = self._batch_nodes.get(node_id)
+        return node if node is not None else self.road.nodes_by_id.get(node_id)
+
+    def _resolve_coordinate(self, coordinate):
+        """按坐标匹配节点（首次使用时建立 坐标->ID 表）"""
+        if self._coordinates is None:
+            self._coordinates = {}
+            for node in self.road.nodes:
+                self._coordinates.setdefault(
+                    _coordinate_key(node.get("longitude", 0.0), node.get("latitude", 0.0)), node["id"])
+            for node in self.nodes:
+                self._coordinates.setdefault(_coordinate_key(node["longitude"], node["latitude"]), node["id"])
+        return self._coordinates.get(_coordinate_key(*coordinate))
+
+    def add_nodes(self, rows, source="nodes"):
+        for line, fields in rows:
+            try:
+                node = self._parse_node(fields)
+            except (TypeError, ValueError) as e:
+                self._error(source, line, str(e))
+                continue
+            self.nodes.append(node)
+            self._batch_nodes[node["id"]] = node
+            self._names.add(node["name"])
+            if self._coordinates is not None:
+                self._coordinates.setdefault(_coordinate_key(node["longitude"], node["latitude"]), node["id"])
+
+    def _parse_node(self, fields):
+        if _blank(fields.get("id")):
+            node_id = self._next_node_id
+        else:
+            node_id = int(fields["id"])
+        if self.index.has_node(node_id) or node_id in self._batch_nodes:
+            raise ValueError(f"节点编号 {node_id} 重复")
+        name = str(fields.get("name") or "").strip()
+        if not name:
+            raise ValueError("节点名称为空")
+        if name in self._names:
+            raise ValueError(f"节点名称 {name} 重复")
+        longitude, latitude = float(fields.get("longitude")), float(fields.get("latitude"))
+        if not (math.isfinite(longitude) and math.isfinite(latitude)):
+            raise ValueError("经纬度不是有限数")
+        if not (-180 <= longitude <= 180 and -90 <= latitude <= 90):
+            raise ValueError("经纬度超出范围")
+        popularity = fields.get("popularity")
+        self._next_node_id = max(self._next_node_id, node_id + 1)
+        return {
+            "id": node_id,
+            "name": name,
+            "type": str(fields.get("type") or DEFAULT_NODE["type"]),
+            "popularity": DEFAULT_NODE["popularity"] if _blank(popularity) else int(popularity),
+            "longitude": longitude,
+            "latitude": latitude,
+            "connected_edges": [],
+        }
+
+    def add_edges(self, rows, source="edges"):
+        for line, fields in rows:
+            try:
+                edge = self._parse_edge(fields)
+            except (TypeError, ValueError) as e:
+                self._error(source, line, str(e))
+                continue
+            self.edges.append(edge)
+            self._batch_edge_ids.add(edge["id"])
+            self._batch_pairs.add(self.index.pair(edge["start_node"], edge["end_node"]))
+
+    def _endpoint(self, fields, key, coordinate_key):
+        value = fields.get(key)
+        if not _blank(value):
+            node_id = int(value)
+        elif fields.get(coordinate_key) is not None:
+            node_id = self._resolve_coordinate(fields[coordinate_key])
+            if node_id is None:
+                raise ValueError(f"{key} 的坐标未匹配到节点")
+        else:
+            raise ValueError(f"缺少 {key}")
+        if self._node_of(node_id) is None:
+            raise ValueError(f"节点 {node_id} 不存在")
+        return node_id
+
+    def _parse_edge(self, fields):
+        start = self._endpoint(fields, "start_node", "start_coordinate")
+        end = self._endpoint(fields, "end_node", "end_coordinate")
+        if start == end:
+            raise ValueError("边的两端为同一节点")
+        if _blank(fields.get("id")):
+            edge_id = self._next_edge_id
+        else:
+            edge_id = int(fields["id"])
+        pair = self.index.pair(start, end)
+        if self.index.has_edge(edge_id, start, end) or edge_id in self._batch_edge_ids or pair in self._batch_pairs:
+            raise ValueError(f"边 {edge_id} 重复")
+        edge = {"id": edge_id, "start_node": start, "end_node": end, "distance": 0.0}
+        for key, default in DEFAULT_SPEEDS.items():
+            value = fields.get(key)
+            edge[key] = default if _blank(value) else float(value)
+            if not math.isfinite(edge[key]):
+                raise ValueError(f"{key} 不是有限数")
+            if edge[key] < 0:
+                raise ValueError(f"{key} 不能为负")
+        self._next_edge_id = max(self._next_edge_id, edge_id + 1)
+        return edge
+
+    def finish(self):
+        """
+        向量化计算本批次所有边的长度（米，保留两位小数）
+        返回:
+            (节点列表, 边列表)
+        """
+        if self.edges:
+            ends = [(self._node_of(edge["start_node"]), self._node_of(edge["end_node"])) for edge in self.edges]
+            coordinates = np.array([(a.get("latitude", 0.0), a.get("longitude", 0.0),
+                                     b.get("latitude", 0.0), b.get("longitude", 0.0)) for a, b in ends],
+                                   dtype=np.float64)
+            distances = np.round(haversine_array(coordinates[:, 0], coordinates[:, 1],
+                                                 coordinates[:, 2], coordinates[:, 3]), 2).tolist()
+            for edge, distance in zip(self.edges, distances):
+                edge["distance"] = distance
+        return self.nodes, self.edges
@@ -0,0 +1,329 @@
+"""
+离线导入 OpenStreetMap 路网（.osm.pbf），生成 map_service 使用的地图格式
+运行方式（在 BackEnd 目录下）:
+    python -m utils.osm_import <输入.osm.pbf> <输出.json | 输出.bin>
+只读取本地文件，不访问网络；需要安装 osmium（pyosmium）
+"""
+import sys
+from array import array
+import numpy as np
+from algorithm.Geo import haversine_array
+from utils.map_import import DEFAULT_NODE
+
+try:
+    import osmium
+except ImportError:
+    # 未安装 osmium 时只能使用 OsmGraphBuilder 处理已解析的数据
+    osmium = None
+
+# highway 标签 -> (步行, 自行车, 电动车) 速度，单位与 map.json 一致；0 表示该方式不可通行
+# 未列出的取值（motorway、trunk、建设中的道路等）不导入
+HIGHWAY_SPEEDS = {
+    "primary": (1.0, 3.0, 5.0),
+    "primary_link": (1.0, 3.0, 5.0),
+    "secondary": (1.0, 3.0, 5.0),
+    "secondary_link": (1.0, 3.0, 5.0),
+    "tertiary": (1.0, 3.0, 5.0),
+    "tertiary_link": (1.0, 3.0, 5.0),
+    "unclassified": (1.0, 3.0, 5.0),
+    "residential": (1.0, 3.0, 5.0),
+    "road": (1.0, 3.0, 4.0),
+    "service": (1.0, 3.0, 4.0),
+    "living_street": (1.0, 2.0, 3.0),
+    "track": (1.0, 2.0, 3.0),
+    "cycleway": (1.0, 3.5, 5.0),
+    "path": (1.0, 2.0, 0.0),
+    "bridleway": (1.0, 0.0, 0.0),
+    "footway": (1.0, 0.0, 0.0),
+    "pedestrian": (1.0, 0.0, 0.0),
+    "corridor": (1.0, 0.0, 0.0),
+    "steps": (0.5, 0.0, 0.0),
+}
+# foot / bicycle 明确允许、但 highway 默认不可通行时使用的速度
+ALLOWED_WALK_SPEED = 1.0
+ALLOWED_BIKE_SPEED = 2.0
+# 表示禁止 / 允许通行的 access、foot、bicycle 标签取值
+DENIED_VALUES = {"no", "private"}
+ALLOWED_VALUES = {"yes", "designated", "permissive", "destination"}
+# 导入节点的类型（路口与道路端点）
+NODE_TYPE = "路口"
+
+
+def way_speeds(tags, speeds=None):
+    """
+    由 way 的标签推导 (步行, 自行车, 电动车) 速度
+    - highway 决定默认速度，access=no/private 时全部禁止，再由 foot / bicycle 单独放开或禁止
+    - bicycle=dismount 视为不能骑行；电动车只在可以骑自行车的道路上通行
+    参数:
+        tags: 支持 get 的标签集合（osmium 的 TagList 或字典）
+        speeds: highway 速度表，默认为 HIGHWAY_SPEEDS
+    返回:
+        速度三元组，不可通行或不是道路时返回 None
+    """
+    speeds = HIGHWAY_SPEEDS if speeds is None else speeds
+    highway = tags.get("highway")
+    if highway not in speeds or tags.get("area") == "yes":
+        return None
+    walk, bike, ebike = speeds[highway]
+    if tags.get("access") in DENIED_VALUES:
+        walk = bike = ebike = 0.0
+    foot, bicycle = tags.get("foot"), tags.get("bicycle")
+    if foot in DENIED_VALUES:
+        walk = 0.0
+    elif foot in ALLOWED_VALUES and walk == 0:
+        walk = ALLOWED_WALK_SPEED
+    if bicycle in DENIED_VALUES or bicycle == "dismount":
+        bike = 0.0
+    elif bicycle in ALLOWED_VALUES and bike == 0:
+        bike = ALLOWED_BIKE_SPEED
+    if bike == 0:
+        ebike = 0.0
+    if walk == bike == ebike == 0:
+        return None
+    return walk, bike, ebike
+
+
+def _times(distance, speeds):
+    return tuple(distance / speed if speed > 0 else float('inf') for speed in speeds)
+
+
+class OsmGraphBuilder:
+    """
+    由 OSM way 构造可路由的无向路网，收缩度为 2 的链
+    - 第一遍 count_way: 只记录各 way 的节点引用，统计每个 OSM 节点在路网中的度数，
+      度数不为 2 的节点（路口、尽头）保留为路网节点；引用只存为紧凑的整数数组
+    - 第二遍 add_way: 按坐标计算长度，在保留节点与 way 的端点处切分为片段；只保存片段而不保存 way
+    - build: 经过度为 2 的 way 端点把片段连成链，每条链成为一条边；
+      链长为各段之和，各方式速度取 总长度 / 总耗时，因此收缩前后的距离与耗时都不变
+    - 链的两端相同（环）或与已有的边端点相同（平行边）时，在链内部的节点处拆开，保证端点对不重复
+    内存只与输出路网的规模（片段数）有关，OSM 节点坐标由调用方（osmium 的坐标索引）提供
+    """
+
+    def __init__(self, speeds=None):
+        self.speeds = speeds
+        self._refs = array("q")
+        self._ends = array("q")
+        self._kept = None
+        # 片段: (起点, 终点, 长度, 速度三元组, 首个内部节点, 末个内部节点)，内部节点为 (ID, 经度, 纬度, 到起点的长度)
+        self._pieces = []
+        # 片段端点与保留节点的坐标（经度, 纬度）
+        self._coordinates = {}
+        # 已出现的保留节点
+        self._boundary = set()
+        # 保留节点 -> 经过的道路名称（最多两个）
+        self._names = {}
+
+    def count_way(self, tags, refs):
+        """第一遍：登记一条 way 的节点引用，返回是否为可通行的道路"""
+        if len(refs) < 2 or way_speeds(tags, self.speeds) is None:
+            return False
+        self._refs.extend(refs)
+        self._ends.append(refs[0])
+        self._ends.append(refs[-1])
+        return True
+
+    def finish_counting(self):
+        """第一遍结束：确定保留节点（way 内部的引用计 2 度，端点计 1 度）"""
+        refs = np.frombuffer(self._refs, dtype=np.int64) if len(self._refs) else np.zeros(0, dtype=np.int64)
+        ends = np.frombuffer(self._ends, dtype=np.int64) if len(self._ends) else np.zeros(0, dtype=np.int64)
+        ids, counts = np.unique(refs, return_counts=True)
+        end_ids, end_counts = np.unique(ends, return_counts=True)
+        degree = 2 * counts
+        degree[np.searchsorted(ids, end_ids)] -= end_counts
+        self._kept = ids[degree != 2]
+        self._refs, self._ends = array("q"), array("q")
+
+    def add_way(self, tags, points):
+        """
+        第二遍：按坐标切分一条 way
+        参数:
+            points: [(节点ID, 经度, 纬度)]，缺少坐标的节点（如裁剪边界外）为 None，way 在该处断开
+        """
+        speeds = way_speeds(tags, self.speeds)
+        if speeds is None:
+            return
+        name = tags.get("name") or ""
+        run = []
+        for point in list(points) + [None]:
+            if point is not None:
+                if not run or run[-1][0] != point[0]:
+                    run.append(point)
+                continue
+            if len(run) >= 2:
+                self._split_run(run, speeds, name)
+            run = []
+
+    def _split_run(self, run, speeds, name):
+        refs = np.array([point[0] for point in run], dtype=np.int64)
+        lons = np.array([point[1] for point in run], dtype=np.float64)
+        lats = np.array([point[2] for point in run], dtype=np.float64)
+        lengths = haversine_array(lats[:-1], lons[:-1], lats[1:], lons[1:]).tolist()
+        if len(self._kept):
+            position = np.minimum(np.searchsorted(self._kept, refs), len(self._kept) - 1)
+            kept = (self._kept[position] == refs).tolist()
+        else:
+            kept = [False] * len(run)
+        for i in (0, len(run) - 1):
+            self._coordinates[run[i][0]] = run[i][1:]
+        for i, point in enumerate(run):
+            if kept[i]:
+                self._coordinates[point[0]] = point[1:]
+                self._boundary.add(point[0])
+                if name:
+                    names = self._names.setdefault(point[0], [])
+                    if name not in names and len(names) < 2:
+                        names.append(name)
+
+        start, distance, first, last = 0, 0.0, None, None
+        for i in range(1, len(run)):
+            distance += lengths[i - 1]
+            if kept[i] or i == len(run) - 1:
+                self._pieces.append((run[start][0], run[i][0], distance, speeds, first, last))
+                start, distance, first, last = i, 0.0, None, None
+            else:
+                last = (run[i][0], run[i][1], run[i][2], distance)
+                if first is None:
+                    first = last
+
+    def build(self, start_id=0):
+        """
+        连接片段并输出地图数据
+        返回:
+            (节点列表, 边列表)，格式与 map.json 相同，节点额外带 osm_id
+        """
+        # 非保留的片段端点：恰好连接两个片段时沿链继续，否则（数据裁剪等）当作路网节点；
+        # 全部由这类端点连成的孤立环不会从路网节点走到，直接丢弃
+        ends = {}
+        for index, piece in enumerate(self._pieces):
+            for node in piece[:2]:
+                if node not in self._boundary:
+                    ends.setdefault(node, []).append(index)
+        junctions = {node for node, indices in ends.items() if len(indices) != 2}
+        boundary = self._boundary | junctions
+
+        chains = []
+        visited = [False] * len(self._pieces)
+        for index, piece in enumerate(self._pieces):
+            if visited[index]:
+                continue
+            for origin in piece[:2]:
+                if origin in boundary and not visited[index]:
+                    chains.append(self._walk(index, origin, boundary, ends, visited))
+
+        # 同一端点对按长度排序，最短的一条直接成边，其余在内部节点处拆开；环需要两个内部节点
+        chains.sort(key=lambda chain: (min(chain[0], chain[1]), max(chain[0], chain[1]), chain[2]))
+        segments, seen = [], set()
+        for source, target, distance, times, first, last in chains:
+            pair = (min(source, target), max(source, target))
+            if source == target:
+                if first is None or first[0] == last[0]:
+                    continue
+                segments.extend(self._cut(source, target, distance, times, [first, last]))
+            elif pair in seen:
+                if first is None:
+                    continue
+                segments.extend(self._cut(source, target, distance, times, [first]))
+            else:
+                seen.add(pair)
+                segments.append((source, target, distance, times))
+        return self._emit(segments, start_id)
+
+    def _walk(self, index, origin, boundary, ends, visited):
+        """从路网节点 origin 出发沿片段走到下一个路网节点，返回链 (起点, 终点, 长度, 耗时, 首/末内部节点)"""
+        node, distance, times = origin, 0.0, (0.0, 0.0, 0.0)
+        first = last = None
+        while True:
+            visited[index] = True
+            source, target, length, speeds, piece_first, piece_last = self._pieces[index]
+            inner = [piece_first, piece_last] if node == source else [piece_last, piece_first]
+            for candidate in inner:
+                if candidate is None:
+                    continue
+                offset = candidate[3] if node == source else length - candidate[3]
+                point = (candidate[0], candidate[1], candidate[2], distance + offset,
+                         tuple(t + c for t, c in zip(times, _times(offset, speeds))))
+                first = point if first is None else first
+                last = point
+            distance += length
+            times = tuple(t + c for t, c in zip(times, _times(length, speeds)))
+            node = target if node == source else source
+            if node in boundary:
+                return origin, node, distance, times, first, last
+            # 度为 2 的连接点本身也是链的内部节点
+            lon, lat = self._coordinates[node]
+            last = (node, lon, lat, distance, times)
+            first = last if first is None else first
+            index = next(other for other in ends[node] if other != index)
+
+    def _cut(self, source, target, distance, times, points):
+        """在给定的内部节点处把链拆成多段"""
+        segments, node, done, done_times = [], source, 0.0, (0.0, 0.0, 0.0)
+        for point in points:
+            segments.append((node, point, point[3] - done, tuple(t - d for t, d in zip(point[4], done_times))))
+            node, done, done_times = point, point[3], point[4]
+        segments.append((node, target, distance - done, tuple(t - d for t, d in zip(times, done_times))))
+        return segments
+
+    def _emit(self, segments, start_id):
+        """编号并生成节点/边字典（节点按 OSM ID 排序，编号从 start_id 开始）"""
+        points = {}
+        for segment in segments:
+            for end in segment[:2]:
+                if isinstance(end, tuple):
+                    points[end[0]] = end[1:3]
+                else:
+                    points[end] = self._coordinates[end]
+        ids = {osm_id: start_id + i for i, osm_id in enumerate(sorted(points))}
+        nodes = []
+        for osm_id in sorted(points):
+            longitude, latitude = points[osm_id]
+            nodes.append({"id": ids[osm_id], "name": "/".join(self._names.get(osm_id, [])), "type": NODE_TYPE,
+                          "popularity": DEFAULT_NODE["popularity"], "longitude": longitude, "latitude": latitude,
+                          "connected_edges": [], "osm_id": osm_id})
+        edges = []
+        for source, target, distance, times in segments:
+            u = ids[source[0] if isinstance(source, tuple) else source]
+            v = ids[target[0] if isinstance(target, tuple) else target]
+            edge = {"id": len(edges), "start_node": u, "end_node": v, "distance": round(distance, 2)}
+            for mode, time in zip(("walk", "bike", "ebike"), times):
+                edge[f"{mode}_speed"] = round(distance / time, 3) if 0 < time < float('inf') else 0.0
+            nodes[u - start_id]["connected_edges"].append(edge["id"])
+            nodes[v - start_id]["connected_edges"].append(edge["id"])
+            edges.append(edge)
+        return nodes, edges
+
+
+def import_osm(path, speeds=None):
+    """
+    流式读取 .osm.pbf 两遍，返回 (节点列表, 边列表)
+    - 第一遍只读 way，统计节点度数
+    - 第二遍由 osmium 的节点坐标索引为 way 补全坐标（不在 Python 中保存节点对象），逐条切分
+    """
+    if osmium is None:
+        raise RuntimeError("导入 OSM 数据需要安装 osmium（pip install osmium）")
+    builder = OsmGraphBuilder(speeds)
+    for way in osmium.FileProcessor(path, osmium.osm.WAY):
+        if "highway" in way.tags:
+            builder.count_way(way.tags, [node.ref for node in way.nodes])
+    builder.finish_counting()
+    for obj in osmium.FileProcessor(path, osmium.osm.NODE | osmium.osm.WAY).with_locations():
+        if obj.is_way() and "highway" in obj.tags:
+            points = [(node.ref, node.location.lon, node.location.lat) if node.location.valid() else None
+                      for node in obj.nodes]
+            builder.add_way(obj.tags, points)
+    return builder.build()
+
+
+if __name__ == '__main__':
+    if len(sys.argv) != 3:
+        print(__doc__)
+        sys.exit(1)
+    from algorithm.Graph import RoadGraph
+    from algorithm.GraphFile import write_graph_file
+    from utils.file_utils import write_json
+    nodes, edges = import_osm(sys.argv[1])
+    if sys.argv[2].endswith(".bin"):
+        write_graph_file(sys.argv[2], RoadGraph(nodes, edges))
+    else:
+        write_json(sys.argv[2], {"nodes": nodes, "edges": edges, "version": 0}, indent=None)
+    print(f"导入 {len(nodes)} 个节点、{len(edges)} 条边 -> {sys.argv[2]}")